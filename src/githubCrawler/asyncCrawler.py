@@ -0,0 +1,424 @@
+import asyncio
+import sys
+import time
+from collections import Counter
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from .githubCrawler import GithubCrawler, DEFAULT_CONNECTION_ATTEMPTS, GITHUB_URL, MAX_SEARCH_PAGES
+from .parsers import DEFAULT_PARSER
+from .retryPolicy import RateLimitException
+
+# Async crawler configuration values
+DEFAULT_MAX_CONCURRENCY = 100
+DEFAULT_CONNECTIONS_PER_PROXY = 10
+PROXY_POLL_INTERVAL = 0.05  # Seconds between attempts to get a proxy when all of them are busy
+
+# Exceptions that mean a download failed
+CONNECTION_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, RateLimitException) if aiohttp is not None else ()
+
+
+class AsyncGithubCrawler(GithubCrawler):
+    """  Asyncio version of the GitHub crawler. Keeps a pool of connections per proxy and bounds the number of
+         requests in flight, so a single process can run hundreds of fetches at the same time. Every method of the
+         crawler that downloads is a coroutine here.
+
+         Usage: `await AsyncGithubCrawler(link).run()`
+    """
+
+    def __init__(self, inputFileLink, attempts=DEFAULT_CONNECTION_ATTEMPTS, print_info=False, githubURL=GITHUB_URL,
+                 maxConcurrency=DEFAULT_MAX_CONCURRENCY, connectionsPerProxy=DEFAULT_CONNECTIONS_PER_PROXY,
+                 proxyPool=None, retryPolicy=None, cache=None, collapseDuplicates=False, parser=DEFAULT_PARSER,
+                 metrics=None, archive=None, compactResults=False):
+        """ Init function for the class.
+
+        Attributes:
+            inputFileLink: Input file link, or the input JSON already loaded as a dict.
+            attempts: Number of attempts in case of connection error.
+            print_info: If True, prints info about the process.
+            githubURL: Base URL of GitHub, i.e. a GitHub Enterprise host or a local server.
+            maxConcurrency: Maximum number of requests in flight for this crawler.
+            connectionsPerProxy: Maximum number of open connections kept for each proxy.
+            proxyPool: ProxyPool used to choose the proxy of every request. If not set, a new one is created with the
+                       proxies of the input file.
+            retryPolicy: RetryPolicy of every download. If not set, a new one is created with the attempts.
+            cache: HTTPCache of the repository pages. If not set, repository pages are always downloaded.
+            collapseDuplicates: If True, the repeated URLs of a search page are returned once with their "hits".
+            parser: Name of the HTML extraction backend ('streaming', 'beautifulsoup' or 'lxml') or a ParserBackend.
+            metrics: CrawlerMetrics where the downloads and the parsing are measured. If not set, a new one is created.
+            archive: PageArchive where every page downloaded or taken from the cache is saved. If not set, the pages
+                     are not saved.
+            compactResults: If True, the URLs are RepositoryResult and LinkResult instead of dicts.
+        """
+
+        if aiohttp is None:
+            raise ImportError("AsyncGithubCrawler needs aiohttp. To download: `pip install aiohttp`")
+
+        super().__init__(inputFileLink, attempts, print_info, githubURL, proxyPool, retryPolicy, cache,
+                         collapseDuplicates, parser, metrics, archive=archive, compactResults=compactResults)
+        self.maxConcurrency = maxConcurrency
+        self.connectionsPerProxy = connectionsPerProxy
+        self.sessions = None
+        self.semaphore = None
+
+    async def __aenter__(self):
+        await self.openSessions()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.closeSessions()
+
+    async def openSessions(self):
+        """ This function prepares the HTTP sessions. There is one session, with its own connection pool, for every
+            proxy of the pool, created the first time the proxy is used.
+        """
+
+        if self.sessions is not None:
+            return
+        self.semaphore = asyncio.Semaphore(self.maxConcurrency)
+        self.sessions = {}
+
+    async def closeSessions(self):
+        """ This function closes all the HTTP sessions opened by openSessions. """
+
+        if self.sessions is None:
+            return
+        await asyncio.gather(*(session.close() for session in self.sessions.values()))
+        self.sessions = None
+
+    def session(self, state):
+        """ Output: HTTP session of the proxy. """
+
+        if state.index not in self.sessions:
+            self.sessions[state.index] = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.connectionsPerProxy),
+                timeout=aiohttp.ClientTimeout(total=self.retryPolicy.timeout))
+        return self.sessions[state.index]
+
+    async def downloadHTML(self, link, useCache=False):
+        """ This function download the HTML of the URL through the healthiest proxy of the pool. aiohttp only talks
+            plain HTTP to the proxies, so the 'http' address of the proxy is used for every request.
+
+        Attributes:
+            link: valid URL.
+            useCache: If True and the crawler has a cache, the page is taken from the cache while it is fresh and
+                      revalidated with a conditional request when it is not.
+        Output: HTML text of the page.
+        """
+
+        entry = self.cache.get(link) if useCache and self.cache is not None else None
+        if entry is not None and self.cache.isFresh(entry):
+            self.metrics.inc('cache_requests_total', result='hit')
+            self.archivePage(link, entry.text)
+            return entry.text
+
+        async with self.semaphore:
+            state = self.proxyPool.acquire(block=False)
+            while state is None:
+                await asyncio.sleep(PROXY_POLL_INTERVAL)
+                state = self.proxyPool.acquire(block=False)
+
+            start = time.monotonic()
+            try:
+                with self.metrics.measure('download', {'url': link}, proxy=state.proxy['http']):
+                    async with self.session(state).get(link, proxy=state.proxy['http'],
+                                                       headers=self.cache.validators(entry) if entry else None) \
+                            as response:
+                        body = await response.read()
+                        html = await response.text()
+                        self.recordResponse(state.proxy['http'], response.status, len(body))
+                        self.retryPolicy.checkResponse(response.status, response.headers, html)
+            except BaseException:
+                self.proxyPool.release(state, time.monotonic() - start, False)
+                raise
+            self.proxyPool.release(state, time.monotonic() - start, True)
+        if entry is not None and response.status == 304:
+            self.metrics.inc('cache_requests_total', result='not_modified')
+            self.cache.refresh(link)
+            self.archivePage(link, entry.text)
+            return entry.text
+        response.raise_for_status()
+        if useCache and self.cache is not None:
+            self.metrics.inc('cache_requests_total', result='miss')
+            self.cache.put(link, html, response.headers)
+        self.archivePage(link, html)
+        return html
+
+    async def downloadPage(self, link, pageType, useCache=False):
+        """ This function downloads a page and extracts its data. Pages are never streamed by the async crawler.
+
+        Attributes:
+            link: valid URL.
+            pageType: Key of the page type in EXTRACTION_PLANS.
+            useCache: If True and the crawler has a cache, the page is taken from the cache as in downloadHTML.
+        Output: Extraction of the page.
+        """
+
+        ownSessions = self.sessions is None
+        await self.openSessions()
+        try:
+            return self.extractPage(await self.downloadHTML(link, useCache), pageType)
+        finally:
+            if ownSessions:
+                await self.closeSessions()
+
+    async def getLanguageStats(self, link):
+        """ This function gets the languages stats of the repository link.
+
+        Attributes:
+            link: valid URL of a repository.
+        Output: Languages stats of the repository.
+        """
+
+        try:
+            return self.parseLanguageStats(await self.retryPolicy.callAsync(
+                self.downloadHTML, link, True, exceptions=CONNECTION_ERRORS, onRetry=self.recordRetry))
+
+        except CONNECTION_ERRORS:
+            if self.print_info:
+                print("FAIL: " + link)
+            return {
+                'error': str(sys.exc_info()[1])
+            }
+
+    async def getRepositoryInfoWithExtra(self, link):
+        """ This function extract the info of a link repository.
+
+        Attributes:
+            link: valid github URL without 'https://github.com', i.e. /qiyuangong/leetcode
+        Output: List with the info of the repository.
+        """
+
+        return [await self.getRepositoryResult(link)]
+
+    async def getRepositoryResult(self, link):
+        """ This function extract the info of a link repository.
+
+        Attributes:
+            link: valid github URL without 'https://github.com', i.e. /qiyuangong/leetcode
+        Output: Info of the repository.
+        """
+
+        if self.print_info:
+            print("Creating link to repository: " + self.githubURL + link)
+        return self.getRepositoryInfo(link, await self.getLanguageStatsOnce(link))
+
+    async def getLanguageStatsOnce(self, link):
+        """ This function gets the languages stats of the repository link only once per crawler. If the same
+            repository is asked again, even while it is being downloaded, the first result is shared. Errors are not
+            kept, so the next time the repository is downloaded again.
+
+        Attributes:
+            link: valid github URL without 'https://github.com', i.e. /qiyuangong/leetcode
+        Output: Languages stats of the repository.
+        """
+
+        key = self.getRepositoryKey(link)
+        task = self.memo.get(key)
+        if task is None:
+            task = self.memo[key] = asyncio.ensure_future(self.getLanguageStats(self.githubURL + link))
+            task.add_done_callback(lambda done: self.forgetErrors(key, done))
+        else:
+            self.memoHits += 1
+        return await asyncio.shield(task)
+
+    def forgetErrors(self, key, task):
+        """ This function removes a finished download from the memo if it failed. """
+
+        if task.cancelled() or task.exception() is not None or (
+                isinstance(task.result(), dict) and 'error' in task.result()):
+            if self.memo.get(key) is task:
+                del self.memo[key]
+
+    async def getURLs(self, html):
+        """ This function extract the URLs of the HTML.
+
+        Attributes:
+            html: valid HTML text.
+        Output: List of URL.
+        """
+
+        return [url async for url in self.iterURLs(self.parseLinks(html))]
+
+    async def iterURLs(self, links):
+        """ This function generates the URLs of a list of links, each one as soon as it is ready.
+
+        Attributes:
+            links: List of links without the GitHub domain, as returned by parseLinks.
+        Output: Async generator of URL.
+        """
+
+        if not links:
+            yield {"url_not_found": "Not found any URL for this search."}
+            return
+
+        hits = Counter(links) if self.collapseDuplicates else None
+        if hits is not None:
+            links = list(hits)
+
+        if self.type == 'Repositories':
+            fase = [asyncio.ensure_future(self.getRepositoryResult(link)) for link in links]
+            try:
+                for f in asyncio.as_completed(fase):
+                    url = await f
+                    if hits is not None:
+                        url['hits'] = hits[url['url'][len(self.githubURL):]]
+                    yield url
+            finally:
+                for f in fase:
+                    f.cancel()
+        else:
+            for link in links:
+                url = self.getLinkResult(link)
+                if hits is not None:
+                    url['hits'] = hits[link]
+                yield url
+
+    async def downloadSearchPage(self, page=1):
+        """ This function download a search result page, trying again as said by the retry policy.
+
+        Attributes:
+            page: Number of the search result page.
+        Output: HTML text of the page. Raises the last connection error if the retry policy gives up.
+        """
+
+        return await self.retryPolicy.callAsync(self.downloadHTML, self.generateURL(page),
+                                                exceptions=CONNECTION_ERRORS, onRetry=self.recordRetry)
+
+    async def countResults(self):
+        """ This function downloads the first search page and reads the number of results of the search.
+
+        Output: Number of results of the search, None if the page does not say it.
+        """
+
+        ownSessions = self.sessions is None
+        await self.openSessions()
+        try:
+            return self.readTotal(await self.retryPolicy.callAsync(
+                self.downloadPage, self.generateURL(), self.type, exceptions=CONNECTION_ERRORS,
+                onRetry=self.recordRetry))
+        finally:
+            if ownSessions:
+                await self.closeSessions()
+
+    async def getSearchPage(self, page=1):
+        """ This function gets the links of a search result page, from the checkpoint if it is there and downloading
+            it if not.
+
+        Attributes:
+            page: Number of the search result page.
+        Output: Tuple with the list of links, as returned by parseLinks, and True if there is a next page.
+        """
+
+        url = self.generateURL(page)
+        searchPage = self.checkpoint.getPage(url) if self.checkpoint is not None else None
+        if searchPage is None:
+            ownSessions = self.sessions is None
+            await self.openSessions()
+            try:
+                searchPage = self.readSearchPage(await self.retryPolicy.callAsync(
+                    self.downloadPage, url, self.type, exceptions=CONNECTION_ERRORS, onRetry=self.recordRetry))
+            finally:
+                if ownSessions:
+                    await self.closeSessions()
+            if self.checkpoint is not None:
+                self.checkpoint.putPage(url, *searchPage)
+        return searchPage
+
+    async def iterResults(self, maxPages=MAX_SEARCH_PAGES):
+        """ This function generates all the URLs of the search, page after page, each one as soon as it is ready. The
+            next search page is downloaded while the URLs of the current one are generated.
+
+        Attributes:
+            maxPages: Maximum number of search result pages to walk.
+        Output: Async generator of URL of the search.
+        """
+
+        ownSessions = self.sessions is None
+        await self.openSessions()
+        page = 1
+        nextSearch = asyncio.ensure_future(self.getSearchPage(page))
+        try:
+            while nextSearch is not None:
+                if self.print_info:
+                    print("SEARCHING: " + self.generateURL(page))
+                try:
+                    links, hasNextPage = await nextSearch
+                except CONNECTION_ERRORS + (self.DataNotFoundException,) as e:
+                    if self.print_info:
+                        print("ERROR: " + str(e))
+                    nextSearch = None
+                    yield {'error': str(e)}
+                    return
+                if not links and page > 1:
+                    return
+
+                page += 1
+                nextSearch = asyncio.ensure_future(self.getSearchPage(page)) \
+                    if hasNextPage and page <= maxPages else None
+                async for url in self.iterURLs(links):
+                    yield url
+        finally:
+            if nextSearch is not None:
+                nextSearch.cancel()
+            if ownSessions:
+                await self.closeSessions()
+
+    async def runToSink(self, sink, maxPages=1):
+        """ This function writes the URLs of the search to a sink as soon as every one is ready, instead of keeping
+            them in a list.
+
+        Attributes:
+            sink: OutputSink where the URLs are written, i.e. NDJSONSink('results.ndjson.gz').
+            maxPages: Maximum number of search result pages to walk. By default only the first one, as run().
+        Output: Number of URLs written.
+        """
+
+        written = 0
+        async for url in self.iterResults(maxPages):
+            sink.write(url)
+            written += 1
+        sink.flush()
+        return written
+
+    async def run(self):
+        """ Run function of the crawler. GitHub crawler that implements the GitHub search and returns all the links
+            from the search result.
+
+        Output: List of URL of the search.
+        """
+
+        ownSessions = self.sessions is None
+        await self.openSessions()
+        try:
+            return await self.search()
+        finally:
+            if ownSessions:
+                await self.closeSessions()
+
+    async def search(self):
+        """ This function downloads the search page, as said by the retry policy, and extracts its URLs.
+
+        Output: List of URL of the search.
+        """
+
+        if self.print_info:
+            print("SEARCHING: " + str(self.generateURL()))
+
+        try:
+            return await self.getURLs(await self.downloadSearchPage())
+        except CONNECTION_ERRORS:
+            if self.print_info:
+                print("FAIL: " + str(sys.exc_info()[1]))
+            return [{
+                'error': str(sys.exc_info()[1])
+            }]
+        except self.DataNotFoundException as e:
+            if self.print_info:
+                print("ERROR: " + str(e))
+            return [{
+                'error': str(e)
+            }]
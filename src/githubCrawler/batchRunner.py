@@ -0,0 +1,300 @@
+import argparse
+import json
+import os
+import queue
+import sys
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from .checkpointStore import CheckpointStore
+from .githubCrawler import GithubCrawler, MAX_SEARCH_PAGES
+from .metrics import CrawlerMetrics
+from .parsers import DEFAULT_PARSER, getParser
+from .proxyPool import ProxyPool, DEFAULT_MAX_REQUESTS_PER_PROXY
+from .retryPolicy import RetryPolicy, DEFAULT_CONNECTION_ATTEMPTS
+from .sinks import openSink
+
+# Batch configuration values
+DEFAULT_MAX_WORKERS = 32
+
+
+def loadJobs(source):
+    """ This function reads the jobs of a batch.
+
+    Attributes:
+        source: Link to a directory of input JSON files, one job per file named as the file, or to a JSONL file with
+                one input JSON per line, named as its "id" or its line number.
+    Output: List of tuples (job id, input JSON).
+    """
+
+    jobs = []
+    if os.path.isdir(source):
+        for name in sorted(os.listdir(source)):
+            if name.endswith('.json'):
+                with open(os.path.join(source, name), encoding="utf8") as file:
+                    jobs.append((name[:-len('.json')], json.load(file)))
+    else:
+        with open(source, encoding="utf8") as file:
+            for number, line in enumerate(file, 1):
+                if line.strip():
+                    job = json.loads(line)
+                    jobs.append((str(job.get('id', number)), job))
+    return jobs
+
+
+class BatchJob:
+    """  State of a job of a batch: its crawler, the tasks ready to run and the number of tasks running """
+
+    def __init__(self, jobId, crawler, maxPages, firstPage=None):
+        """ Init function for the class.
+
+        Attributes:
+            jobId: Name of the job.
+            crawler: GithubCrawler of the job.
+            maxPages: Maximum number of search result pages of the job.
+            firstPage: First search result page already downloaded, as returned by getSearchPage. If not set, it is
+                       downloaded.
+        """
+
+        self.id = jobId
+        self.crawler = crawler
+        self.maxPages = maxPages
+        self.tasks = deque([lambda: self.searchTask(1, firstPage)])
+        self.running = 0
+
+    @property
+    def finished(self):
+        """ Output: True if the job has nothing running and nothing left to run. """
+
+        return not self.tasks and not self.running
+
+    def searchTask(self, page, searchPage=None):
+        """ This function downloads and parses a search result page of the job.
+
+        Attributes:
+            page: Number of the search result page.
+            searchPage: The page already downloaded, as returned by getSearchPage. If not set, it is downloaded.
+        Output: Tuple with the list of URLs ready and the list of new tasks of the job.
+        """
+
+        crawler = self.crawler
+        try:
+            links, hasNextPage = searchPage if searchPage is not None else crawler.getSearchPage(page)
+        except (requests.exceptions.RequestException, crawler.DataNotFoundException) as e:
+            return [{'error': str(e)}], []
+        if not links and page > 1:
+            return [], []
+
+        tasks = [lambda: self.searchTask(page + 1)] if hasNextPage and page < self.maxPages else []
+        if not links or crawler.type != 'Repositories':
+            return list(crawler.iterURLs(links)), tasks
+
+        hits = Counter(links) if crawler.collapseDuplicates else None
+        for link in (list(hits) if hits is not None else links):
+            tasks.append(lambda link=link: self.repositoryTask(link, hits[link] if hits is not None else None))
+        return [], tasks
+
+    def repositoryTask(self, link, hits):
+        """ This function gets the info of a repository of the job.
+
+        Attributes:
+            link: valid github URL without 'https://github.com', i.e. /qiyuangong/leetcode
+            hits: Number of times the link appears in the search page, None if duplicates are not collapsed.
+        Output: Tuple with the list of URLs ready and the list of new tasks of the job.
+        """
+
+        url = self.crawler.getRepositoryResult(link)
+        if hits is not None:
+            url['hits'] = hits
+        return [url], []
+
+
+class BatchRunner:
+    """  Runs many crawls on one shared pool of workers. Every job is split in tasks, a search page or a repository,
+         and the tasks of the jobs are interleaved in turns so a big job does not delay the small ones. The number of
+         requests in flight is limited for the whole batch and for every proxy, whatever the number of jobs. Every job
+         only uses its own proxies.
+
+         Usage: `for jobId, url in BatchRunner(loadJobs('jobs.jsonl')).iterResults(): ...`
+    """
+
+    def __init__(self, jobs, maxWorkers=DEFAULT_MAX_WORKERS, maxRequestsPerProxy=DEFAULT_MAX_REQUESTS_PER_PROXY,
+                 maxPages=1, attempts=DEFAULT_CONNECTION_ATTEMPTS, print_info=False, retryPolicy=None, cache=None,
+                 collapseDuplicates=False, parser=DEFAULT_PARSER, metrics=None, proxyPool=None, firstPages=None,
+                 **crawlerArguments):
+        """ Init function for the class.
+
+        Attributes:
+            jobs: List of tuples (job id, input JSON or input file link), as returned by loadJobs.
+            maxWorkers: Maximum number of tasks running at the same time for the whole batch.
+            maxRequestsPerProxy: Maximum number of requests in flight for each proxy for the whole batch.
+            maxPages: Maximum number of search result pages of every job.
+            attempts: Number of attempts in case of connection error.
+            print_info: If True, prints info about the process.
+            retryPolicy: RetryPolicy shared by every job. If not set, a new one is created with the attempts.
+            cache: HTTPCache shared by every job.
+            collapseDuplicates: If True, the repeated URLs of a search page are returned once with their "hits".
+            parser: Name of the HTML extraction backend or a ParserBackend, shared by every job.
+            metrics: CrawlerMetrics shared by every job. If not set, a new one is created.
+            proxyPool: ProxyPool with the health and the limits of the proxies, shared by every job. Every job chooses
+                       only among its own proxies. If not set, a new one is created with the proxies of all the jobs.
+            firstPages: Dict of job id to its first search result page already downloaded, as returned by
+                        getSearchPage, so it is not downloaded again.
+            crawlerArguments: Other arguments of every GithubCrawler, i.e. githubURL or a shared checkpoint.
+        """
+
+        self.maxWorkers = maxWorkers
+        self.maxPages = maxPages
+        self.print_info = print_info
+        self.metrics = metrics if metrics is not None else CrawlerMetrics()
+        self.retryPolicy = retryPolicy if retryPolicy is not None else RetryPolicy(attempts)
+        self.jobs = []
+        self.errors = []
+        loaded = []
+        for jobId, job in jobs:
+            if not isinstance(job, dict):
+                with open(job, encoding="utf8") as file:
+                    job = json.load(file)
+            loaded.append((jobId, job))
+
+        # The health and the limit of every proxy hold for the whole batch, but a job only chooses among its proxies.
+        if proxyPool is None:
+            proxies = list(dict.fromkeys(proxy for _, job in loaded for proxy in job.get('proxies') or []))
+            proxyPool = ProxyPool([{"http": 'http://' + proxy, "https": 'https://' + proxy} for proxy in proxies],
+                                  maxRequestsPerProxy)
+        self.proxyPool = proxyPool
+        parser = getParser(parser)
+        for jobId, job in loaded:
+            try:
+                proxies = [{"http": 'http://' + proxy, "https": 'https://' + proxy}
+                           for proxy in job.get('proxies') or []]
+                crawler = GithubCrawler(job, print_info=print_info, proxyPool=self.proxyPool.forProxies(proxies),
+                                        retryPolicy=self.retryPolicy, cache=cache,
+                                        collapseDuplicates=collapseDuplicates, parser=parser, metrics=self.metrics,
+                                        **crawlerArguments)
+            except (GithubCrawler.KeyWordNotValid, GithubCrawler.ProxyNotValid, GithubCrawler.TypeNotValid) as e:
+                self.errors.append((jobId, {'error': e.message}))
+                continue
+            self.jobs.append(BatchJob(jobId, crawler, maxPages, (firstPages or {}).get(jobId)))
+
+    def nextTask(self, active):
+        """ This function chooses the next task to run, taking turns between the jobs.
+
+        Attributes:
+            active: deque of the jobs not finished, rotated after every choice.
+        Output: Tuple (job, task), None if no job has a task ready.
+        """
+
+        for _ in range(len(active)):
+            job = active[0]
+            active.rotate(-1)
+            if job.tasks:
+                return job, job.tasks.popleft()
+        return None
+
+    def iterResults(self):
+        """ This function runs all the jobs and generates their URLs as soon as they are ready.
+
+        Output: Generator of tuples (job id, URL).
+        """
+
+        yield from self.errors
+        active = deque(self.jobs)
+        done = queue.Queue()
+        running = 0
+        with ThreadPoolExecutor(self.maxWorkers) as executor:
+            while True:
+                while running < self.maxWorkers:
+                    chosen = self.nextTask(active)
+                    if chosen is None:
+                        break
+                    job, task = chosen
+                    job.running += 1
+                    running += 1
+                    executor.submit(task).add_done_callback(lambda future, job=job: done.put((job, future)))
+                if not running:
+                    return
+
+                job, future = done.get()
+                job.running -= 1
+                running -= 1
+                urls, tasks = future.result()
+                job.tasks.extend(tasks)
+                for url in urls:
+                    yield job.id, url
+                if job.finished:
+                    active.remove(job)
+                    if self.print_info:
+                        print("FINISHED: " + job.id)
+
+    def runToSink(self, sink):
+        """ This function writes the URLs of all the jobs to a sink as soon as every one is ready, with the id of its
+            job in 'job'.
+
+        Attributes:
+            sink: OutputSink where the URLs are written.
+        Output: Number of URLs written.
+        """
+
+        written = 0
+        for jobId, url in self.iterResults():
+            sink.write(dict(url, job=jobId))
+            written += 1
+        sink.flush()
+        return written
+
+    def run(self):
+        """ Run function of the batch.
+
+        Output: Dict of job id to list of URL of the search.
+        """
+
+        results = {jobId: [] for jobId, _ in self.errors}
+        results.update({job.id: [] for job in self.jobs})
+        for jobId, url in self.iterResults():
+            results[jobId].append(url)
+        return results
+
+
+def main(arguments=None):
+    """ This function runs a batch from the command line and writes one JSON line per URL, with the id of its job:
+        `python -m githubCrawler.src.githubCrawler.batchRunner jobs.jsonl --max-workers 32 --max-pages 5`
+
+    Attributes:
+        arguments: List of command line arguments. If not set, the ones of sys.argv.
+    Output: Exit code.
+    """
+
+    parser = argparse.ArgumentParser(description='Runs many GitHub crawls on one shared pool of workers')
+    parser.add_argument('source', help='directory of input JSON files or JSONL file with one job per line')
+    parser.add_argument('--max-workers', type=int, default=DEFAULT_MAX_WORKERS)
+    parser.add_argument('--max-requests-per-proxy', type=int, default=DEFAULT_MAX_REQUESTS_PER_PROXY)
+    parser.add_argument('--max-pages', type=int, default=1, help='search pages of every job, at most ' +
+                        str(MAX_SEARCH_PAGES))
+    parser.add_argument('--attempts', type=int, default=DEFAULT_CONNECTION_ATTEMPTS)
+    parser.add_argument('--parser', default=DEFAULT_PARSER)
+    parser.add_argument('--collapse-duplicates', action='store_true')
+    parser.add_argument('--stream-pages', action='store_true', help='parse the pages while they are downloaded and '
+                                                                     'stop once the data is found')
+    parser.add_argument('--checkpoint', help='SQLite file to save the progress and resume from it')
+    parser.add_argument('--page-max-age', type=float, help='seconds a search page of the checkpoint is reused')
+    parser.add_argument('--repository-max-age', type=float, help='seconds a repository of the checkpoint is reused')
+    parser.add_argument('--output', help='file to write the results, compressed if it ends in .gz or .zst, or '
+                                         'directory of the segments with --rotate-records. stdout if not set')
+    parser.add_argument('--rotate-records', type=int, help='results of every segment file')
+    parser.add_argument('--fsync', action='store_true', help='force every write to the disk')
+    arguments = parser.parse_args(arguments)
+
+    checkpoint = CheckpointStore(arguments.checkpoint, arguments.page_max_age, arguments.repository_max_age) \
+        if arguments.checkpoint else None
+    runner = BatchRunner(loadJobs(arguments.source), arguments.max_workers, arguments.max_requests_per_proxy,
+                         min(arguments.max_pages, MAX_SEARCH_PAGES), arguments.attempts,
+                         collapseDuplicates=arguments.collapse_duplicates, parser=arguments.parser,
+                         checkpoint=checkpoint, streamPages=arguments.stream_pages)
+    with openSink(arguments.output, arguments.rotate_records, fsync=arguments.fsync) as sink:
+        runner.runToSink(sink)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
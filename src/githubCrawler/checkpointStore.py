@@ -0,0 +1,107 @@
+import json
+import time
+from .sqliteFile import SQLiteFile
+
+
+class CheckpointStore(SQLiteFile):
+    """  Progress of the crawls, saved in a SQLite file as soon as every search page is parsed and every repository is
+         enriched. A crawl that dies can be run again with the same store and it goes on where it stopped. With a
+         maximum age the store is also used for incremental crawls: pages and repositories saved before that age are
+         crawled again, the rest are taken from the store.
+    """
+
+    def __init__(self, path, pageMaxAge=None, repositoryMaxAge=None):
+        """ Init function for the class.
+
+        Attributes:
+            path: Link of the SQLite file of the store, created if it does not exist.
+            pageMaxAge: Seconds a search page is taken from the store. If not set, forever.
+            repositoryMaxAge: Seconds the language stats of a repository are taken from the store. If not set, forever.
+        """
+
+        self.pageMaxAge = pageMaxAge
+        self.repositoryMaxAge = repositoryMaxAge
+        super().__init__(path, """
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                links TEXT NOT NULL,
+                hasNextPage INTEGER NOT NULL,
+                completedAt REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS repositories (
+                key TEXT PRIMARY KEY,
+                stats TEXT NOT NULL,
+                completedAt REAL NOT NULL
+            );
+        """)
+
+    def isFresh(self, completedAt, maxAge):
+        """ Output: True if something saved at completedAt can be used without crawling it again. """
+
+        return maxAge is None or time.time() - completedAt < maxAge
+
+    def getPage(self, url):
+        """ This function gets a search page already parsed.
+
+        Attributes:
+            url: URL of the search page, as returned by generateURL.
+        Output: Tuple with the list of links and True if there is a next page, None if the page is not in the store or
+                is older than pageMaxAge.
+        """
+
+        row = self.connection().execute('SELECT links, hasNextPage, completedAt FROM pages WHERE url = ?',
+                                        (url,)).fetchone()
+        if row is None or not self.isFresh(row[2], self.pageMaxAge):
+            return None
+        return json.loads(row[0]), bool(row[1])
+
+    def putPage(self, url, links, hasNextPage):
+        """ This function saves a parsed search page.
+
+        Attributes:
+            url: URL of the search page, as returned by generateURL.
+            links: List of links of the page.
+            hasNextPage: True if there is a next page.
+        """
+
+        self.connection().execute('INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)',
+                                  (url, json.dumps(links), int(hasNextPage), time.time()))
+
+    def getRepository(self, key):
+        """ This function gets the language stats of a repository already enriched.
+
+        Attributes:
+            key: Key of the repository, as returned by getRepositoryKey.
+        Output: Languages stats of the repository, None if it is not in the store or is older than repositoryMaxAge.
+        """
+
+        row = self.connection().execute('SELECT stats, completedAt FROM repositories WHERE key = ?',
+                                        (key,)).fetchone()
+        if row is None or not self.isFresh(row[1], self.repositoryMaxAge):
+            return None
+        return json.loads(row[0])
+
+    def putRepository(self, key, stats):
+        """ This function saves the language stats of a repository.
+
+        Attributes:
+            key: Key of the repository, as returned by getRepositoryKey.
+            stats: Languages stats of the repository.
+        """
+
+        self.connection().execute('INSERT OR REPLACE INTO repositories VALUES (?, ?, ?)',
+                                  (key, json.dumps(stats), time.time()))
+
+    def progress(self):
+        """ Output: Dict with the number of search pages and repositories saved. """
+
+        connection = self.connection()
+        return {'pages': connection.execute('SELECT COUNT(*) FROM pages').fetchone()[0],
+                'repositories': connection.execute('SELECT COUNT(*) FROM repositories').fetchone()[0]}
+
+    def clear(self):
+        """ This function removes all the progress saved. """
+
+        connection = self.connection()
+        connection.execute('DELETE FROM pages')
+        connection.execute('DELETE FROM repositories')
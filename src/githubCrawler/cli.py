@@ -0,0 +1,244 @@
+import argparse
+import json
+import os
+import socket
+import stat
+import sys
+
+# Command line configuration values
+SOCKET_VARIABLE = 'GITHUB_CRAWLER_SOCKET'  # Environment variable with the socket of the daemon
+SOCKET_DIRECTORY = os.environ.get('XDG_RUNTIME_DIR') or os.path.join('/tmp', 'githubCrawler-' + str(os.getuid()))
+DEFAULT_SOCKET = os.environ.get(SOCKET_VARIABLE) or os.path.join(SOCKET_DIRECTORY, 'githubCrawler.sock')
+DEFAULT_MAX_JOBS = 4  # Crawls the daemon runs at the same time
+
+# Only the standard library is imported by this module: the crawler, requests and the parsers are imported when a
+# crawl runs in this process, and never when it is sent to the daemon, where they are already imported.
+
+
+def readInput(link):
+    """ This function reads the input JSON of a crawl.
+
+    Attributes:
+        link: Input file link, or '-' to read it from stdin.
+    Output: Dict of the input.
+    """
+
+    if link == '-':
+        return json.load(sys.stdin)
+    with open(link, encoding="utf8") as inputFile:
+        return json.load(inputFile)
+
+
+def runCrawl(job, metrics=None):
+    """ This function runs a crawl in this process.
+
+    Attributes:
+        job: Dict with the 'input' of the crawl and the options 'attempts', 'parser', 'collapseDuplicates',
+             'streamPages', 'maxWorkers', 'maxPages' and 'githubURL'. Options not set have their default value.
+        metrics: CrawlerMetrics shared by the crawls. If not set, a new one for the crawl.
+    Output: Generator of URL of the crawl.
+    """
+
+    from .githubCrawler import GithubCrawler, GITHUB_URL, MAX_SEARCH_PAGES
+    from .parsers import DEFAULT_PARSER
+    from .retryPolicy import DEFAULT_CONNECTION_ATTEMPTS
+
+    crawler = GithubCrawler(job['input'], job.get('attempts') or DEFAULT_CONNECTION_ATTEMPTS,
+                            githubURL=job.get('githubURL') or GITHUB_URL,
+                            collapseDuplicates=job.get('collapseDuplicates', False),
+                            parser=job.get('parser') or DEFAULT_PARSER, metrics=metrics,
+                            streamPages=job.get('streamPages', False), maxWorkers=job.get('maxWorkers'))
+    return crawler.iterResults(min(job.get('maxPages') or 1, MAX_SEARCH_PAGES))
+
+
+def isOwnSocket(path):
+    """ Output: True if the path is a socket of this user, so crawls are never sent to a socket of another user. """
+
+    try:
+        status = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(status.st_mode) and status.st_uid == os.getuid()
+
+
+def connectDaemon(path=DEFAULT_SOCKET):
+    """ This function connects to the daemon.
+
+    Attributes:
+        path: Link of the Unix socket of the daemon.
+    Output: Connected socket, None if the daemon is not running or the socket is not of this user.
+    """
+
+    if not isOwnSocket(path):
+        return None
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(path)
+    except OSError:
+        client.close()
+        return None
+    return client
+
+
+def requestDaemon(client, request):
+    """ This function sends a request to the daemon and reads its answers.
+
+    Attributes:
+        client: Socket connected to the daemon, as returned by connectDaemon. It is closed at the end.
+        request: Dict with the 'command' and its arguments.
+    Output: Generator of answer dicts, every one with 'result', 'done' or 'error'.
+    """
+
+    with client, client.makefile('r', encoding='utf8') as answers:
+        client.sendall((json.dumps(request) + '\n').encode('utf8'))
+        for line in answers:
+            yield json.loads(line)
+
+
+def writeAnswers(answers, sink=None):
+    """ This function writes the results answered by the daemon.
+
+    Attributes:
+        answers: Generator of answer dicts, as returned by requestDaemon.
+        sink: OutputSink where the results are written. If not set, they are written to stdout as JSON lines.
+    Output: Exit code, 1 if the daemon answered an error or closed the connection before the end.
+    """
+
+    for answer in answers:
+        if 'result' in answer:
+            if sink is not None:
+                sink.write(answer['result'])
+            else:
+                sys.stdout.write(json.dumps(answer['result']) + '\n')
+        elif 'error' in answer:
+            print('error: ' + answer['error'], file=sys.stderr)
+            return 1
+        else:
+            sys.stdout.flush()
+            return 0
+    print('error: the daemon closed the connection', file=sys.stderr)
+    return 1
+
+
+def commandRun(arguments):
+    """ This function runs a crawl, in the daemon if it is asked and running, or in this process. The output file
+        is always written by this process, the daemon only sends the results.
+    """
+
+    job = {'input': readInput(arguments.input), 'attempts': arguments.attempts, 'parser': arguments.parser,
+           'collapseDuplicates': arguments.collapse_duplicates, 'streamPages': arguments.stream_pages,
+           'maxWorkers': arguments.max_workers, 'maxPages': arguments.max_pages, 'githubURL': arguments.github_url}
+    client = connectDaemon(arguments.socket) if arguments.daemon else None
+    if client is not None:
+        answers = requestDaemon(client, {'command': 'run', 'job': job})
+        if arguments.output in (None, '-'):
+            return writeAnswers(answers)
+
+        from .sinks import openSink
+
+        with openSink(arguments.output) as sink:
+            return writeAnswers(answers, sink)
+
+    from .githubCrawler import GithubCrawler
+    from .sinks import openSink
+
+    try:
+        with openSink(arguments.output) as sink:
+            for url in runCrawl(job):
+                sink.write(url)
+    except (GithubCrawler.KeyWordNotValid, GithubCrawler.ProxyNotValid, GithubCrawler.TypeNotValid) as e:
+        print('error: ' + e.message, file=sys.stderr)
+        return 1
+    return 0
+
+
+def commandBatch(arguments):
+    """ This function runs a batch in this process, with the arguments of batchRunner. """
+
+    from .batchRunner import main as batchMain
+
+    return batchMain(arguments)
+
+
+def commandDaemon(arguments):
+    """ This function runs the daemon until it is stopped. """
+
+    from .crawlerDaemon import CrawlerDaemon, DaemonRunning, SocketNotValid
+
+    try:
+        daemon = CrawlerDaemon(arguments.socket, arguments.max_jobs, arguments.idle_timeout)
+    except (DaemonRunning, SocketNotValid) as e:
+        print('error: ' + e.message, file=sys.stderr)
+        return 1
+    with daemon:
+        daemon.serve()
+    return 0
+
+
+def commandControl(arguments):
+    """ This function sends the 'status' or 'stop' command to the daemon and prints its answer. """
+
+    client = connectDaemon(arguments.socket)
+    if client is None:
+        print('error: the daemon is not running on ' + arguments.socket, file=sys.stderr)
+        return 1
+    for answer in requestDaemon(client, {'command': arguments.command}):
+        print(json.dumps(answer))
+    return 0
+
+
+def buildParser():
+    """ Output: ArgumentParser of the command line. """
+
+    parser = argparse.ArgumentParser(prog='githubcrawler', description='Crawls the GitHub search')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='runs one crawl and writes one JSON line per URL')
+    run.add_argument('input', help="input JSON file with 'keywords', 'proxies' and 'type', or - for stdin")
+    run.add_argument('--output', help='file to write the results, compressed if it ends in .gz or .zst. stdout if '
+                                      'not set')
+    run.add_argument('--max-workers', type=int, help='threads getting the info of the repositories')
+    run.add_argument('--max-pages', type=int, default=1, help='search pages to walk')
+    run.add_argument('--attempts', type=int, help='attempts of every download, 20 if not set')
+    run.add_argument('--parser', help="HTML extraction backend, 'streaming' if not set")
+    run.add_argument('--collapse-duplicates', action='store_true')
+    run.add_argument('--stream-pages', action='store_true', help='parse the pages while they are downloaded and stop '
+                                                                 'once the data is found')
+    run.add_argument('--github-url', help='base URL of GitHub, i.e. a GitHub Enterprise host')
+    run.add_argument('--daemon', action='store_true', help='run the crawl in the daemon if it is running, in this '
+                                                           'process if not')
+    run.add_argument('--socket', default=DEFAULT_SOCKET, help='Unix socket of the daemon')
+
+    commands.add_parser('batch', add_help=False, help='runs many crawls, with the arguments of batchRunner')
+
+    daemon = commands.add_parser('daemon', help='keeps a warm crawler process that runs the crawls sent to a Unix '
+                                                'socket')
+    daemon.add_argument('--socket', default=DEFAULT_SOCKET)
+    daemon.add_argument('--max-jobs', type=int, default=DEFAULT_MAX_JOBS, help='crawls run at the same time')
+    daemon.add_argument('--idle-timeout', type=float, help='seconds without crawls before the daemon stops')
+
+    for command, description in (('status', 'prints the crawls and metrics of the daemon'), ('stop', 'stops the daemon')):
+        control = commands.add_parser(command, help=description)
+        control.add_argument('--socket', default=DEFAULT_SOCKET)
+    return parser
+
+
+def main(arguments=None):
+    """ This function runs the command line:
+        `python -m githubCrawler.src.githubCrawler run input.json --output results.ndjson --daemon`
+
+    Attributes:
+        arguments: List of command line arguments. If not set, the ones of sys.argv.
+    Output: Exit code.
+    """
+
+    arguments = sys.argv[1:] if arguments is None else arguments
+    if arguments[:1] == ['batch']:
+        return commandBatch(arguments[1:])
+    arguments = buildParser().parse_args(arguments)
+    commands = {'run': commandRun, 'daemon': commandDaemon, 'status': commandControl, 'stop': commandControl}
+    return commands[arguments.command](arguments)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,195 @@
+import json
+import os
+import socketserver
+import stat
+import threading
+import time
+from .cli import DEFAULT_MAX_JOBS, DEFAULT_SOCKET, connectDaemon, isOwnSocket, runCrawl
+from .githubCrawler import GithubCrawler
+from .metrics import CrawlerMetrics
+from .parsers import DEFAULT_PARSER, getParser
+
+# Daemon configuration values
+IDLE_CHECK_INTERVAL = 1  # Seconds between checks of the idle timeout
+SOCKET_MODE = stat.S_IRUSR | stat.S_IWUSR  # Only the user of the daemon can send it crawls
+DIRECTORY_MODE = stat.S_IRWXU  # Mode of the directory of the socket when the daemon creates it
+
+
+class DaemonRunning(Exception):
+    """Exception raised when another daemon is already listening on the socket.
+
+    Attributes:
+        message: explanation of the error
+    """
+
+    def __init__(self, message="A daemon is already running on this socket."):
+        self.message = message
+        super().__init__(self.message)
+
+
+class SocketNotValid(Exception):
+    """Exception raised when the socket or its directory belong to another user.
+
+    Attributes:
+        message: explanation of the error
+    """
+
+    def __init__(self, message="The socket belongs to another user."):
+        self.message = message
+        super().__init__(self.message)
+
+
+class DaemonHandler(socketserver.StreamRequestHandler):
+    """  Handler of a connection to the daemon: one JSON line with the request, answered with JSON lines """
+
+    def answer(self, answer):
+        """ This function sends an answer dict to the client. """
+
+        self.wfile.write((json.dumps(answer, default=dict) + '\n').encode('utf8'))
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+            command = request['command']
+        except (ValueError, KeyError, TypeError):
+            self.answer({'error': 'Request not valid.'})
+            return
+        if command == 'run':
+            self.server.runJob(request, self.answer)
+        elif command == 'status':
+            self.answer(self.server.status())
+        elif command == 'stop':
+            self.answer({'done': 0})
+            self.server.stop()
+        else:
+            self.answer({'error': 'Command not valid. Has to be: run, status or stop'})
+
+
+class CrawlerDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """  Warm crawler process that runs the crawls sent to a Unix socket, so short crawls do not pay the start of the
+         interpreter and the imports of the crawler every time. All the crawls share the metrics. Only the user of
+         the daemon can connect to its socket, and the results are sent back to the client, that writes them, so the
+         daemon never writes files for the client.
+
+         Usage: `githubcrawler daemon` and `githubcrawler run input.json --daemon`
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path=DEFAULT_SOCKET, maxJobs=DEFAULT_MAX_JOBS, idleTimeout=None):
+        """ Init function for the class.
+
+        Attributes:
+            path: Link of the Unix socket. A socket left by a daemon that is not running anymore is replaced. Its
+                  directory is created only for this user if it does not exist, and raises SocketNotValid if the
+                  directory or the socket belong to another user.
+            maxJobs: Maximum number of crawls run at the same time, the next ones wait.
+            idleTimeout: Seconds without crawls before the daemon stops. If not set, it runs until it is stopped.
+        """
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, DIRECTORY_MODE, exist_ok=True)
+        if os.stat(directory).st_uid not in (os.getuid(), 0):
+            raise SocketNotValid("The directory of the socket belongs to another user: " + directory)
+        if isRunning(path):
+            raise DaemonRunning("A daemon is already running on " + path)
+        if os.path.lexists(path):
+            if not isOwnSocket(path):
+                raise SocketNotValid("The socket belongs to another user or is not a socket: " + path)
+            os.unlink(path)
+        super().__init__(path, DaemonHandler)
+        self.path = path
+        self.jobs = threading.BoundedSemaphore(maxJobs)
+        self.idleTimeout = idleTimeout
+        self.metrics = CrawlerMetrics()
+        self.started = time.time()
+        self.lastJob = time.monotonic()
+        self.running = 0
+        self.served = 0
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        getParser(DEFAULT_PARSER)
+
+    def server_bind(self):
+        umask = os.umask(0o777 & ~SOCKET_MODE)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(umask)
+        os.chmod(self.server_address, SOCKET_MODE)
+
+    def serve(self):
+        """ This function answers the requests until the daemon is stopped or idle for idleTimeout. """
+
+        if self.idleTimeout is not None:
+            threading.Thread(target=self.watchIdle, daemon=True).start()
+        self.serve_forever()
+
+    def watchIdle(self):
+        """ This function stops the daemon once it is idle for idleTimeout. It runs in a thread of its own. """
+
+        while not self.stopped.wait(IDLE_CHECK_INTERVAL):
+            with self.lock:
+                idle = self.running == 0 and time.monotonic() - self.lastJob >= self.idleTimeout
+            if idle:
+                self.stop()
+
+    def stop(self):
+        """ This function stops serve, without waiting for it. """
+
+        if not self.stopped.is_set():
+            self.stopped.set()
+            threading.Thread(target=self.shutdown, daemon=True).start()
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def runJob(self, request, answer):
+        """ This function runs a crawl and answers its results.
+
+        Attributes:
+            request: Dict with the 'job' of runCrawl.
+            answer: Function that sends an answer dict to the client.
+        """
+
+        with self.jobs:
+            with self.lock:
+                self.running += 1
+            written = 0
+            try:
+                for url in runCrawl(request['job'], self.metrics):
+                    answer({'result': url})
+                    written += 1
+            except (GithubCrawler.KeyWordNotValid, GithubCrawler.ProxyNotValid, GithubCrawler.TypeNotValid) as e:
+                answer({'error': e.message})
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                try:
+                    answer({'error': str(e)})
+                except OSError:
+                    pass
+            else:
+                answer({'done': written})
+            finally:
+                with self.lock:
+                    self.running -= 1
+                    self.served += 1
+                    self.lastJob = time.monotonic()
+
+    def status(self):
+        """ Output: Dict with the socket, the seconds running, the crawls running and served, and the metrics. """
+
+        with self.lock:
+            return {'socket': self.path, 'uptime': time.time() - self.started, 'running': self.running,
+                    'served': self.served, 'metrics': self.metrics.snapshot()}
+
+
+def isRunning(path=DEFAULT_SOCKET):
+    """ Output: True if a daemon is listening on the socket. """
+
+    client = connectDaemon(path)
+    if client is None:
+        return False
+    client.close()
+    return True
@@ -1,15 +1,27 @@
+import codecs
 import json
+import queue
+import re
 import sys
+import threading
+import time
 import requests
-import random
-from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
-from bs4 import BeautifulSoup
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from .metrics import CrawlerMetrics
+from .parsers import getParser, searchPlan, statsPlan, PlanExtractor, DEFAULT_PARSER
+from .proxyPool import ProxyPool
+from .results import LinkResult, RepositoryResult
+from .retryPolicy import RetryPolicy, DEFAULT_CONNECTION_ATTEMPTS
 
 # Types available in this Github Crawler
 VALID_TYPES = ['Repositories', 'Issues', 'Wikis']
 
 # Crawler configuration values
-DEFAULT_CONNECTION_ATTEMPTS = 20
+MAX_SEARCH_PAGES = 100  # GitHub does not return more than 100 pages for a search
+RESULTS_PER_PAGE = 10
+TOTAL_PATTERN = re.compile(r'\s*([\d,]+) ')  # Number of results of a search, i.e. '16,318 repository results'
+STREAM_CHUNK_SIZE = 16 * 1024  # Bytes read from the connection before every step of the streaming parse
 
 # Variables for the search:
 GITHUB_SEARCH_URL = 'https://github.com/search?q='
@@ -20,23 +32,63 @@ CLASS_TO_SEARCH = {
     'Wikis': 'Link--muted text-small text-bold',
     'CheckIfThereIsResultRepositoryAndWiki': 'd-flex flex-column flex-md-row flex-justify-between border-bottom pb-3 position-relative',
     'CheckIfThereIsResultIssue': 'd-flex flex-column flex-md-row flex-justify-between border-bottom color-border-muted pb-3 position-relative',
-    'Stats': 'd-inline'
+    'Stats': 'd-inline',
+    'NextPage': 'next_page',
+    'Pagination': 'pagination',
+    'NoResults': 'blankslate'
 }
 
+# Extraction plans compiled from CLASS_TO_SEARCH, one for every page type
+EXTRACTION_PLANS = {
+    crawlType: searchPlan(CLASS_TO_SEARCH[crawlType],
+                          CLASS_TO_SEARCH['CheckIfThereIsResultIssue'] if crawlType == 'Issues'
+                          else CLASS_TO_SEARCH['CheckIfThereIsResultRepositoryAndWiki'],
+                          CLASS_TO_SEARCH['NextPage'],
+                          CLASS_TO_SEARCH['Pagination'],
+                          CLASS_TO_SEARCH['NoResults'])
+    for crawlType in VALID_TYPES
+}
+EXTRACTION_PLANS['Stats'] = statsPlan(CLASS_TO_SEARCH['Stats'])
+
 
 class GithubCrawler:
     """  GitHub crawler that implements the GitHub search and returns all the links from the search result """
 
-    def __init__(self, inputFileLink, attempts=DEFAULT_CONNECTION_ATTEMPTS, print_info=False):
+    def __init__(self, inputFileLink, attempts=DEFAULT_CONNECTION_ATTEMPTS, print_info=False, githubURL=GITHUB_URL,
+                 proxyPool=None, retryPolicy=None, cache=None, collapseDuplicates=False, parser=DEFAULT_PARSER,
+                 metrics=None, checkpoint=None, archive=None, hedgePolicy=None, streamPages=False,
+                 compactResults=False, maxWorkers=None):
         """ Init function for the class.
 
         Attributes:
-            inputFileLink: Input file link.
+            inputFileLink: Input file link, or the input JSON already loaded as a dict.
             attempts: Number of attempts in case of connection error.
+            print_info: If True, prints info about the process.
+            githubURL: Base URL of GitHub, i.e. a GitHub Enterprise host or a local server.
+            proxyPool: ProxyPool used to choose the proxy of every request. If not set, a new one is created with the
+                       proxies of the input file.
+            retryPolicy: RetryPolicy of every download. If not set, a new one is created with the attempts.
+            cache: HTTPCache of the repository pages. If not set, repository pages are always downloaded.
+            collapseDuplicates: If True, the repeated URLs of a search page are returned once with their "hits".
+            parser: Name of the HTML extraction backend ('streaming', 'beautifulsoup' or 'lxml') or a ParserBackend.
+            metrics: CrawlerMetrics where the downloads and the parsing are measured. If not set, a new one is created.
+            checkpoint: CheckpointStore where the progress is saved. If not set, the progress is only kept in memory.
+            archive: PageArchive where every page downloaded or taken from the cache is saved. If not set, the pages
+                     are not saved.
+            hedgePolicy: HedgePolicy of the downloads. If not set, requests are not hedged.
+            streamPages: If True, pages are parsed while they are downloaded and the download stops as soon as the
+                         data is found. Pages that have to be cached, archived or hedged are downloaded whole.
+            compactResults: If True, the URLs are RepositoryResult and LinkResult instead of dicts, that read as the
+                            same dicts but take less memory.
+            maxWorkers: Maximum number of threads getting the info of the repositories of a search page. If not set,
+                        the default of ThreadPoolExecutor.
         """
 
-        with open(inputFileLink, encoding="utf8") as unparsedInputFile:
-            inputJSON = json.load(unparsedInputFile)
+        if isinstance(inputFileLink, dict):
+            inputJSON = inputFileLink
+        else:
+            with open(inputFileLink, encoding="utf8") as unparsedInputFile:
+                inputJSON = json.load(unparsedInputFile)
 
         if 'keywords' not in inputJSON or not inputJSON['keywords']:
             raise self.KeyWordNotValid
@@ -48,8 +100,24 @@ class GithubCrawler:
         self.keywords = inputJSON['keywords']
         self.proxies = [{"http": 'http://' + proxy, "https": 'https://' + proxy} for proxy in inputJSON['proxies']]
         self.type = inputJSON['type']
-        self.totalAttempts = attempts
+        self.retryPolicy = retryPolicy if retryPolicy is not None else RetryPolicy(attempts)
+        self.totalAttempts = self.retryPolicy.attempts
+        self.cache = cache
+        self.collapseDuplicates = collapseDuplicates
+        self.parser = getParser(parser)
+        self.memo = {}
+        self.memoHits = 0
+        self.memoLock = threading.Lock()
         self.print_info = print_info
+        self.githubURL = githubURL
+        self.proxyPool = proxyPool if proxyPool is not None else ProxyPool(self.proxies)
+        self.metrics = metrics if metrics is not None else CrawlerMetrics()
+        self.checkpoint = checkpoint
+        self.archive = archive
+        self.hedgePolicy = hedgePolicy
+        self.streamPages = streamPages
+        self.compactResults = compactResults
+        self.maxWorkers = maxWorkers
 
     class TypeNotValid(Exception):
         """Exception raised for errors in the Type.
@@ -106,6 +174,16 @@ class GithubCrawler:
         owner, _, _ = link[1:].partition('/')
         return owner
 
+    def getRepositoryKey(self, link):
+        """ This function gets the key of the repository link, the same for all the links of the repository.
+
+        Attributes:
+            link: valid URL of a repository without the GitHub domain.
+        Output: owner/repository in lower case, GitHub names are case insensitive.
+        """
+
+        return '/'.join(link[1:].split('/')[:2]).lower()
+
     def getLanguageStats(self, link):
         """ This function gets the languages stats of the repository link.
 
@@ -114,59 +192,341 @@ class GithubCrawler:
         Output: Languages stats of the repository.
         """
 
+        try:
+            return self.readLanguageStats(self.retryPolicy.call(self.downloadPage, link, 'Stats', True,
+                                                                onRetry=self.recordRetry))
+
+        except requests.exceptions.RequestException:
+            if self.print_info:
+                print("FAIL: " + link)
+            return {
+                'error': str(sys.exc_info()[1])
+            }
+
+    def parseLanguageStats(self, html):
+        """ This function extract the languages stats of a repository page.
+
+        Attributes:
+            html: valid HTML text of a repository page.
+        Output: Languages stats of the repository.
+        """
+
+        return self.readLanguageStats(self.extractPage(html, 'Stats'))
+
+    def readLanguageStats(self, extraction):
+        """ This function reads the languages stats of the data extracted from a repository page.
+
+        Attributes:
+            extraction: Extraction of the page with EXTRACTION_PLANS['Stats'].
+        Output: Languages stats of the repository.
+        """
+
         stats = {}
-        attempts = 0
-        while True:
-            try:
-                languages = BeautifulSoup(self.downloadHTML(link), 'html.parser'). \
-                    find_all("li", {"class": CLASS_TO_SEARCH['Stats']})
-                if len(languages) > 0:
-                    for language in languages:
-                        spans = language.find_all("span")
-                        if len(spans) == 2:
-                            stats[spans[0].text] = spans[1].text[:-1]
-                        else:
-                            stats[spans[1].text] = spans[2].text[:-1]
-                    return stats
+        languages = extraction.languages
+        if len(languages) > 0:
+            for spans in languages:
+                if len(spans) == 2:
+                    stats[spans[0]] = spans[1][:-1]
                 else:
-                    return 'Not data about languages'
-
-            except requests.exceptions.RequestException:
-                attempts += 1
-                if attempts == self.totalAttempts:
-                    if self.print_info:
-                        print("FAIL after " + str(self.totalAttempts) + " attempts.")
-                    return {
-                        'error': str(sys.exc_info()[1])
-                    }
+                    stats[spans[1]] = spans[2][:-1]
+            return stats
+        else:
+            return 'Not data about languages'
 
     def getRepositoryInfoWithExtra(self, link):
         """ This function extract the info of a link repository.
 
+        Attributes:
+            link: valid github URL without 'https://github.com', i.e. /qiyuangong/leetcode
+        Output: List with the info of the repository.
+        """
+
+        return [self.getRepositoryResult(link)]
+
+    def getRepositoryResult(self, link):
+        """ This function extract the info of a link repository.
+
         Attributes:
             link: valid github URL without 'https://github.com', i.e. /qiyuangong/leetcode
         Output: Info of the repository.
         """
 
         if self.print_info:
-            print("Creating link to repository: " + GITHUB_URL + link)
-        return [
-            {"url": GITHUB_URL + link,
-             "extra": {
-                 "owner": self.getOwner(link),
-                 "language_stats": self.getLanguageStats(GITHUB_URL + link)
-             }
-             }]
+            print("Creating link to repository: " + self.githubURL + link)
+        return self.getRepositoryInfo(link, self.getLanguageStatsOnce(link))
+
+    def getRepositoryInfo(self, link, stats):
+        """ This function builds the info of a link repository.
+
+        Attributes:
+            link: valid github URL without 'https://github.com', i.e. /qiyuangong/leetcode
+            stats: Languages stats of the repository.
+        Output: Info of the repository.
+        """
+
+        if self.compactResults:
+            return RepositoryResult(self.githubURL, link, self.getOwner(link), stats)
+        return {"url": self.githubURL + link,
+                "extra": {
+                    "owner": self.getOwner(link),
+                    "language_stats": stats
+                }}
+
+    def getLanguageStatsOnce(self, link):
+        """ This function gets the languages stats of the repository link only once per crawler. If the same
+            repository is asked again, even while it is being downloaded, the first result is shared. Errors are not
+            kept, so the next time the repository is downloaded again.
+
+        Attributes:
+            link: valid github URL without 'https://github.com', i.e. /qiyuangong/leetcode
+        Output: Languages stats of the repository.
+        """
+
+        key = self.getRepositoryKey(link)
+        with self.memoLock:
+            future = self.memo.get(key)
+            isFirst = future is None
+            if isFirst:
+                future = self.memo[key] = Future()
+            else:
+                self.memoHits += 1
 
-    def downloadHTML(self, link):
-        """ This function download the HTML of the URL.
+        if isFirst:
+            try:
+                stats = self.checkpoint.getRepository(key) if self.checkpoint is not None else None
+                if stats is None:
+                    stats = self.getLanguageStats(self.githubURL + link)
+                    if self.checkpoint is not None and not (isinstance(stats, dict) and 'error' in stats):
+                        self.checkpoint.putRepository(key, stats)
+            except BaseException as e:
+                with self.memoLock:
+                    del self.memo[key]
+                future.set_exception(e)
+                raise
+            if isinstance(stats, dict) and 'error' in stats:
+                with self.memoLock:
+                    del self.memo[key]
+            future.set_result(stats)
+        return future.result()
+
+    def downloadHTML(self, link, useCache=False):
+        """ This function download the HTML of the URL through the healthiest proxy of the pool.
 
         Attributes:
             link: valid URL.
+            useCache: If True and the crawler has a cache, the page is taken from the cache while it is fresh and
+                      revalidated with a conditional request when it is not.
         Output: HTML text of the page.
         """
 
-        return requests.get(link, proxies=self.proxies[random.randint(0, len(self.proxies) - 1)]).text
+        entry = self.cache.get(link) if useCache and self.cache is not None else None
+        if entry is not None and self.cache.isFresh(entry):
+            self.metrics.inc('cache_requests_total', result='hit')
+            self.archivePage(link, entry.text)
+            return entry.text
+
+        headers = self.cache.validators(entry) if entry is not None else None
+        if self.hedgePolicy is not None:
+            response = self.downloadHedged(link, headers)
+        else:
+            with self.proxyPool.proxy() as proxy, \
+                    self.metrics.measure('download', {'url': link}, proxy=proxy['http']):
+                response = requests.get(link, proxies=proxy, timeout=self.retryPolicy.timeout, headers=headers)
+                self.recordResponse(proxy['http'], response.status_code, len(response.content))
+                self.retryPolicy.checkResponse(response.status_code, response.headers, response.text)
+        if entry is not None and response.status_code == 304:
+            self.metrics.inc('cache_requests_total', result='not_modified')
+            self.cache.refresh(link)
+            self.archivePage(link, entry.text)
+            return entry.text
+        response.raise_for_status()
+        if useCache and self.cache is not None:
+            self.metrics.inc('cache_requests_total', result='miss')
+            self.cache.put(link, response.text, response.headers)
+        self.archivePage(link, response.text)
+        return response.text
+
+    def downloadPage(self, link, pageType, useCache=False):
+        """ This function downloads a page and extracts its data, streaming it if streamPages is True.
+
+        Attributes:
+            link: valid URL.
+            pageType: Key of the page type in EXTRACTION_PLANS.
+            useCache: If True and the crawler has a cache, the page is taken from the cache as in downloadHTML.
+        Output: Extraction of the page.
+        """
+
+        if not self.streamPages or (useCache and self.cache is not None) or self.archive is not None or \
+                self.hedgePolicy is not None:
+            return self.extractPage(self.downloadHTML(link, True) if useCache else self.downloadHTML(link), pageType)
+        return self.downloadStreamed(link, pageType)
+
+    def downloadStreamed(self, link, pageType):
+        """ This function parses a page while it is downloaded, chunk by chunk, without keeping the whole page. As
+            soon as the extraction plan has everything it needs, i.e. the language stats of a repository or the
+            pagination of a search page, the connection is closed and the rest of the page is not downloaded. The
+            seconds spent parsing the chunks are measured apart in 'parse_seconds', as with the whole pages.
+
+        Attributes:
+            link: valid URL.
+            pageType: Key of the page type in EXTRACTION_PLANS.
+        Output: Extraction of the page.
+        """
+
+        aborted = False
+        parsing = 0
+        with self.proxyPool.proxy() as proxy, \
+                self.metrics.measure('download', {'url': link}, proxy=proxy['http']) as attributes:
+            response = requests.get(link, proxies=proxy, timeout=self.retryPolicy.timeout, stream=True)
+            try:
+                if response.status_code >= 400:
+                    self.recordResponse(proxy['http'], response.status_code, len(response.content))
+                    self.retryPolicy.checkResponse(response.status_code, response.headers, response.text)
+                else:
+                    extractor = PlanExtractor(EXTRACTION_PLANS[pageType])
+                    decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+                    size = 0
+                    for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+                        size += len(chunk)
+                        start = time.perf_counter()
+                        found = extractor.feedChunk(decoder.decode(chunk))
+                        parsing += time.perf_counter() - start
+                        if found:
+                            aborted = True
+                            break
+                    else:
+                        start = time.perf_counter()
+                        extractor.feedChunk(decoder.decode(b'', True))
+                        parsing += time.perf_counter() - start
+                    self.recordResponse(proxy['http'], response.status_code, size)
+            finally:
+                response.close()
+            attributes['aborted'] = aborted
+        response.raise_for_status()
+        if aborted:
+            self.metrics.inc('stream_aborts_total', page_type=pageType)
+        start = time.perf_counter()
+        extraction = extractor.finish()
+        self.metrics.observe('parse_seconds', parsing + time.perf_counter() - start, page_type=pageType)
+        return extraction
+
+    def downloadHedged(self, link, headers):
+        """ This function sends a request and, if it has not answered after the delay of the hedge policy and the
+            budget allows it, the same request through another proxy. The first good response is used and the other
+            request is cancelled as soon as it gets its headers.
+
+        Attributes:
+            link: valid URL.
+            headers: Headers of the request.
+        Output: Response. Raises the exception of the last request if all of them fail.
+        """
+
+        policy = self.hedgePolicy
+        policy.startRequest()
+        answers = queue.Queue()
+        cancelled = threading.Event()
+        first = self.proxyPool.acquire()
+        states = [first]
+        threading.Thread(target=self.fetch, args=(first, link, headers, cancelled, answers), daemon=True).start()
+        try:
+            state, response, error = answers.get(timeout=policy.delay())
+        except queue.Empty:
+            if not policy.spend():
+                self.metrics.inc('hedges_skipped_total', reason='budget')
+            else:
+                second = self.proxyPool.acquire(block=False, exclude=states)
+                if second is None:
+                    policy.refund()
+                    self.metrics.inc('hedges_skipped_total', reason='no_proxy')
+                else:
+                    self.metrics.inc('hedges_total')
+                    states.append(second)
+                    threading.Thread(target=self.fetch, args=(second, link, headers, cancelled, answers),
+                                     daemon=True).start()
+            state, response, error = answers.get()
+        pending = len(states) - 1
+        while error is not None and pending:
+            state, response, error = answers.get()
+            pending -= 1
+        cancelled.set()
+        if error is not None:
+            raise error
+        if state is not first:
+            self.metrics.inc('hedge_wins_total')
+        return response
+
+    def fetch(self, state, link, headers, cancelled, answers):
+        """ This function sends one request of downloadHedged through a proxy and puts the answer in a queue. The
+            body is not read if the other request has already answered.
+
+        Attributes:
+            state: ProxyState taken from the pool, given back when the request ends.
+            link: valid URL.
+            headers: Headers of the request.
+            cancelled: Event set when the download does not need this request any more.
+            answers: Queue where the tuple (state, response, exception) is put.
+        """
+
+        proxy = state.proxy
+        start = time.monotonic()
+        try:
+            with self.metrics.measure('download', {'url': link}, proxy=proxy['http']):
+                response = requests.get(link, proxies=proxy, timeout=self.retryPolicy.timeout, headers=headers,
+                                        stream=True)
+                if cancelled.is_set():
+                    # Its latency is only the time to the headers, it is not counted in the pool or the policy.
+                    response.close()
+                    self.metrics.inc('hedges_cancelled_total')
+                    self.proxyPool.cancel(state)
+                    return
+                self.recordResponse(proxy['http'], response.status_code, len(response.content))
+                self.retryPolicy.checkResponse(response.status_code, response.headers, response.text)
+        except Exception as e:
+            self.proxyPool.release(state, time.monotonic() - start, False)
+            answers.put((state, None, e))
+            return
+        latency = time.monotonic() - start
+        self.proxyPool.release(state, latency, True)
+        self.hedgePolicy.record(latency)
+        answers.put((state, response, None))
+
+    def archivePage(self, link, html):
+        """ This function saves a page used by the crawler in the archive of the crawler, if it has one. Pages taken
+            from the cache are saved too, so the archive has every page of the crawl.
+
+        Attributes:
+            link: valid URL of the page.
+            html: HTML text of the page.
+        """
+
+        if self.archive is not None:
+            self.archive.write(link, self.type if '/search?' in link else 'Stats', html)
+
+    def recordResponse(self, proxy, status, size):
+        """ This function counts a response in the metrics.
+
+        Attributes:
+            proxy: 'http' address of the proxy of the request.
+            status: HTTP status of the response.
+            size: Bytes of the body of the response.
+        """
+
+        self.metrics.inc('downloads_total', proxy=proxy, status=str(status))
+        self.metrics.inc('download_bytes_total', size, proxy=proxy)
+
+    def recordRetry(self, attempt, exception, delay):
+        """ This function counts a failed attempt of a download in the metrics and prints it, if print_info is True.
+
+        Attributes:
+            attempt: Number of attempts done.
+            exception: Exception raised by the attempt.
+            delay: Seconds to wait before the next attempt.
+        """
+
+        self.metrics.inc('retries_total', error=type(exception).__name__)
+        if self.print_info:
+            print("ERROR: " + str(exception) + ". Attempt " + str(attempt) + ", trying again in " +
+                  str(round(delay, 2)) + " seconds.")
 
     def getURLs(self, html):
         """ This function extract the URLs of the HTML.
@@ -176,52 +536,223 @@ class GithubCrawler:
         Output: List of URL.
         """
 
-        result = []
-        soup = BeautifulSoup(html, 'html.parser')
-        soupFound = soup.find_all("a", {"class": CLASS_TO_SEARCH[self.type]})
-        if len(soupFound) != 0:
-            if self.type == 'Repositories':
-                with ThreadPoolExecutor() as executor:
-                    canContinue = True
-                    fase = []
-                    for i in range(0, len(soupFound)):
-                        if canContinue:
-                            if soupFound[i].get('href'):
-                                fase.append(executor.submit(self.getRepositoryInfoWithExtra, soupFound[i].get('href')))
-                            else:
-                                canContinue = False
-                        else:
-                            break
-                    if not canContinue:
-                        raise self.DataNotFoundException
-                    else:
-                        result = [f.result()[0] for f in as_completed(fase)]
-            else:
-                for i in range(0, len(soupFound)):
-                    if soupFound[i].get('href'):
-                        result += [{"url": GITHUB_URL + soupFound[i].get('href')}]
-                    else:
-                        raise self.DataNotFoundException
+        return list(self.iterURLs(self.parseLinks(html)))
+
+    def iterURLs(self, links, executor=None):
+        """ This function generates the URLs of a list of links, each one as soon as it is ready.
+
+        Attributes:
+            links: List of links without the GitHub domain, as returned by parseLinks.
+            executor: ThreadPoolExecutor used to get the extra info of the repositories. If not set, a new one is used.
+        Output: Generator of URL.
+        """
+
+        if not links:
+            yield {"url_not_found": "Not found any URL for this search."}
+            return
+
+        hits = Counter(links) if self.collapseDuplicates else None
+        if hits is not None:
+            links = list(hits)
+
+        if self.type == 'Repositories':
+            ownExecutor = executor is None
+            if ownExecutor:
+                executor = ThreadPoolExecutor(self.maxWorkers)
+            try:
+                fase = {executor.submit(self.getRepositoryResult, link): link for link in links}
+                for f in as_completed(fase):
+                    url = f.result()
+                    if hits is not None:
+                        url['hits'] = hits[fase[f]]
+                    yield url
+            finally:
+                if ownExecutor:
+                    executor.shutdown()
         else:
-            if not (soup.find("div", {"class": CLASS_TO_SEARCH['CheckIfThereIsResultIssue']})
-                    if self.type == 'Issues'
-                    else soup.find("div", {"class": CLASS_TO_SEARCH['CheckIfThereIsResultRepositoryAndWiki']})):
-                return [{"url_not_found": "Not found any URL for this search."}]
-            else:
-                raise self.DataNotFoundException
+            for link in links:
+                url = self.getLinkResult(link)
+                if hits is not None:
+                    url['hits'] = hits[link]
+                yield url
+
+    def getLinkResult(self, link):
+        """ This function builds the URL of a result that is not a repository.
+
+        Attributes:
+            link: valid github URL without 'https://github.com'.
+        Output: URL of the result.
+        """
+
+        return LinkResult(self.githubURL, link) if self.compactResults else {"url": self.githubURL + link}
+
+    def parseLinks(self, html):
+        """ This function extract the links of a search result page.
+
+        Attributes:
+            html: valid HTML text.
+        Output: List of links without the GitHub domain, i.e. /qiyuangong/leetcode. Empty if the search has no
+                results. Raises DataNotFoundException if the HTML is not the expected one.
+        """
+
+        return self.parseSearchPage(html)[0]
+
+    def parseSearchPage(self, html):
+        """ This function extract the links of a search result page and checks if there is a next page.
+
+        Attributes:
+            html: valid HTML text.
+        Output: Tuple with the list of links, as returned by parseLinks, and True if there is a next page.
+        """
+
+        return self.readSearchPage(self.extractPage(html, self.type))
+
+    def extractPage(self, html, pageType):
+        """ This function extracts the data of a page with the parser of the crawler, measuring the time it takes.
+
+        Attributes:
+            html: valid HTML text.
+            pageType: Key of the page type in EXTRACTION_PLANS.
+        Output: Extraction of the page.
+        """
+
+        with self.metrics.measure('parse', page_type=pageType):
+            return self.parser.extract(html, EXTRACTION_PLANS[pageType])
+
+    def readTotal(self, extraction):
+        """ This function reads the number of results of the search from the data extracted from a search page.
+
+        Attributes:
+            extraction: Extraction of the page with EXTRACTION_PLANS of the type of the crawler.
+        Output: Number of results of the search, None if the page has results but does not say how many.
+        """
 
-        return result
+        match = TOTAL_PATTERN.match(extraction.total or '')
+        if match is not None:
+            return int(match.group(1).replace(',', ''))
+        return None if extraction.links else 0
 
-    def generateURL(self):
+    def countResults(self):
+        """ This function downloads the first search page and reads the number of results of the search.
+
+        Output: Number of results of the search, None if the page does not say it.
+        """
+
+        return self.readTotal(self.retryPolicy.call(self.downloadPage, self.generateURL(), self.type,
+                                                    onRetry=self.recordRetry))
+
+    def readSearchPage(self, extraction):
+        """ This function reads the links of the data extracted from a search result page.
+
+        Attributes:
+            extraction: Extraction of the page with EXTRACTION_PLANS of the type of the crawler.
+        Output: Tuple with the list of links, as returned by parseLinks, and True if there is a next page.
+        """
+
+        if len(extraction.links) != 0:
+            if all(extraction.links):
+                return extraction.links, extraction.nextPage
+        elif not extraction.results:
+            return [], False
+        self.metrics.inc('data_not_found_total', page_type=self.type)
+        raise self.DataNotFoundException
+
+    def generateURL(self, page=1):
         """ This function generate a valid URL to downloaded.
 
+        Attributes:
+            page: Number of the search result page.
         Output: Valid URL (String).
         """
 
+        searchURL = GITHUB_SEARCH_URL if self.githubURL == GITHUB_URL else self.githubURL + '/search?q='
         if len(self.keywords) > 1:
-            return GITHUB_SEARCH_URL + "".join([str(_) + '+' for _ in self.keywords])[:-1] + '&type=' + self.type
+            url = searchURL + "".join([str(_) + '+' for _ in self.keywords])[:-1] + '&type=' + self.type
         else:
-            return GITHUB_SEARCH_URL + str(self.keywords[0]) + '&type=' + self.type
+            url = searchURL + str(self.keywords[0]) + '&type=' + self.type
+        return url + '&p=' + str(page) if page > 1 else url
+
+    def downloadSearchPage(self, page=1):
+        """ This function download a search result page, trying again as said by the retry policy.
+
+        Attributes:
+            page: Number of the search result page.
+        Output: HTML text of the page. Raises the last RequestException if the retry policy gives up.
+        """
+
+        return self.retryPolicy.call(self.downloadHTML, self.generateURL(page), onRetry=self.recordRetry)
+
+    def getSearchPage(self, page=1):
+        """ This function gets the links of a search result page, from the checkpoint if it is there and downloading
+            it if not.
+
+        Attributes:
+            page: Number of the search result page.
+        Output: Tuple with the list of links, as returned by parseLinks, and True if there is a next page.
+        """
+
+        url = self.generateURL(page)
+        searchPage = self.checkpoint.getPage(url) if self.checkpoint is not None else None
+        if searchPage is None:
+            searchPage = self.readSearchPage(self.retryPolicy.call(self.downloadPage, url, self.type,
+                                                                   onRetry=self.recordRetry))
+            if self.checkpoint is not None:
+                self.checkpoint.putPage(url, *searchPage)
+        return searchPage
+
+    def iterResults(self, maxPages=MAX_SEARCH_PAGES):
+        """ This function generates all the URLs of the search, page after page, each one as soon as it is ready. The
+            next search page is downloaded while the URLs of the current one are generated.
+
+        Attributes:
+            maxPages: Maximum number of search result pages to walk.
+        Output: Generator of URL of the search.
+        """
+
+        with ThreadPoolExecutor(max_workers=1) as prefetcher, ThreadPoolExecutor(self.maxWorkers) as executor:
+            page = 1
+            nextSearch = prefetcher.submit(self.getSearchPage, page)
+            while nextSearch is not None:
+                if self.print_info:
+                    print("SEARCHING: " + self.generateURL(page))
+                try:
+                    links, hasNextPage = nextSearch.result()
+                except (requests.exceptions.RequestException, self.DataNotFoundException) as e:
+                    if self.print_info:
+                        print("ERROR: " + str(e))
+                    yield {'error': str(e)}
+                    return
+                if not links and page > 1:
+                    return
+
+                page += 1
+                nextSearch = prefetcher.submit(self.getSearchPage, page) \
+                    if hasNextPage and page <= maxPages else None
+                yield from self.iterURLs(links, executor)
+
+    def runToSink(self, sink, maxPages=1):
+        """ This function writes the URLs of the search to a sink as soon as every one is ready, instead of keeping
+            them in a list.
+
+        Attributes:
+            sink: OutputSink where the URLs are written, i.e. NDJSONSink('results.ndjson.gz').
+            maxPages: Maximum number of search result pages to walk. By default only the first one, as run().
+        Output: Number of URLs written.
+        """
+
+        written = 0
+        for url in self.iterResults(maxPages):
+            sink.write(url)
+            written += 1
+        sink.flush()
+        return written
+
+    def stats(self):
+        """ Output: Dict with the counters and histograms of the metrics, the health of every proxy and the number of
+                   repositories shared by the memo.
+        """
+
+        return dict(self.metrics.snapshot(), proxies=self.proxyPool.stats(), memo_hits=self.memoHits)
 
     def run(self):
         """ Run function of the crawler. GitHub crawler that implements the GitHub search and returns all the links
@@ -230,32 +761,20 @@ class GithubCrawler:
         Output: List of URL of the search.
         """
 
-        attempts = self.totalAttempts
-        urlToSearch = self.generateURL()
-
         if self.print_info:
-            print("SEARCHING: " + str(urlToSearch))
-
-        while True:
-            try:
-                urls = self.getURLs(self.downloadHTML(urlToSearch))
-                if self.print_info:
-                    print("Result after " + str(self.totalAttempts - attempts) + " attempts.")
-                return urls
-            except requests.exceptions.RequestException:
-                if self.print_info:
-                    print("ERROR: " + str(sys.exc_info()[1]))
-                attempts -= 1
-                if attempts == 0:
-                    if self.print_info:
-                        print("FAIL after " + str(self.totalAttempts) + " attempts.")
-                    return [{
-                        'error': str(sys.exc_info()[1])
-                    }]
-            except self.DataNotFoundException as e:
-                if self.print_info:
-                    print("ERROR: " + str(e))
-                    print("FAIL after " + str(self.totalAttempts - attempts) + " attempts.")
-                return [{
-                    'error': str(e)
-                }]
+            print("SEARCHING: " + str(self.generateURL()))
+
+        try:
+            return list(self.iterURLs(self.getSearchPage()[0]))
+        except requests.exceptions.RequestException:
+            if self.print_info:
+                print("FAIL: " + str(sys.exc_info()[1]))
+            return [{
+                'error': str(sys.exc_info()[1])
+            }]
+        except self.DataNotFoundException as e:
+            if self.print_info:
+                print("ERROR: " + str(e))
+            return [{
+                'error': str(e)
+            }]
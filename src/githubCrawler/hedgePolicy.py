@@ -0,0 +1,94 @@
+import math
+import threading
+from collections import deque
+
+# Hedge policy configuration values
+DEFAULT_HEDGE_PERCENTILE = 95  # A request slower than this percentile of the recent ones is hedged
+DEFAULT_HEDGE_BUDGET = 0.1  # Hedges per request, so hedging adds at most 10% of traffic
+DEFAULT_MAX_BURST = 10  # Hedges saved by the budget that can be spent at once
+DEFAULT_INITIAL_DELAY = 1.0  # Seconds before a hedge while there are not enough latencies measured
+DEFAULT_MIN_DELAY = 0.01
+DEFAULT_MIN_SAMPLES = 20
+DEFAULT_LATENCY_WINDOW = 500
+
+
+class HedgePolicy:
+    """  Policy of hedged requests shared by the downloads of the crawlers. A request that has not answered after a
+         percentile of the recent latencies is sent again through another proxy, and the first good answer is used.
+         Every request adds `budget` to a token bucket and every hedge spends a whole token, so the hedges can never
+         be more than a fraction of the requests. Thread safe.
+    """
+
+    def __init__(self, percentile=DEFAULT_HEDGE_PERCENTILE, budget=DEFAULT_HEDGE_BUDGET, maxBurst=DEFAULT_MAX_BURST,
+                 initialDelay=DEFAULT_INITIAL_DELAY, minDelay=DEFAULT_MIN_DELAY, minSamples=DEFAULT_MIN_SAMPLES,
+                 window=DEFAULT_LATENCY_WINDOW):
+        """ Init function for the class.
+
+        Attributes:
+            percentile: Percentile of the recent latencies after which a request is hedged.
+            budget: Maximum number of hedges per request.
+            maxBurst: Maximum number of hedges saved in the bucket.
+            initialDelay: Seconds before a hedge while there are less than minSamples latencies.
+            minDelay: Minimum seconds before a hedge.
+            minSamples: Number of latencies needed to use the percentile.
+            window: Number of recent latencies kept.
+        """
+
+        self.percentile = percentile
+        self.budget = budget
+        self.maxBurst = maxBurst
+        self.initialDelay = initialDelay
+        self.minDelay = minDelay
+        self.minSamples = minSamples
+        self.latencies = deque(maxlen=window)
+        self.tokens = 0.0
+        self.requests = 0
+        self.hedges = 0
+        self.lock = threading.Lock()
+
+    def record(self, latency):
+        """ This function adds the latency of a successful request. """
+
+        with self.lock:
+            self.latencies.append(latency)
+
+    def delay(self):
+        """ Output: Seconds to wait for an answer before hedging a request. """
+
+        with self.lock:
+            if len(self.latencies) < self.minSamples:
+                return self.initialDelay
+            latencies = sorted(self.latencies)
+        return max(self.minDelay, latencies[max(0, math.ceil(self.percentile / 100 * len(latencies)) - 1)])
+
+    def startRequest(self):
+        """ This function adds a request to the budget of hedges. """
+
+        with self.lock:
+            self.requests += 1
+            self.tokens = min(self.maxBurst, self.tokens + self.budget)
+
+    def spend(self):
+        """ This function takes a hedge from the budget.
+
+        Output: True if the request can be hedged.
+        """
+
+        with self.lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            self.hedges += 1
+            return True
+
+    def refund(self):
+        """ This function gives back a hedge taken with spend that was not sent. """
+
+        with self.lock:
+            self.tokens = min(self.maxBurst, self.tokens + 1)
+            self.hedges -= 1
+
+    def stats(self):
+        """ Output: Dict with the number of requests and hedges and the current delay. """
+
+        return {'requests': self.requests, 'hedges': self.hedges, 'delay': self.delay()}
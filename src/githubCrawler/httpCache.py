@@ -0,0 +1,151 @@
+import time
+import zlib
+from .sqliteFile import SQLiteFile
+
+# Cache configuration values
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_MAX_SIZE = 512 * 1024 * 1024
+DEFAULT_COMPRESSION_LEVEL = 6
+
+
+class CacheEntry:
+    """  Page stored in the cache """
+
+    __slots__ = ('url', 'text', 'etag', 'lastModified', 'storedAt')
+
+    def __init__(self, url, text, etag, lastModified, storedAt):
+        """ Init function for the class.
+
+        Attributes:
+            url: URL of the page.
+            text: HTML text of the page.
+            etag: ETag header of the response, None if there was not.
+            lastModified: Last-Modified header of the response, None if there was not.
+            storedAt: time.time() when the page was downloaded or revalidated for the last time.
+        """
+
+        self.url = url
+        self.text = text
+        self.etag = etag
+        self.lastModified = lastModified
+        self.storedAt = storedAt
+
+
+class HTTPCache(SQLiteFile):
+    """  Disk cache of downloaded pages. Pages are stored compressed in a SQLite file, so the same cache can be shared
+         by several processes. A page is used without asking GitHub while it is younger than the TTL; after that it is
+         revalidated with If-None-Match / If-Modified-Since. When the cache is bigger than its maximum size the least
+         recently used pages are removed.
+    """
+
+    def __init__(self, path, ttl=DEFAULT_TTL, maxSize=DEFAULT_MAX_SIZE, compressionLevel=DEFAULT_COMPRESSION_LEVEL):
+        """ Init function for the class.
+
+        Attributes:
+            path: Link of the SQLite file of the cache, created if it does not exist.
+            ttl: Seconds a page is used without revalidating it.
+            maxSize: Maximum bytes of compressed pages in the cache.
+            compressionLevel: zlib compression level of the pages.
+        """
+
+        self.ttl = ttl
+        self.maxSize = maxSize
+        self.compressionLevel = compressionLevel
+        super().__init__(path, """
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                etag TEXT,
+                lastModified TEXT,
+                storedAt REAL NOT NULL,
+                accessedAt REAL NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS pagesAccessedAt ON pages (accessedAt);
+        """)
+
+    def get(self, url):
+        """ This function gets a page of the cache, fresh or not.
+
+        Attributes:
+            url: URL of the page.
+        Output: CacheEntry of the page, None if it is not in the cache.
+        """
+
+        connection = self.connection()
+        row = connection.execute('SELECT body, etag, lastModified, storedAt FROM pages WHERE url = ?',
+                                 (url,)).fetchone()
+        if row is None:
+            return None
+        connection.execute('UPDATE pages SET accessedAt = ? WHERE url = ?', (time.time(), url))
+        return CacheEntry(url, zlib.decompress(row[0]).decode('utf8'), row[1], row[2], row[3])
+
+    def isFresh(self, entry):
+        """ Output: True if the page can be used without revalidating it. """
+
+        return time.time() - entry.storedAt < self.ttl
+
+    def validators(self, entry):
+        """ Output: Headers to revalidate the page with a conditional request. """
+
+        headers = {}
+        if entry is not None and entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry is not None and entry.lastModified:
+            headers['If-Modified-Since'] = entry.lastModified
+        return headers
+
+    def put(self, url, text, headers):
+        """ This function stores a downloaded page and removes the least recently used pages if the cache is too big.
+
+        Attributes:
+            url: URL of the page.
+            text: HTML text of the page.
+            headers: Headers of the response.
+        """
+
+        body = zlib.compress(text.encode('utf8'), self.compressionLevel)
+        now = time.time()
+        connection = self.connection()
+        connection.execute('INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?)',
+                           (url, body, headers.get('ETag'), headers.get('Last-Modified'), now, now, len(body)))
+        self.evict()
+
+    def refresh(self, url):
+        """ This function marks a page as fresh again, after GitHub answered 304 Not Modified.
+
+        Attributes:
+            url: URL of the page.
+        """
+
+        now = time.time()
+        self.connection().execute('UPDATE pages SET storedAt = ?, accessedAt = ? WHERE url = ?', (now, now, url))
+
+    def evict(self):
+        """ This function removes the least recently used pages until the cache is smaller than its maximum size. """
+
+        connection = self.connection()
+        size = connection.execute('SELECT COALESCE(SUM(size), 0) FROM pages').fetchone()[0]
+        if size <= self.maxSize:
+            return
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            for url, pageSize in connection.execute('SELECT url, size FROM pages ORDER BY accessedAt').fetchall():
+                if size <= self.maxSize:
+                    break
+                connection.execute('DELETE FROM pages WHERE url = ?', (url,))
+                size -= pageSize
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+
+    def size(self):
+        """ Output: Bytes of compressed pages in the cache. """
+
+        return self.connection().execute('SELECT COALESCE(SUM(size), 0) FROM pages').fetchone()[0]
+
+    def clear(self):
+        """ This function removes all the pages of the cache. """
+
+        self.connection().execute('DELETE FROM pages')
@@ -0,0 +1,296 @@
+import bisect
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+# Metrics configuration values
+METRICS_PREFIX = 'githubcrawler_'
+SECONDS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Histogram:
+    """  Distribution of the values of a metric in fixed buckets, as Prometheus does """
+
+    __slots__ = ('buckets', 'counts', 'count', 'sum')
+
+    def __init__(self, buckets=SECONDS_BUCKETS):
+        """ Init function for the class.
+
+        Attributes:
+            buckets: Sorted upper bounds of the buckets. Values bigger than the last one go to +Inf.
+        """
+
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        """ This function adds a value to the histogram. """
+
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        """ Output: List of tuples (upper bound, number of values lower or equal), the last upper bound is '+Inf'. """
+
+        total = 0
+        result = []
+        for bound, count in zip(list(self.buckets) + ['+Inf'], self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def toDict(self):
+        """ Output: Dict with the count, the sum and the cumulative buckets of the histogram. """
+
+        return {'count': self.count, 'sum': self.sum,
+                'buckets': {str(bound): count for bound, count in self.cumulative()}}
+
+
+def formatLabels(labels, extra=()):
+    """ Output: Labels in the Prometheus text format, i.e. {proxy="http://1.1.1.1:80",status="200"}. """
+
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(name + '="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+                          + '"' for name, value in pairs) + '}'
+
+
+class CrawlerMetrics:
+    """  Counters and histograms of a crawl: downloads and their latency per proxy, bytes, retries, cache use, parse
+         time per page type and pages where the data was not found. Every measure can also be sent as a tracing span
+         to the hooks, when there are hooks. Thread safe, one object can be shared by several crawlers.
+    """
+
+    def __init__(self, buckets=SECONDS_BUCKETS):
+        """ Init function for the class.
+
+        Attributes:
+            buckets: Upper bounds in seconds of the buckets of the histograms.
+        """
+
+        self.buckets = buckets
+        self.counters = {}
+        self.histograms = {}
+        self.hooks = []
+        self.lock = threading.Lock()
+
+    def inc(self, name, value=1, **labels):
+        """ This function adds a value to a counter.
+
+        Attributes:
+            name: Name of the counter, i.e. 'retries_total'.
+            value: Value to add.
+            labels: Labels of the counter, i.e. proxy='http://1.1.1.1:80'.
+        """
+
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        """ This function adds a value to a histogram.
+
+        Attributes:
+            name: Name of the histogram, i.e. 'download_seconds'.
+            value: Value to add.
+            labels: Labels of the histogram.
+        """
+
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def counter(self, name, **labels):
+        """ Output: Value of a counter, 0 if it has never been increased. """
+
+        return self.counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def histogram(self, name, **labels):
+        """ Output: Histogram, None if it has no values. """
+
+        return self.histograms.get((name, tuple(sorted(labels.items()))))
+
+    def addHook(self, hook):
+        """ This function turns on the tracing: the hook is called with a span, a dict with 'name', 'labels',
+            'attributes', 'start' (time.time()), 'duration' in seconds and 'error' (None if it worked), every time a
+            measure ends.
+
+        Attributes:
+            hook: Function that gets the span.
+        """
+
+        with self.lock:
+            self.hooks = self.hooks + [hook]
+
+    def removeHook(self, hook):
+        """ This function removes a hook added with addHook. """
+
+        with self.lock:
+            self.hooks = [other for other in self.hooks if other != hook]
+
+    @contextmanager
+    def measure(self, stage, attributes=None, **labels):
+        """ This function measures the seconds of a stage, i.e. a download, in the histogram '<stage>_seconds'. If the
+            stage raises an exception, it is counted in 'errors_total'.
+
+        Attributes:
+            stage: Name of the stage, i.e. 'download' or 'parse'.
+            attributes: Dict of data of the span that are not labels, i.e. the URL. More can be added inside the block.
+            labels: Labels of the histogram.
+        Output: Dict of attributes of the span.
+        """
+
+        attributes = attributes if attributes is not None else {}
+        startTime = time.time()
+        start = time.perf_counter()
+        error = None
+        try:
+            yield attributes
+        except BaseException as e:
+            error = e
+            self.inc('errors_total', stage=stage, error=type(e).__name__, **labels)
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            self.observe(stage + '_seconds', duration, **labels)
+            hooks = self.hooks
+            if hooks:
+                span = {'name': stage, 'labels': labels, 'attributes': attributes, 'start': startTime,
+                        'duration': duration, 'error': repr(error) if error is not None else None}
+                for hook in hooks:
+                    hook(span)
+
+    def snapshot(self):
+        """ Output: Dict with the value of every counter and histogram, ready to be saved as JSON. """
+
+        with self.lock:
+            counters = {}
+            for (name, labels), value in sorted(self.counters.items()):
+                counters.setdefault(name, []).append({'labels': dict(labels), 'value': value})
+            histograms = {}
+            for (name, labels), histogram in sorted(self.histograms.items(), key=lambda item: item[0]):
+                histograms.setdefault(name, []).append(dict(histogram.toDict(), labels=dict(labels)))
+        return {'counters': counters, 'histograms': histograms}
+
+    def toJSON(self):
+        """ Output: snapshot as a JSON string. """
+
+        return json.dumps(self.snapshot())
+
+    def toPrometheus(self):
+        """ Output: All the metrics in the Prometheus text exposition format. """
+
+        lines = []
+        with self.lock:
+            previous = None
+            for (name, labels), value in sorted(self.counters.items()):
+                if name != previous:
+                    lines.append('# TYPE ' + METRICS_PREFIX + name + ' counter')
+                    previous = name
+                lines.append(METRICS_PREFIX + name + formatLabels(labels) + ' ' + str(value))
+            previous = None
+            for (name, labels), histogram in sorted(self.histograms.items(), key=lambda item: item[0]):
+                if name != previous:
+                    lines.append('# TYPE ' + METRICS_PREFIX + name + ' histogram')
+                    previous = name
+                for bound, count in histogram.cumulative():
+                    lines.append(METRICS_PREFIX + name + '_bucket' + formatLabels(labels, [('le', bound)]) + ' ' +
+                                 str(count))
+                lines.append(METRICS_PREFIX + name + '_sum' + formatLabels(labels) + ' ' + str(histogram.sum))
+                lines.append(METRICS_PREFIX + name + '_count' + formatLabels(labels) + ' ' + str(histogram.count))
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port=0, host='127.0.0.1'):
+        """ This function starts a MetricsServer for these metrics.
+
+        Attributes:
+            port: Port of the server, 0 to choose a free one.
+            host: Address the server listens on.
+        Output: MetricsServer, already running.
+        """
+
+        return MetricsServer(self, port, host).start()
+
+
+class MetricsServer:
+    """  HTTP endpoint of the metrics of a crawl: /metrics in the Prometheus text format and /metrics.json as JSON.
+         Runs in a background thread. http.server is only imported when a server is created, as every crawler
+         imports this module.
+    """
+
+    def __init__(self, metrics, port=0, host='127.0.0.1'):
+        """ Init function for the class.
+
+        Attributes:
+            metrics: CrawlerMetrics to publish.
+            port: Port of the server, 0 to choose a free one.
+            host: Address the server listens on.
+        """
+
+        from http.server import ThreadingHTTPServer
+
+        self.metrics = metrics
+        self.server = ThreadingHTTPServer((host, port), self.handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        """ Output: Base URL of the server. """
+
+        host, port = self.server.server_address[:2]
+        return 'http://' + host + ':' + str(port)
+
+    def handler(self):
+        from http.server import BaseHTTPRequestHandler
+
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/metrics':
+                    body, contentType = metrics.toPrometheus(), PROMETHEUS_CONTENT_TYPE
+                elif self.path == '/metrics.json':
+                    body, contentType = metrics.toJSON(), 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                body = body.encode('utf8')
+                self.send_response(200)
+                self.send_header('Content-Type', contentType)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        """ This function starts the server, if it is not running yet. Output: the server. """
+
+        if not self.thread.is_alive():
+            self.thread.start()
+        return self
+
+    def stop(self):
+        """ This function stops the server. """
+
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
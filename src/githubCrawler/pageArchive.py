@@ -0,0 +1,288 @@
+import argparse
+import gzip
+import json
+import math
+import mmap
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from .githubCrawler import GithubCrawler, GITHUB_URL
+from .parsers import DEFAULT_PARSER, getParser
+from .sinks import openSink
+
+# Archive configuration values
+DEFAULT_SEGMENT_BYTES = 64 * 1024 * 1024  # Compressed bytes of a segment before a new one is started
+DEFAULT_COMPRESSION_LEVEL = 6
+SEGMENT_PREFIX = 'pages-'
+SEGMENT_EXTENSION = '.warc.gz'
+INDEX_FILE = 'index.ndjson'
+REPLAY_CHUNKS_PER_PROCESS = 4  # Tasks of the replay for every process, so the pages of a segment are shared by all
+REPLAY_INPUT = {'keywords': ['replay'], 'proxies': ['127.0.0.1:9']}  # Nothing is downloaded while replaying
+
+
+def writeRecord(url, pageType, html, date):
+    """ This function builds a WARC-like record of a page.
+
+    Attributes:
+        url: URL of the page.
+        pageType: Type of the page, the type of the search or 'Stats' for a repository page.
+        html: HTML text of the page.
+        date: Time of the download, as time.time().
+    Output: Bytes of the record.
+    """
+
+    body = html.encode('utf8')
+    headers = ['WARC/1.0', 'WARC-Type: response', 'WARC-Target-URI: ' + url, 'WARC-Page-Type: ' + pageType,
+               'WARC-Date: ' + time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(date)),
+               'Content-Length: ' + str(len(body))]
+    return ('\r\n'.join(headers) + '\r\n\r\n').encode('utf8') + body + b'\r\n\r\n'
+
+
+def readRecord(record):
+    """ This function reads a record built by writeRecord.
+
+    Attributes:
+        record: Bytes of the record.
+    Output: Tuple with the dict of headers and the HTML text of the page.
+    """
+
+    head, _, body = record.partition(b'\r\n\r\n')
+    headers = dict(line.split(': ', 1) for line in head.decode('utf8').split('\r\n')[1:])
+    return headers, body[:int(headers['Content-Length'])].decode('utf8')
+
+
+class PageArchive:
+    """  Archive of every page downloaded by a crawler, in WARC-like segment files where every record is a gzip member
+         of its own, and an index with the segment, offset and length of every record. The archive can be replayed to
+         extract the pages again with a fixed or new parser, without network or proxies.
+
+         Usage: `GithubCrawler('input.json', archive=PageArchive('archive'))`
+    """
+
+    def __init__(self, directory, segmentBytes=DEFAULT_SEGMENT_BYTES, compressionLevel=DEFAULT_COMPRESSION_LEVEL):
+        """ Init function for the class.
+
+        Attributes:
+            directory: Link of the directory of the archive, created if it does not exist. Pages are added to the
+                       pages already there, in a new segment.
+            segmentBytes: Compressed bytes of a segment before a new one is started.
+            compressionLevel: Level of the gzip compression.
+        """
+
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.segmentBytes = segmentBytes
+        self.compressionLevel = compressionLevel
+        self.segments = len([name for name in os.listdir(directory) if name.startswith(SEGMENT_PREFIX)])
+        self.segment = None
+        self.index = None
+        self.lock = threading.Lock()
+
+    def openSegment(self):
+        """ This function closes the current segment and starts the next one. Must be called holding the lock. """
+
+        if self.segment is not None:
+            self.segment.close()
+        self.segments += 1
+        self.segment = open(os.path.join(self.directory, SEGMENT_PREFIX + str(self.segments).zfill(5) +
+                                         SEGMENT_EXTENSION), 'ab')
+
+    def write(self, url, pageType, html):
+        """ This function adds a page to the archive.
+
+        Attributes:
+            url: URL of the page.
+            pageType: Type of the page, the type of the search or 'Stats' for a repository page.
+            html: HTML text of the page.
+        """
+
+        date = time.time()
+        record = gzip.compress(writeRecord(url, pageType, html, date), self.compressionLevel)
+        with self.lock:
+            if self.segment is None or self.segment.tell() >= self.segmentBytes:
+                self.openSegment()
+            if self.index is None:
+                self.index = open(os.path.join(self.directory, INDEX_FILE), 'a', encoding='utf8')
+            offset = self.segment.tell()
+            self.segment.write(record)
+            self.segment.flush()
+            self.index.write(json.dumps({'url': url, 'type': pageType, 'segment': os.path.basename(self.segment.name),
+                                         'offset': offset, 'length': len(record), 'date': date}) + '\n')
+            self.index.flush()
+
+    def close(self):
+        """ This function closes the files of the archive. """
+
+        with self.lock:
+            for file in (self.segment, self.index):
+                if file is not None:
+                    file.close()
+            self.segment = self.index = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def entries(self):
+        """ Output: List of index dicts with 'url', 'type', 'segment', 'offset', 'length' and 'date' of every page. """
+
+        path = os.path.join(self.directory, INDEX_FILE)
+        if not os.path.exists(path):
+            return []
+        with open(path, encoding='utf8') as file:
+            return [json.loads(line) for line in file if line.strip()]
+
+    def read(self, entry):
+        """ This function reads a page of the archive.
+
+        Attributes:
+            entry: Index dict of the page, as returned by entries.
+        Output: HTML text of the page.
+        """
+
+        with open(os.path.join(self.directory, entry['segment']), 'rb') as file:
+            file.seek(entry['offset'])
+            return readRecord(gzip.decompress(file.read(entry['length'])))[1]
+
+    def replay(self, parser=DEFAULT_PARSER, processes=None, githubURL=GITHUB_URL):
+        """ This function extracts all the pages of the archive again in a pool of processes. The pages are split in
+            chunks of a single segment, so the processes share the pages even if there is only one segment.
+
+        Attributes:
+            parser: Name of the HTML extraction backend or a picklable ParserBackend.
+            processes: Number of processes, one for every core if not set.
+            githubURL: Base URL of GitHub of the crawl.
+        Output: Generator of page dicts with 'url' and 'type' and, for search pages, 'links' and 'next_page', for
+                repository pages 'language_stats', or 'error' if the data is not found.
+        """
+
+        processes = processes or os.cpu_count() or 1
+        parser = getParser(parser)
+        with ProcessPoolExecutor(processes) as executor:
+            futures = [executor.submit(replaySegment, os.path.join(self.directory, segment), entries, parser,
+                                       githubURL) for segment, entries in chunkEntries(self.entries(), processes)]
+            for future in futures:
+                yield from future.result()
+
+    def replaySearch(self, parser=DEFAULT_PARSER, processes=None, githubURL=GITHUB_URL):
+        """ This function rebuilds the results of the searches of the archive, as returned by the crawler, with the
+            repository pages of the archive. The last download of every page is used.
+
+        Attributes:
+            parser: Name of the HTML extraction backend or a picklable ParserBackend.
+            processes: Number of processes, one for every core if not set.
+            githubURL: Base URL of GitHub of the crawl.
+        Output: Dict of search page URL to list of URL of the page.
+        """
+
+        searches = {}
+        stats = {}
+        for page in self.replay(parser, processes, githubURL):
+            if page['type'] == 'Stats':
+                stats[page['url']] = page.get('language_stats', page.get('error'))
+            else:
+                searches[page['url']] = page
+        crawler = replayCrawler('Repositories', parser, githubURL)
+        results = {}
+        for url, page in searches.items():
+            if 'error' in page:
+                results[url] = [{'error': page['error']}]
+            elif not page['links']:
+                results[url] = [{"url_not_found": "Not found any URL for this search."}]
+            elif page['type'] != 'Repositories':
+                results[url] = [{'url': githubURL + link} for link in page['links']]
+            else:
+                results[url] = [crawler.getRepositoryInfo(link, stats.get(githubURL + link,
+                                                                          {'error': 'Page not in the archive.'}))
+                                for link in page['links']]
+        return results
+
+
+def chunkEntries(entries, processes):
+    """ This function splits the pages of an archive in the tasks of the replay.
+
+    Attributes:
+        entries: Index dicts of the pages, as returned by PageArchive.entries.
+        processes: Number of processes of the replay.
+    Output: List of tuples with the segment and a list of index dicts of that segment, ordered by segment and then
+            as in the index.
+    """
+
+    bySegment = {}
+    for entry in entries:
+        bySegment.setdefault(entry['segment'], []).append(entry)
+    size = max(1, math.ceil(len(entries) / (processes * REPLAY_CHUNKS_PER_PROCESS)))
+    return [(segment, pages[start:start + size]) for segment, pages in sorted(bySegment.items())
+            for start in range(0, len(pages), size)]
+
+
+def replayCrawler(pageType, parser, githubURL):
+    """ Output: GithubCrawler used to extract the pages of a type, without proxies to download. """
+
+    return GithubCrawler(dict(REPLAY_INPUT, type=pageType if pageType != 'Stats' else 'Repositories'),
+                         githubURL=githubURL, parser=parser)
+
+
+def replaySegment(path, entries, parser, githubURL):
+    """ This function extracts pages of a segment, reading it as a memory map. It runs in the processes of replay.
+
+    Attributes:
+        path: Link of the segment.
+        entries: Index dicts of the pages to extract, all of them of the segment.
+        parser: ParserBackend.
+        githubURL: Base URL of GitHub of the crawl.
+    Output: List of page dicts.
+    """
+
+    crawlers = {}
+    pages = []
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as segment:
+        for entry in entries:
+            _, html = readRecord(gzip.decompress(segment[entry['offset']:entry['offset'] + entry['length']]))
+            pageType = entry['type']
+            crawler = crawlers.get(pageType)
+            if crawler is None:
+                crawler = crawlers[pageType] = replayCrawler(pageType, parser, githubURL)
+            page = {'url': entry['url'], 'type': pageType}
+            if pageType == 'Stats':
+                page['language_stats'] = crawler.parseLanguageStats(html)
+            else:
+                try:
+                    page['links'], page['next_page'] = crawler.parseSearchPage(html)
+                except GithubCrawler.DataNotFoundException as e:
+                    page['error'] = e.message
+            pages.append(page)
+    return pages
+
+
+def main(arguments=None):
+    """ This function replays an archive from the command line and writes one JSON line per page:
+        `python -m githubCrawler.src.githubCrawler.pageArchive archive --parser lxml --output pages.ndjson`
+
+    Attributes:
+        arguments: List of command line arguments. If not set, the ones of sys.argv.
+    Output: Exit code.
+    """
+
+    parser = argparse.ArgumentParser(description='Extracts the pages of an archive again, without downloading them')
+    parser.add_argument('directory', help='directory of the archive')
+    parser.add_argument('--parser', default=DEFAULT_PARSER)
+    parser.add_argument('--processes', type=int, help='parse processes, one for every core if not set')
+    parser.add_argument('--github-url', default=GITHUB_URL)
+    parser.add_argument('--output', help='file to write the pages, compressed if it ends in .gz or .zst. stdout if '
+                                         'not set')
+    arguments = parser.parse_args(arguments)
+
+    with openSink(arguments.output) as sink:
+        for page in PageArchive(arguments.directory).replay(arguments.parser, arguments.processes,
+                                                            arguments.github_url):
+            sink.write(page)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,388 @@
+import time
+from functools import lru_cache
+from html.parser import HTMLParser
+
+# Fields an extraction plan can collect
+LINKS = 'links'
+NEXT_PAGE = 'nextPage'
+RESULTS = 'results'
+LANGUAGES = 'languages'
+TOTAL = 'total'
+
+
+def hasClass(value, target):
+    """ This function checks a class attribute as BeautifulSoup does: a single class has to be one of the classes of
+        the tag, several classes separated by spaces have to be exactly the classes of the tag.
+
+    Attributes:
+        value: class attribute of the tag, None if the tag has not.
+        target: class to search.
+    Output: True if the tag matches.
+    """
+
+    if value is None:
+        return False
+    if ' ' in target:
+        return ' '.join(value.split()) == target
+    return target in value.split()
+
+
+def classXPath(target):
+    """ Output: XPath condition equivalent to hasClass. """
+
+    if ' ' in target:
+        return "normalize-space(@class) = '" + target + "'"
+    return "contains(concat(' ', normalize-space(@class), ' '), ' " + target + " ')"
+
+
+class ExtractionPlan:
+    """  Rules to extract everything a page type needs in one traversal of the document, compiled once. Every rule
+         is a tag, a class and the field it fills. The plan can also say when the rest of the document is not needed:
+         when the container with stopClass or emptyClass closes, or when the stopTag around the first match closes.
+    """
+
+    def __init__(self, rules, stopTag=None, stopClass=None, emptyClass=None):
+        """ Init function for the class.
+
+        Attributes:
+            rules: List of tuples (tag, class, field), field is LINKS, NEXT_PAGE, RESULTS or LANGUAGES.
+            stopTag: Tag of the container of the matches. Extraction stops when it closes.
+            stopClass: Class of the last container of the page that is needed. Extraction stops when it closes.
+            emptyClass: Class of the container shown instead when the page has no data. Extraction stops when it
+                        closes.
+        """
+
+        self.rules = rules
+        self.stopTag = stopTag
+        self.stopClass = stopClass
+        self.emptyClass = emptyClass
+        self.rulesByTag = {}
+        for tag, target, field in rules:
+            # The first class is checked as a plain substring before splitting the attribute, most tags fail there.
+            self.rulesByTag.setdefault(tag, []).append((target.split()[0], target, field))
+        self.xpath = ' | '.join('//' + tag + '[' + ' or '.join(classXPath(target) for _, target, _ in tagRules) + ']'
+                                for tag, tagRules in self.rulesByTag.items())
+
+    def match(self, tag, value):
+        """ This function finds the rule of a tag.
+
+        Attributes:
+            tag: Name of the tag.
+            value: class attribute of the tag, None if the tag has not.
+        Output: Field of the first rule the tag matches, None if it matches none.
+        """
+
+        if value is None:
+            return None
+        for prefix, target, field in self.rulesByTag.get(tag, ()):
+            if prefix in value and hasClass(value, target):
+                return field
+        return None
+
+
+@lru_cache(maxsize=None)
+def searchPlan(linkClass, resultClass, nextPageClass, paginationClass=None, emptyClass=None):
+    """ This function compiles the extraction plan of a search result page.
+
+    Attributes:
+        linkClass: class of the result links.
+        resultClass: class of the container of the results.
+        nextPageClass: class of the link to the next page.
+        paginationClass: class of the pagination, the last part of the page that is needed.
+        emptyClass: class of the message shown when the search has no results.
+    Output: ExtractionPlan.
+    """
+
+    return ExtractionPlan([('a', linkClass, LINKS), ('a', nextPageClass, NEXT_PAGE), ('div', resultClass, RESULTS)],
+                          stopClass=paginationClass, emptyClass=emptyClass)
+
+
+@lru_cache(maxsize=None)
+def statsPlan(statsClass):
+    """ This function compiles the extraction plan of the language stats of a repository page.
+
+    Attributes:
+        statsClass: class of the list item of every language.
+    Output: ExtractionPlan.
+    """
+
+    return ExtractionPlan([('li', statsClass, LANGUAGES)], stopTag='ul')
+
+
+class Extraction:
+    """  Data extracted from a page with an ExtractionPlan. total is the text of the first h3 of the container of the
+         results, where GitHub writes the number of results, i.e. '16,318 repository results'.
+    """
+
+    __slots__ = (LINKS, NEXT_PAGE, RESULTS, LANGUAGES, TOTAL)
+
+    def __init__(self):
+        self.links = []
+        self.nextPage = False
+        self.results = False
+        self.languages = []
+        self.total = None
+
+
+class ParserBackend:
+    """  Interface of the HTML extraction backends. A backend only extracts the data of the page, the crawler decides
+         what the data means.
+    """
+
+    name = None
+
+    def extract(self, html, plan):
+        """ This function extracts the data of a page in one traversal of the document.
+
+        Attributes:
+            html: valid HTML text.
+            plan: ExtractionPlan of the page.
+        Output: Extraction.
+        """
+
+        raise NotImplementedError
+
+
+class BeautifulSoupBackend(ParserBackend):
+    """  Backend that builds the full BeautifulSoup tree of the page. bs4 is only imported when the backend is used,
+         so the crawler starts without it with the other backends.
+    """
+
+    name = 'beautifulsoup'
+
+    def __init__(self, features='html.parser'):
+        """ Init function for the class.
+
+        Attributes:
+            features: Parser used by BeautifulSoup.
+        """
+
+        self.features = features
+
+    def extract(self, html, plan):
+        from bs4 import BeautifulSoup
+
+        extraction = Extraction()
+        for tag in BeautifulSoup(html, self.features).find_all(list(plan.rulesByTag)):
+            field = plan.match(tag.name, tag.get('class') and ' '.join(tag.get('class')))
+            if field == LINKS:
+                extraction.links.append(tag.get('href'))
+            elif field == LANGUAGES:
+                extraction.languages.append([span.text for span in tag.find_all("span")])
+            elif field is not None:
+                if field == RESULTS and not extraction.results and tag.find('h3') is not None:
+                    extraction.total = tag.find('h3').text
+                setattr(extraction, field, True)
+        return extraction
+
+
+class StopExtraction(Exception):
+    """Exception raised by PlanExtractor when the rest of the document is not needed."""
+
+
+class PlanExtractor(HTMLParser):
+    """  html.parser handler that follows an ExtractionPlan without building a tree. It can be fed in chunks and
+         raises StopExtraction as soon as the plan has everything it needs.
+    """
+
+    def __init__(self, plan):
+        super().__init__()
+        self.plan = plan
+        self.extraction = Extraction()
+        self.language = None
+        self.languageDepth = 0
+        self.openSpans = []
+        self.stopDepth = None
+        self.stopTag = plan.stopTag or 'div'
+        self.total = []
+        self.totalState = None  # 'waiting' for the h3 after the container of the results, 'reading' it, or 'read'
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        if self.stopDepth is not None:
+            if tag == self.stopTag:
+                self.stopDepth += 1
+        elif tag == 'div' and (self.plan.stopClass is not None or self.plan.emptyClass is not None):
+            value = dict(attrs).get('class')
+            if any(target is not None and hasClass(value, target)
+                   for target in (self.plan.stopClass, self.plan.emptyClass)):
+                self.stopDepth = 0
+
+        if self.language is not None:
+            if tag == 'span':
+                self.language.append([])
+                self.openSpans.append(self.language[-1])
+            elif tag == 'li':
+                self.languageDepth += 1
+            return
+        if tag == 'h3' and self.totalState == 'waiting':
+            self.totalState = 'reading'
+            self.openSpans.append(self.total)
+
+        if tag not in self.plan.rulesByTag:
+            return
+        attributes = dict(attrs)
+        field = self.plan.match(tag, attributes.get('class'))
+        if field == LINKS:
+            self.extraction.links.append(attributes.get('href'))
+        elif field == LANGUAGES:
+            self.language = []
+            self.languageDepth = 1
+            if self.stopDepth is None and self.plan.stopTag is not None:
+                self.stopDepth = 0
+        elif field is not None:
+            if field == RESULTS and self.totalState is None:
+                self.totalState = 'waiting'
+            setattr(self.extraction, field, True)
+
+    def handle_endtag(self, tag):
+        if tag == 'h3' and self.totalState == 'reading':
+            self.totalState = 'read'
+            self.openSpans = [texts for texts in self.openSpans if texts is not self.total]
+            self.extraction.total = ''.join(self.total)
+        if self.language is not None:
+            if tag == 'span' and self.openSpans:
+                self.openSpans.pop()
+            elif tag == 'li':
+                self.languageDepth -= 1
+                if self.languageDepth == 0:
+                    self.extraction.languages.append([''.join(texts) for texts in self.language])
+                    self.language = None
+                    self.openSpans = []
+
+        if self.stopDepth is not None and tag == self.stopTag:
+            self.stopDepth -= 1
+            if self.stopDepth < 0:
+                self.done = True
+                raise StopExtraction
+
+    def handle_data(self, data):
+        for texts in self.openSpans:
+            texts.append(data)
+
+    def feedChunk(self, chunk):
+        """ This function feeds a part of the document.
+
+        Attributes:
+            chunk: HTML text.
+        Output: True if the plan has everything it needs and the rest of the document can be skipped.
+        """
+
+        if not self.done:
+            try:
+                self.feed(chunk)
+            except StopExtraction:
+                pass
+        return self.done
+
+    def finish(self):
+        """ Output: Extraction, once the whole document or the part the plan needs has been fed. """
+
+        if not self.done:
+            try:
+                self.close()
+            except StopExtraction:
+                pass
+        return self.extraction
+
+
+class StreamingBackend(ParserBackend):
+    """  Backend that reads the page with the html.parser of the standard library, keeping only the data it needs and
+         stopping as soon as the plan has everything.
+    """
+
+    name = 'streaming'
+
+    def extract(self, html, plan):
+        extractor = PlanExtractor(plan)
+        extractor.feedChunk(html)
+        return extractor.finish()
+
+
+class LxmlBackend(ParserBackend):
+    """  Backend that uses the C parser of lxml. To download: `pip install lxml` """
+
+    name = 'lxml'
+
+    def __init__(self):
+        try:
+            import lxml.html  # noqa: F401
+        except ImportError:
+            raise ImportError("LxmlBackend needs lxml. To download: `pip install lxml`")
+
+    def extract(self, html, plan):
+        import lxml.html
+
+        extraction = Extraction()
+        for element in lxml.html.document_fromstring(html).xpath(plan.xpath):
+            field = plan.match(element.tag, element.get('class'))
+            if field == LINKS:
+                extraction.links.append(element.get('href'))
+            elif field == LANGUAGES:
+                extraction.languages.append([span.text_content() for span in element.xpath('.//span')])
+            elif field is not None:
+                if field == RESULTS and not extraction.results and element.xpath('.//h3'):
+                    extraction.total = element.xpath('.//h3')[0].text_content()
+                setattr(extraction, field, True)
+        return extraction
+
+
+# Backends available by name
+PARSERS = {
+    BeautifulSoupBackend.name: BeautifulSoupBackend,
+    StreamingBackend.name: StreamingBackend,
+    LxmlBackend.name: LxmlBackend
+}
+DEFAULT_PARSER = StreamingBackend.name
+
+
+def getParser(parser=DEFAULT_PARSER):
+    """ This function gets a parser backend.
+
+    Attributes:
+        parser: Name of the backend in PARSERS or a ParserBackend.
+    Output: ParserBackend.
+    """
+
+    if isinstance(parser, ParserBackend):
+        return parser
+    if parser not in PARSERS:
+        raise ValueError("Parser not valid. Has to be: " + str(list(PARSERS)))
+    return PARSERS[parser]()
+
+
+def availableParsers():
+    """ Output: List with a ParserBackend of every backend that can be used in this environment. """
+
+    parsers = []
+    for parser in PARSERS.values():
+        try:
+            parsers.append(parser())
+        except ImportError:
+            pass
+    return parsers
+
+
+def compareParsers(pages, parsers=None, repeat=3):
+    """ This function times every parser backend on every page.
+
+    Attributes:
+        pages: Dict of name to tuple (html, extract), where extract is a function that gets the parser and the html and
+               extracts the data of the page, i.e. lambda parser, html: parser.extract(html, statsPlan('d-inline'))).
+        parsers: List of ParserBackend to compare. If not set, all the available ones.
+        repeat: Number of times every page is parsed, the best time is kept.
+    Output: Dict of page name to dict of backend name to microseconds per page.
+    """
+
+    timings = {}
+    for name, (html, extract) in pages.items():
+        timings[name] = {}
+        for parser in parsers if parsers is not None else availableParsers():
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                extract(parser, html)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            timings[name][parser.name] = best * 1e6
+    return timings
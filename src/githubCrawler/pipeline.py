@@ -0,0 +1,221 @@
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+import requests
+from .githubCrawler import EXTRACTION_PLANS, MAX_SEARCH_PAGES
+
+# Pipeline configuration values
+DEFAULT_DOWNLOAD_WORKERS = 16
+DEFAULT_QUEUE_SIZE = 32
+STOP_CHECK_INTERVAL = 0.1  # Seconds a blocked stage waits before checking if the pipeline was stopped
+
+
+def extractPage(parser, pageType, html):
+    """ This function is the work of the parse stage, it runs in the process pool.
+
+    Attributes:
+        parser: ParserBackend of the crawler.
+        pageType: Key of the page type in EXTRACTION_PLANS.
+        html: valid HTML text.
+    Output: Tuple with the Extraction of the page and the seconds it took.
+    """
+
+    start = time.perf_counter()
+    extraction = parser.extract(html, EXTRACTION_PLANS[pageType])
+    return extraction, time.perf_counter() - start
+
+
+class CrawlPipeline:
+    """  Staged version of a GithubCrawler. Download workers (threads) put the raw HTML in a bounded queue and the parse
+         stage extracts it in a pool of processes, so the parsing uses all the cores instead of fighting for the GIL.
+         When the parse stage falls behind the queue fills up and the downloads wait. The parser of the crawler has to
+         be picklable.
+
+         Usage: `CrawlPipeline(GithubCrawler(link)).run()`
+    """
+
+    def __init__(self, crawler, downloadWorkers=DEFAULT_DOWNLOAD_WORKERS, parseWorkers=None,
+                 queueSize=DEFAULT_QUEUE_SIZE):
+        """ Init function for the class.
+
+        Attributes:
+            crawler: GithubCrawler that downloads the pages and reads the extracted data.
+            downloadWorkers: Number of threads of the download stage.
+            parseWorkers: Number of processes of the parse stage. If not set, one for every core.
+            queueSize: Maximum number of downloaded pages waiting for the parse stage.
+        """
+
+        self.crawler = crawler
+        self.downloadWorkers = downloadWorkers
+        self.parseWorkers = parseWorkers or os.cpu_count()
+        self.queueSize = queueSize
+        self.finished = {}
+
+    def run(self):
+        """ Run function of the pipeline. Same result as the run function of the crawler.
+
+        Output: List of URL of the search.
+        """
+
+        return list(self.iterResults(maxPages=1))
+
+    def iterResults(self, maxPages=MAX_SEARCH_PAGES):
+        """ This function generates all the URLs of the search, page after page, each one as soon as it is ready.
+
+        Attributes:
+            maxPages: Maximum number of search result pages to walk.
+        Output: Generator of URL of the search.
+        """
+
+        crawler = self.crawler
+        with ThreadPoolExecutor(self.downloadWorkers) as downloadPool, \
+                ProcessPoolExecutor(self.parseWorkers) as parsePool:
+            page = 1
+            nextSearch = downloadPool.submit(crawler.downloadSearchPage, page)
+            while nextSearch is not None:
+                if crawler.print_info:
+                    print("SEARCHING: " + crawler.generateURL(page))
+                try:
+                    links, hasNextPage = crawler.readSearchPage(self.readExtraction(
+                        parsePool.submit(extractPage, crawler.parser, crawler.type, nextSearch.result()), crawler.type))
+                except (requests.exceptions.RequestException, crawler.DataNotFoundException) as e:
+                    if crawler.print_info:
+                        print("ERROR: " + str(e))
+                    yield {'error': str(e)}
+                    return
+                if not links and page > 1:
+                    return
+
+                page += 1
+                nextSearch = downloadPool.submit(crawler.downloadSearchPage, page) \
+                    if hasNextPage and page <= maxPages else None
+                yield from self.iterURLs(links, downloadPool, parsePool)
+
+    def iterURLs(self, links, downloadPool, parsePool):
+        """ This function generates the URLs of a list of links, each one as soon as it goes through both stages.
+
+        Attributes:
+            links: List of links without the GitHub domain, as returned by parseLinks.
+            downloadPool: ThreadPoolExecutor of the download stage.
+            parsePool: ProcessPoolExecutor of the parse stage.
+        Output: Generator of URL.
+        """
+
+        crawler = self.crawler
+        if not links or crawler.type != 'Repositories':
+            yield from crawler.iterURLs(links)
+            return
+
+        hits = Counter(links) if crawler.collapseDuplicates else None
+        repositories = {}
+        for link in (list(hits) if hits is not None else links):
+            repositories.setdefault(crawler.getRepositoryKey(link), []).append(link)
+
+        stopped = threading.Event()
+        downloaded = queue.Queue(self.queueSize)
+        results = queue.Queue()
+        pending = 0
+        for key, repositoryLinks in repositories.items():
+            if key in self.finished:
+                crawler.memoHits += len(repositoryLinks)
+                results.put((key, self.finished[key]))
+            else:
+                crawler.memoHits += len(repositoryLinks) - 1
+                pending += 1
+                downloadPool.submit(self.download, key, repositoryLinks[0], downloaded, stopped)
+        dispatcher = threading.Thread(target=self.dispatch, args=(pending, downloaded, results, parsePool, stopped),
+                                      daemon=True)
+        dispatcher.start()
+
+        try:
+            for _ in range(len(repositories)):
+                key, stats = results.get()
+                if not isinstance(stats, (dict, str)):
+                    stats = crawler.readLanguageStats(self.readExtraction(stats, 'Stats'))
+                    self.finished[key] = stats
+                for link in repositories[key]:
+                    url = crawler.getRepositoryInfo(link, stats)
+                    if hits is not None:
+                        url['hits'] = hits[link]
+                    yield url
+        finally:
+            stopped.set()
+            dispatcher.join()
+
+    def readExtraction(self, future, pageType):
+        """ This function gets the result of the parse stage and measures it in the metrics of the crawler.
+
+        Attributes:
+            future: Future of extractPage.
+            pageType: Key of the page type in EXTRACTION_PLANS.
+        Output: Extraction of the page.
+        """
+
+        extraction, seconds = future.result()
+        self.crawler.metrics.observe('parse_seconds', seconds, page_type=pageType)
+        return extraction
+
+    def download(self, key, link, downloaded, stopped):
+        """ This function is the work of the download stage: downloads a repository page and puts it in the queue.
+
+        Attributes:
+            key: Key of the repository, as returned by getRepositoryKey.
+            link: valid github URL without 'https://github.com', i.e. /qiyuangong/leetcode
+            downloaded: Queue of the downloaded pages.
+            stopped: Event set when the results are not needed anymore.
+        """
+
+        crawler = self.crawler
+        try:
+            item = (key, crawler.retryPolicy.call(crawler.downloadHTML, crawler.githubURL + link, True,
+                                                  onRetry=crawler.recordRetry))
+        except requests.exceptions.RequestException as e:
+            if crawler.print_info:
+                print("FAIL: " + crawler.githubURL + link)
+            item = (key, {'error': str(e)})
+        while not stopped.is_set():
+            try:
+                downloaded.put(item, timeout=STOP_CHECK_INTERVAL)
+                return
+            except queue.Full:
+                pass
+
+    def dispatch(self, pending, downloaded, results, parsePool, stopped):
+        """ This function is the work of the parse stage: sends the downloaded pages to the process pool, never more
+            than two for every process at the same time, and puts the futures of the extraction in the results. If the
+            process pool does not take a page, i.e. because a process was killed, a future with the error is put in
+            the results and the stage stops.
+
+        Attributes:
+            pending: Number of pages the download stage will put in the queue.
+            downloaded: Queue of the downloaded pages.
+            results: Queue of the results, tuples of key and languages stats or future of the extraction.
+            parsePool: ProcessPoolExecutor of the parse stage.
+            stopped: Event set when the results are not needed anymore.
+        """
+
+        slots = threading.BoundedSemaphore(self.parseWorkers * 2)
+        while pending and not stopped.is_set():
+            try:
+                key, page = downloaded.get(timeout=STOP_CHECK_INTERVAL)
+            except queue.Empty:
+                continue
+            pending -= 1
+            if isinstance(page, dict):
+                results.put((key, page))
+                continue
+            while not slots.acquire(timeout=STOP_CHECK_INTERVAL):
+                if stopped.is_set():
+                    return
+            try:
+                future = parsePool.submit(extractPage, self.crawler.parser, 'Stats', page)
+            except Exception as e:
+                slots.release()
+                future = Future()
+                future.set_exception(e)
+                results.put((key, future))
+                return
+            future.add_done_callback(lambda done, key=key: (slots.release(), results.put((key, done))))
@@ -0,0 +1,212 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+# Proxy pool configuration values
+DEFAULT_MAX_REQUESTS_PER_PROXY = 10
+DEFAULT_FAILURES_TO_TRIP = 3
+DEFAULT_COOLDOWN = 30
+INITIAL_LATENCY = 1.0
+SMOOTHING = 0.3  # Weight of the last request in the latency and error rate averages
+
+
+class ProxyState:
+    """  Health of one proxy: average latency and error rate, requests in flight and circuit breaker """
+
+    def __init__(self, index, proxy):
+        """ Init function for the class.
+
+        Attributes:
+            index: Position of the proxy in the proxy list of the crawler.
+            proxy: Proxy as used by requests, i.e. {"http": 'http://1.1.1.1:80', "https": 'https://1.1.1.1:80'}.
+        """
+
+        self.index = index
+        self.proxy = proxy
+        self.latency = INITIAL_LATENCY
+        self.errorRate = 0.0
+        self.inFlight = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutiveFailures = 0
+        self.openUntil = 0.0
+
+    def isOpen(self, now):
+        """ Output: True if the circuit breaker of the proxy is still cooling down. """
+
+        return self.openUntil > now
+
+    def isHalfOpen(self, now):
+        """ Output: True if the proxy has cooled down and is waiting for a trial request. """
+
+        return 0 < self.openUntil <= now
+
+    def score(self):
+        """ Output: Weight of the proxy for the selection, higher is better. """
+
+        return (1.0 - self.errorRate + 0.01) / (self.latency * (1 + self.inFlight))
+
+    def toDict(self):
+        """ Output: Health of the proxy as a dict. """
+
+        return {
+            'proxy': self.proxy['http'],
+            'latency': self.latency,
+            'error_rate': self.errorRate,
+            'in_flight': self.inFlight,
+            'requests': self.requests,
+            'failures': self.failures,
+            'open': self.isOpen(time.monotonic())
+        }
+
+
+class ProxyPool:
+    """  Pool of proxies that tracks the health of every proxy and prefers the healthy ones. Selection is weighted by
+         error rate, latency and requests in flight; a proxy that fails several times in a row is left out until it
+         cools down, and no proxy gets more than a fixed number of requests at the same time.
+    """
+
+    def __init__(self, proxies, maxRequestsPerProxy=DEFAULT_MAX_REQUESTS_PER_PROXY,
+                 failuresToTrip=DEFAULT_FAILURES_TO_TRIP, cooldown=DEFAULT_COOLDOWN):
+        """ Init function for the class.
+
+        Attributes:
+            proxies: List of proxies as used by requests.
+            maxRequestsPerProxy: Maximum number of requests in flight for each proxy.
+            failuresToTrip: Number of consecutive failures that leave a proxy out.
+            cooldown: Seconds a proxy is left out after failuresToTrip failures.
+        """
+
+        self.states = [ProxyState(index, proxy) for index, proxy in enumerate(proxies)]
+        self.maxRequestsPerProxy = maxRequestsPerProxy
+        self.failuresToTrip = failuresToTrip
+        self.cooldown = cooldown
+        self.condition = threading.Condition()
+
+    def forProxies(self, proxies):
+        """ This function builds a pool that only chooses among some proxies, sharing with this pool their health,
+            their limit of requests in flight and the lock. Proxies that this pool does not have are added to it.
+
+        Attributes:
+            proxies: List of proxies as used by requests.
+        Output: ProxyPool.
+        """
+
+        with self.condition:
+            byProxy = {state.proxy['http']: state for state in self.states}
+            for proxy in proxies:
+                if proxy['http'] not in byProxy:
+                    byProxy[proxy['http']] = ProxyState(len(self.states), proxy)
+                    self.states.append(byProxy[proxy['http']])
+        pool = ProxyPool([], self.maxRequestsPerProxy, self.failuresToTrip, self.cooldown)
+        pool.states = list(dict.fromkeys(byProxy[proxy['http']] for proxy in proxies))
+        pool.condition = self.condition
+        return pool
+
+    def isAvailable(self, state, now):
+        """ Output: True if the proxy can take one more request. """
+
+        if state.isOpen(now):
+            return False
+        if state.isHalfOpen(now):
+            return state.inFlight == 0
+        return state.inFlight < self.maxRequestsPerProxy
+
+    def select(self, now, exclude=()):
+        """ This function chooses a proxy. Must be called holding the condition.
+
+        Attributes:
+            now: time.monotonic().
+            exclude: ProxyStates that can not be chosen.
+        Output: ProxyState chosen, None if all the proxies are busy.
+        """
+
+        states = [state for state in self.states if state not in exclude]
+        candidates = [state for state in states if self.isAvailable(state, now)]
+        if not candidates:
+            if states and all(state.isOpen(now) for state in states):
+                # Every proxy is cooling down: better to try the one that recovers first than to stop the crawl, with
+                # a single trial request at a time as a half open proxy.
+                first = min(states, key=lambda state: state.openUntil)
+                return first if first.inFlight == 0 else None
+            return None
+        return random.choices(candidates, weights=[state.score() for state in candidates])[0]
+
+    def acquire(self, block=True, exclude=()):
+        """ This function takes a proxy for one request. It has to be given back with release.
+
+        Attributes:
+            block: If True, waits until a proxy is free. If False, returns None if all the proxies are busy.
+            exclude: ProxyStates that can not be taken, i.e. the proxy of the request being hedged.
+        Output: ProxyState of the proxy to use.
+        """
+
+        with self.condition:
+            while True:
+                state = self.select(time.monotonic(), exclude)
+                if state is not None or not block:
+                    break
+                self.condition.wait()
+            if state is not None:
+                state.inFlight += 1
+            return state
+
+    def release(self, state, latency, success):
+        """ This function gives back a proxy taken with acquire and records the result of the request.
+
+        Attributes:
+            state: ProxyState returned by acquire.
+            latency: Seconds the request took.
+            success: False if the request failed because of the connection.
+        """
+
+        with self.condition:
+            state.inFlight -= 1
+            state.requests += 1
+            state.errorRate += SMOOTHING * ((0.0 if success else 1.0) - state.errorRate)
+            if success:
+                state.latency += SMOOTHING * (latency - state.latency)
+                state.consecutiveFailures = 0
+                state.openUntil = 0.0
+            else:
+                state.failures += 1
+                state.consecutiveFailures += 1
+                now = time.monotonic()
+                if state.isHalfOpen(now) or state.consecutiveFailures >= self.failuresToTrip:
+                    state.openUntil = now + self.cooldown
+            self.condition.notify_all()
+
+    def cancel(self, state):
+        """ This function gives back a proxy taken with acquire whose request was cancelled, without recording it.
+
+        Attributes:
+            state: ProxyState returned by acquire.
+        """
+
+        with self.condition:
+            state.inFlight -= 1
+            self.condition.notify_all()
+
+    @contextmanager
+    def proxy(self):
+        """ This function takes a proxy for the requests inside the with block and records their result. Any
+            exception raised inside the block counts as a failure of the proxy.
+
+        Output: Proxy as used by requests.
+        """
+
+        state = self.acquire()
+        start = time.monotonic()
+        try:
+            yield state.proxy
+        except BaseException:
+            self.release(state, time.monotonic() - start, False)
+            raise
+        self.release(state, time.monotonic() - start, True)
+
+    def stats(self):
+        """ Output: List with the health of every proxy. """
+
+        with self.condition:
+            return [state.toDict() for state in self.states]
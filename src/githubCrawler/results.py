@@ -0,0 +1,199 @@
+import sys
+from array import array
+from collections.abc import Mapping
+
+
+def readPercentages(stats):
+    """ This function converts the language stats of a repository to numbers, only if they can be written back as
+        the same text.
+
+    Attributes:
+        stats: Languages stats of the repository, i.e. {'Python': '77.4', 'Java': '20.4'}.
+    Output: Tuple with the tuple of interned language names and the array of percentages, None if the stats are not
+            numbers, i.e. an error.
+    """
+
+    if not isinstance(stats, dict) or 'error' in stats:
+        return None
+    try:
+        percentages = array('d', [float(percentage) for percentage in stats.values()])
+    except (TypeError, ValueError):
+        return None
+    if any(repr(number) != text for number, text in zip(percentages, stats.values())):
+        return None
+    return tuple(sys.intern(language) for language in stats), percentages
+
+
+class Result(Mapping):
+    """  Compact result of a crawl. It reads as the dict the crawler has always returned, built only when it is read,
+         so `result['url']`, `result == {...}` and `dict(result)` keep working. Only 'hits' can be set.
+    """
+
+    __slots__ = ()
+
+    def fields(self):
+        """ Output: Tuple with the keys of the dict of the result. """
+
+        raise NotImplementedError
+
+    def __iter__(self):
+        return iter(self.fields())
+
+    def __len__(self):
+        return len(self.fields())
+
+    def __setitem__(self, key, value):
+        if key != 'hits':
+            raise KeyError(key)
+        self.hits = value
+
+    def toDict(self):
+        """ Output: The result as the dict returned by the crawler. """
+
+        return {key: self[key] for key in self.fields()}
+
+    def __repr__(self):
+        return repr(self.toDict())
+
+
+class LinkResult(Result):
+    """  Result of a search of issues or wikis: the URL of the result """
+
+    __slots__ = ('githubURL', 'link', 'hits')
+
+    def __init__(self, githubURL, link, hits=None):
+        """ Init function for the class.
+
+        Attributes:
+            githubURL: Base URL of GitHub, shared by all the results of a crawler.
+            link: valid github URL without the base URL, i.e. /qiyuangong/leetcode/issues/1
+            hits: Number of times the link appears in the search page, None if duplicates are not collapsed.
+        """
+
+        self.githubURL = githubURL
+        self.link = link
+        self.hits = hits
+
+    @property
+    def url(self):
+        """ Output: URL of the result. """
+
+        return self.githubURL + self.link
+
+    def fields(self):
+        return ('url',) if self.hits is None else ('url', 'hits')
+
+    def __getitem__(self, key):
+        if key == 'url':
+            return self.url
+        if key == 'hits' and self.hits is not None:
+            return self.hits
+        raise KeyError(key)
+
+
+class RepositoryResult(Result):
+    """  Result of a search of repositories. The owner and the language names are interned, so millions of results
+         share them, and the percentages are kept as numbers in an array.
+    """
+
+    __slots__ = ('githubURL', 'link', 'owner', 'languages', 'percentages', 'stats', 'hits')
+
+    def __init__(self, githubURL, link, owner, stats, hits=None):
+        """ Init function for the class.
+
+        Attributes:
+            githubURL: Base URL of GitHub, shared by all the results of a crawler.
+            link: valid github URL without the base URL, i.e. /qiyuangong/leetcode
+            owner: Owner of the repository.
+            stats: Languages stats of the repository, as returned by getLanguageStatsOnce.
+            hits: Number of times the link appears in the search page, None if duplicates are not collapsed.
+        """
+
+        self.githubURL = githubURL
+        self.link = link
+        self.owner = sys.intern(owner)
+        self.hits = hits
+        numbers = readPercentages(stats)
+        if numbers is None:
+            self.languages = self.percentages = None
+            self.stats = stats
+        else:
+            self.languages, self.percentages = numbers
+            self.stats = None
+
+    @property
+    def url(self):
+        """ Output: URL of the repository. """
+
+        return self.githubURL + self.link
+
+    @property
+    def languageStats(self):
+        """ Output: Dict of language to percentage as a number, None if the stats could not be read. """
+
+        if self.languages is None:
+            return None
+        return dict(zip(self.languages, self.percentages))
+
+    def fields(self):
+        return ('url', 'extra') if self.hits is None else ('url', 'extra', 'hits')
+
+    def __getitem__(self, key):
+        if key == 'url':
+            return self.url
+        if key == 'extra':
+            stats = self.stats if self.languages is None else \
+                {language: repr(percentage) for language, percentage in zip(self.languages, self.percentages)}
+            return {'owner': self.owner, 'language_stats': stats}
+        if key == 'hits' and self.hits is not None:
+            return self.hits
+        raise KeyError(key)
+
+
+def toColumns(results):
+    """ This function converts results of a crawl, compact or dicts, to columns for analytics. Results without URL,
+        i.e. errors, are left out.
+
+    Attributes:
+        results: Iterable of results of the crawler.
+    Output: Dict with two tables of columns: 'results' with 'url', 'owner' and 'hits', and 'languages' with
+            'result' (row of the result in 'results'), 'language' and 'percentage'.
+    """
+
+    columns = {'url': [], 'owner': [], 'hits': []}
+    languages = {'result': [], 'language': [], 'percentage': []}
+    for result in results:
+        if 'url' not in result:
+            continue
+        row = len(columns['url'])
+        columns['url'].append(result['url'])
+        columns['hits'].append(result.get('hits'))
+        if isinstance(result, RepositoryResult):
+            owner, numbers = result.owner, (None if result.languages is None else
+                                            (result.languages, result.percentages))
+        elif 'extra' in result:
+            owner, numbers = result['extra']['owner'], readPercentages(result['extra']['language_stats'])
+        else:
+            owner, numbers = None, None
+        columns['owner'].append(owner)
+        if numbers is not None:
+            languages['result'].extend([row] * len(numbers[0]))
+            languages['language'].extend(numbers[0])
+            languages['percentage'].extend(numbers[1])
+    return {'results': columns, 'languages': languages}
+
+
+def toArrow(results):
+    """ This function converts results of a crawl to Arrow tables, i.e. to write them as Parquet. To download:
+        `pip install pyarrow`
+
+    Attributes:
+        results: Iterable of results of the crawler.
+    Output: Dict with the tables 'results' and 'languages' of toColumns as pyarrow.Table.
+    """
+
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("toArrow needs pyarrow. To download: `pip install pyarrow`")
+    return {name: pyarrow.table(table) for name, table in toColumns(results).items()}
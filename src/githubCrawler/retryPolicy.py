@@ -0,0 +1,194 @@
+import asyncio
+import datetime
+import email.utils
+import math
+import random
+import time
+import requests
+
+# Retry policy configuration values
+DEFAULT_CONNECTION_ATTEMPTS = 20
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 30
+DEFAULT_TIMEOUT = 30
+DEFAULT_DEADLINE = 300
+
+# HTTP status that mean the request can be tried again later
+RETRY_STATUS = [429, 500, 502, 503, 504]
+RATE_LIMIT_TEXT = ['rate limit', 'abuse detection']
+
+
+class RateLimitException(requests.exceptions.RequestException):
+    """Exception raised when GitHub or the proxy answers with a rate limit or a temporary error.
+
+    Attributes:
+        status: HTTP status of the response.
+        retryAfter: Seconds to wait before trying again, None if the response does not say it.
+        message: explanation of the error
+    """
+
+    def __init__(self, status, retryAfter=None, message="Rate limited or temporary error. HTTP status: "):
+        self.status = status
+        self.retryAfter = retryAfter
+        self.message = message + str(status)
+        super().__init__(self.message)
+
+
+class RetryPolicy:
+    """  Retry policy shared by every download of the crawlers. Waits with exponential backoff and jitter between
+         attempts, honors the Retry-After and rate limit headers and gives up after a number of attempts or a total
+         deadline, whatever comes first.
+    """
+
+    def __init__(self, attempts=DEFAULT_CONNECTION_ATTEMPTS, baseDelay=DEFAULT_BASE_DELAY, maxDelay=DEFAULT_MAX_DELAY,
+                 timeout=DEFAULT_TIMEOUT, deadline=DEFAULT_DEADLINE):
+        """ Init function for the class.
+
+        Attributes:
+            attempts: Maximum number of attempts of a download.
+            baseDelay: Seconds of the first wait, doubled after every attempt.
+            maxDelay: Maximum seconds of a wait without Retry-After.
+            timeout: Seconds before a single request is cancelled.
+            deadline: Maximum seconds for all the attempts of a download.
+        """
+
+        self.attempts = attempts
+        self.baseDelay = baseDelay
+        self.maxDelay = maxDelay
+        self.timeout = timeout
+        self.deadline = deadline
+
+    def checkResponse(self, status, headers, text=''):
+        """ This function raises RateLimitException if the response is a rate limit or a temporary error, i.e. 429,
+            503 or the 403 "abuse detection" page of GitHub.
+
+        Attributes:
+            status: HTTP status of the response.
+            headers: Headers of the response.
+            text: Body of the response.
+        """
+
+        if status in RETRY_STATUS or (status == 403 and (
+                headers.get('X-RateLimit-Remaining') == '0' or
+                any(rateLimit in text.lower() for rateLimit in RATE_LIMIT_TEXT))):
+            raise RateLimitException(status, self.retryAfter(headers))
+
+    def retryAfter(self, headers):
+        """ This function reads the time to wait from the Retry-After or X-RateLimit-Reset headers.
+
+        Attributes:
+            headers: Headers of the response.
+        Output: Seconds to wait, None if the headers do not say it.
+        """
+
+        value = headers.get('Retry-After')
+        if value:
+            seconds = self.readRetryAfter(value)
+            if seconds is not None:
+                return seconds
+        if headers.get('X-RateLimit-Remaining') == '0' and str(headers.get('X-RateLimit-Reset', '')).isdigit():
+            return max(0.0, int(headers['X-RateLimit-Reset']) - time.time())
+        return None
+
+    def readRetryAfter(self, value):
+        """ This function reads a Retry-After value, in seconds, fractional or not, or as an HTTP date. A date without
+            time zone is read as UTC.
+
+        Attributes:
+            value: Text of the Retry-After header.
+        Output: Seconds to wait, None if the value is not valid.
+        """
+
+        try:
+            seconds = float(value)
+        except (TypeError, ValueError):
+            seconds = None
+        if seconds is not None:
+            return seconds if math.isfinite(seconds) and seconds >= 0 else None
+        try:
+            date = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError, IndexError):
+            return None
+        if date.tzinfo is None:
+            date = date.replace(tzinfo=datetime.timezone.utc)
+        return max(0.0, date.timestamp() - time.time())
+
+    def isRetryable(self, exception):
+        """ Output: False if the exception is an HTTP error that will not change trying again, i.e. 404. """
+
+        if isinstance(exception, RateLimitException):
+            return True
+        return not (isinstance(exception, requests.exceptions.HTTPError) or hasattr(exception, 'status'))
+
+    def delay(self, attempt, exception=None):
+        """ This function calculates the wait before the next attempt.
+
+        Attributes:
+            attempt: Number of attempts done.
+            exception: Exception raised by the last attempt.
+        Output: Seconds to wait.
+        """
+
+        retryAfter = getattr(exception, 'retryAfter', None)
+        if retryAfter is not None:
+            return retryAfter + random.uniform(0, self.baseDelay)
+        return random.uniform(0, min(self.maxDelay, self.baseDelay * 2 ** (attempt - 1)))
+
+    def nextDelay(self, attempt, exception, start):
+        """ This function decides if a failed download is tried again.
+
+        Attributes:
+            attempt: Number of attempts done.
+            exception: Exception raised by the last attempt.
+            start: time.monotonic() of the first attempt.
+        Output: Seconds to wait before the next attempt, None if the download has to give up.
+        """
+
+        if attempt >= self.attempts or not self.isRetryable(exception):
+            return None
+        delay = self.delay(attempt, exception)
+        if time.monotonic() + delay - start > self.deadline:
+            return None
+        return delay
+
+    def call(self, fetch, *args, exceptions=(requests.exceptions.RequestException,), onRetry=None):
+        """ This function calls fetch until it works or the policy gives up.
+
+        Attributes:
+            fetch: Function that downloads something.
+            args: Arguments of fetch.
+            exceptions: Exceptions of fetch that mean the download failed.
+            onRetry: Function called with the attempt, the exception and the wait before every new attempt.
+        Output: Result of fetch. Raises the last exception if the policy gives up.
+        """
+
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            try:
+                return fetch(*args)
+            except exceptions as e:
+                attempt += 1
+                delay = self.nextDelay(attempt, e, start)
+                if delay is None:
+                    raise
+                if onRetry is not None:
+                    onRetry(attempt, e, delay)
+                time.sleep(delay)
+
+    async def callAsync(self, fetch, *args, exceptions=(requests.exceptions.RequestException,), onRetry=None):
+        """ Async version of call, fetch has to be a coroutine function. """
+
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            try:
+                return await fetch(*args)
+            except exceptions as e:
+                attempt += 1
+                delay = self.nextDelay(attempt, e, start)
+                if delay is None:
+                    raise
+                if onRetry is not None:
+                    onRetry(attempt, e, delay)
+                await asyncio.sleep(delay)
@@ -0,0 +1,239 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+import requests
+from .batchRunner import BatchRunner, DEFAULT_MAX_WORKERS
+from .githubCrawler import GithubCrawler, MAX_SEARCH_PAGES, RESULTS_PER_PAGE
+
+# Sharding configuration values
+SEARCH_RESULT_CAP = MAX_SEARCH_PAGES * RESULTS_PER_PAGE  # GitHub does not return more results for a search
+GITHUB_START_DATE = date(2008, 1, 1)  # Nothing on GitHub was created or pushed before
+
+
+class DateRange:
+    """  Range of days of a date qualifier of the search, i.e. created:2008-01-01..2015-06-30 """
+
+    def __init__(self, field='created', start=GITHUB_START_DATE, end=None):
+        """ Init function for the class.
+
+        Attributes:
+            field: Date qualifier of GitHub, i.e. 'created' or 'pushed'.
+            start: First day of the range.
+            end: Last day of the range. If not set, today.
+        """
+
+        self.field = field
+        self.start = start
+        self.end = end if end is not None else date.today()
+
+    @property
+    def qualifier(self):
+        """ Output: Qualifier of the search for the range, i.e. 'created:2008-01-01..2015-06-30'. """
+
+        return self.field + ':' + self.start.isoformat() + '..' + self.end.isoformat()
+
+    def split(self):
+        """ Output: List with the two halves of the range, None if the range is a single day. """
+
+        if self.start >= self.end:
+            return None
+        middle = self.start + (self.end - self.start) // 2
+        return [DateRange(self.field, self.start, middle), DateRange(self.field, middle + timedelta(days=1), self.end)]
+
+
+class NumberRange:
+    """  Range of a number qualifier of the search, i.e. stars:10..99 or stars:>=100 """
+
+    def __init__(self, field='stars', low=0, high=None):
+        """ Init function for the class.
+
+        Attributes:
+            field: Number qualifier of GitHub, i.e. 'stars', 'forks' or 'size'.
+            low: Lowest number of the range.
+            high: Highest number of the range. If not set, the range has no end.
+        """
+
+        self.field = field
+        self.low = low
+        self.high = high
+
+    @property
+    def qualifier(self):
+        """ Output: Qualifier of the search for the range, i.e. 'stars:10..99' or 'stars:>=100'. """
+
+        if self.high is None:
+            return self.field + ':>=' + str(self.low)
+        return self.field + ':' + str(self.low) + '..' + str(self.high)
+
+    def split(self):
+        """ Output: List with the two parts of the range, None if the range is a single number. A range without end
+                   is split at twice its start, as the results get fewer the bigger the number is.
+        """
+
+        if self.high is None:
+            middle = self.low * 2 + 1
+            return [NumberRange(self.field, self.low, middle), NumberRange(self.field, middle + 1)]
+        if self.low >= self.high:
+            return None
+        middle = (self.low + self.high) // 2
+        return [NumberRange(self.field, self.low, middle), NumberRange(self.field, middle + 1, self.high)]
+
+
+def splitShard(shard):
+    """ This function splits a shard by its first range that can still be split.
+
+    Attributes:
+        shard: Tuple of ranges (DateRange or NumberRange) of the shard.
+    Output: List of the disjoint shards that cover the shard, None if no range can be split.
+    """
+
+    for position, searchRange in enumerate(shard):
+        parts = searchRange.split()
+        if parts is not None:
+            return [shard[:position] + (part,) + shard[position + 1:] for part in parts]
+    return None
+
+
+class ShardedCrawler:
+    """  Crawls a search with more results than GitHub returns (SEARCH_RESULT_CAP) by splitting it in disjoint
+         searches, the shards, adding date or number qualifiers to the keywords. A shard still over the cap is split
+         again, by its first range and then by the next ones. The shards are crawled in parallel on a BatchRunner that
+         shares the proxies, the retry policy, the cache, the metrics and the checkpoint of the crawler, and their URLs
+         are merged without duplicates. The first search page of every shard, downloaded to count its results, is
+         not downloaded again to crawl the shard.
+
+         Usage: `ShardedCrawler(GithubCrawler('input.json'), (DateRange('created'), NumberRange('stars'))).run()`
+    """
+
+    def __init__(self, crawler, shard=None, cap=SEARCH_RESULT_CAP, maxWorkers=DEFAULT_MAX_WORKERS):
+        """ Init function for the class.
+
+        Attributes:
+            crawler: GithubCrawler of the search.
+            shard: Range or tuple of ranges the search is split by, in order. If not set, the creation date.
+            cap: Maximum number of results of a shard.
+            maxWorkers: Maximum number of requests at the same time.
+        """
+
+        self.crawler = crawler
+        self.shard = shard if isinstance(shard, tuple) else (shard if shard is not None else DateRange(),)
+        self.cap = cap
+        self.maxWorkers = maxWorkers
+        self.truncated = []
+        self.firstPages = {}
+
+    def shardJob(self, shard):
+        """ Output: Input JSON of the search of a shard. """
+
+        crawler = self.crawler
+        return {'keywords': list(crawler.keywords) + [searchRange.qualifier for searchRange in shard],
+                'proxies': [proxy['http'][len('http://'):] for proxy in crawler.proxies],
+                'type': crawler.type}
+
+    def sharedArguments(self):
+        """ Output: Dict of all the arguments of the crawler, but its input, shared by the crawlers of the shards. """
+
+        crawler = self.crawler
+        return {'print_info': crawler.print_info, 'githubURL': crawler.githubURL, 'proxyPool': crawler.proxyPool,
+                'retryPolicy': crawler.retryPolicy, 'cache': crawler.cache,
+                'collapseDuplicates': crawler.collapseDuplicates, 'parser': crawler.parser,
+                'metrics': crawler.metrics, 'checkpoint': crawler.checkpoint, 'archive': crawler.archive,
+                'hedgePolicy': crawler.hedgePolicy, 'streamPages': crawler.streamPages,
+                'compactResults': crawler.compactResults, 'maxWorkers': crawler.maxWorkers}
+
+    def countShard(self, shard):
+        """ This function gets the number of results of the search of a shard, and keeps its first search page in
+            firstPages for the crawl of the shard.
+
+        Attributes:
+            shard: Tuple of ranges of the shard.
+        Output: Number of results, None if it is not known.
+        """
+
+        crawler = GithubCrawler(self.shardJob(shard), **self.sharedArguments())
+        try:
+            extraction = crawler.retryPolicy.call(crawler.downloadPage, crawler.generateURL(), crawler.type,
+                                                  onRetry=crawler.recordRetry)
+        except (requests.exceptions.RequestException, GithubCrawler.DataNotFoundException) as e:
+            if self.crawler.print_info:
+                print("ERROR: " + str(e))
+            return None
+        try:
+            self.firstPages[shard] = crawler.readSearchPage(extraction)
+        except GithubCrawler.DataNotFoundException:
+            pass  # The crawl of the shard downloads the page again and returns the error
+        return crawler.readTotal(extraction)
+
+    def plan(self):
+        """ This function splits the search in shards with at most cap results, counting the shards of every level in
+            parallel. Shards with no results are left out. Shards over the cap that can not be split any more are kept
+            and added to truncated, as only the first cap results of them are crawled. Shards whose number of results
+            is not known, i.e. the count failed, are kept and added to truncated too, as they can be over the cap.
+            They are not split, so a failing count does not split the search down to single days.
+
+        Output: List of tuples (shard, number of results or None if it is not known).
+        """
+
+        leaves = []
+        self.truncated = []
+        self.firstPages = {}
+        level = [self.shard]
+        with ThreadPoolExecutor(self.maxWorkers) as executor:
+            while level:
+                nextLevel = []
+                for shard, total in zip(level, executor.map(self.countShard, level)):
+                    if total is None:
+                        self.truncated.append(shard)
+                    elif total > self.cap:
+                        parts = splitShard(shard)
+                        if parts is not None:
+                            nextLevel.extend(parts)
+                            self.firstPages.pop(shard, None)
+                            continue
+                        self.truncated.append(shard)
+                    if total != 0:
+                        leaves.append((shard, total))
+                level = nextLevel
+        if self.crawler.print_info:
+            print("SHARDS: " + str(len(leaves)) + ", TRUNCATED: " + str(len(self.truncated)))
+        return leaves
+
+    def iterResults(self):
+        """ This function crawls all the shards in parallel and generates the URLs of the search as soon as they are
+            ready, every URL once. Errors have the qualifiers of their shard in 'shard'.
+
+        Output: Generator of URL of the search.
+        """
+
+        jobs = []
+        firstPages = {}
+        for shard, _ in self.plan():
+            name = ' '.join(searchRange.qualifier for searchRange in shard)
+            jobs.append((name, self.shardJob(shard)))
+            if shard in self.firstPages:
+                firstPages[name] = self.firstPages[shard]
+        arguments = self.sharedArguments()
+        del arguments['maxWorkers']  # The batch runs every repository as a task of its own pool of maxWorkers
+        runner = BatchRunner(jobs, self.maxWorkers, maxPages=MAX_SEARCH_PAGES, firstPages=firstPages, **arguments)
+        seen = set()
+        notFound = None
+        errors = False
+        for shardName, url in runner.iterResults():
+            if 'url' in url:
+                if url['url'] not in seen:
+                    seen.add(url['url'])
+                    yield url
+            elif 'url_not_found' in url:
+                notFound = url
+            else:
+                errors = True
+                yield dict(url, shard=shardName)
+        if not seen and not errors:
+            yield notFound if notFound is not None else {"url_not_found": "Not found any URL for this search."}
+
+    def run(self):
+        """ Run function of the sharded crawl.
+
+        Output: List of URL of the search.
+        """
+
+        return list(self.iterResults())
@@ -0,0 +1,223 @@
+import gzip
+import json
+import os
+import re
+import sys
+import threading
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Output configuration values
+DEFAULT_BUFFER_SIZE = 64  # Results kept in memory before they are written
+DEFAULT_SEGMENT_RECORDS = 100000
+DEFAULT_COMPRESSION_LEVEL = 6
+COMPRESSIONS = {'.gz': 'gzip', '.zst': 'zstd'}
+
+
+def compressionOf(path):
+    """ Output: Compression of a file by its extension, 'gzip' for .gz, 'zstd' for .zst and None for the rest. """
+
+    if path is None:
+        return None
+    return COMPRESSIONS.get(os.path.splitext(path)[1])
+
+
+class OutputSink:
+    """  Interface of the places where the results of a crawl are written, one result at a time, so the results do
+         not have to be kept in memory.
+    """
+
+    def write(self, result):
+        """ This function writes a result.
+
+        Attributes:
+            result: URL dict of the crawl.
+        """
+
+        raise NotImplementedError
+
+    def flush(self):
+        """ This function writes the results kept in memory. """
+
+    def close(self):
+        """ This function writes the results kept in memory and closes the sink. """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class NDJSONSink(OutputSink):
+    """  Writes every result as a JSON line to stdout or to a file, compressed with gzip or zstd if asked. At most
+         bufferSize results are kept in memory before they are written.
+    """
+
+    def __init__(self, path=None, compression=None, bufferSize=DEFAULT_BUFFER_SIZE, fsync=False, append=False,
+                 compressionLevel=DEFAULT_COMPRESSION_LEVEL):
+        """ Init function for the class.
+
+        Attributes:
+            path: Link of the output file. If not set, stdout.
+            compression: 'gzip', 'zstd' or None. If not set, it is chosen by the extension of the path.
+            bufferSize: Maximum number of results kept in memory before they are written.
+            fsync: If True, every write is forced to the disk, so the results survive a crash of the machine.
+            append: If True, the results are added at the end of the file instead of replacing it.
+            compressionLevel: Level of the compression.
+        """
+
+        self.path = path
+        self.compression = compression if compression is not None else compressionOf(path)
+        self.bufferSize = bufferSize
+        self.fsync = fsync
+        self.buffer = []
+        self.records = 0
+        self.bytes = 0
+        self.lock = threading.Lock()
+        self.file = open(path, 'ab' if append else 'wb') if path is not None else sys.stdout.buffer
+        if self.compression == 'gzip':
+            self.stream = gzip.GzipFile(fileobj=self.file, mode='ab' if append else 'wb',
+                                        compresslevel=compressionLevel)
+        elif self.compression == 'zstd':
+            if zstandard is None:
+                raise ImportError("zstd compression needs zstandard. To download: `pip install zstandard`")
+            self.stream = zstandard.ZstdCompressor(level=compressionLevel).stream_writer(self.file, closefd=False)
+        elif self.compression is None:
+            self.stream = self.file
+        else:
+            raise ValueError("Compression not valid. Has to be: " + str(list(COMPRESSIONS.values())))
+
+    def write(self, result):
+        line = (json.dumps(result, default=dict) + '\n').encode('utf8')
+        with self.lock:
+            self.buffer.append(line)
+            self.records += 1
+            self.bytes += len(line)
+            if len(self.buffer) >= self.bufferSize:
+                self.writeBuffer()
+
+    def writeBuffer(self):
+        """ This function writes the results kept in memory. Must be called holding the lock. """
+
+        if self.buffer:
+            self.stream.write(b''.join(self.buffer))
+            self.buffer = []
+        self.stream.flush()
+        if self.stream is not self.file:
+            self.file.flush()
+        if self.fsync and self.path is not None:
+            os.fsync(self.file.fileno())
+
+    def flush(self):
+        with self.lock:
+            self.writeBuffer()
+
+    def close(self):
+        with self.lock:
+            if self.file is None:
+                return
+            self.writeBuffer()
+            if self.stream is not self.file:
+                self.stream.close()
+            if self.path is not None:
+                if self.fsync:
+                    os.fsync(self.file.fileno())
+                self.file.close()
+            else:
+                self.file.flush()
+            self.file = None
+
+
+class RotatingSink(OutputSink):
+    """  Writes the results as JSON lines in a series of segment files, prefix-00001.ndjson, prefix-00002.ndjson...,
+         starting a new one when the current one has maxRecords results or maxBytes bytes before compression. The
+         numbers go on after the segments already in the directory, so they are never replaced.
+    """
+
+    def __init__(self, directory, prefix='results', maxRecords=DEFAULT_SEGMENT_RECORDS, maxBytes=None,
+                 compression=None, bufferSize=DEFAULT_BUFFER_SIZE, fsync=False):
+        """ Init function for the class.
+
+        Attributes:
+            directory: Link of the directory of the segments, created if it does not exist. Segments are added to
+                       the ones already there.
+            prefix: Start of the name of the segments.
+            maxRecords: Maximum number of results of a segment.
+            maxBytes: Maximum bytes before compression of a segment. If not set, only maxRecords is checked.
+            compression: 'gzip', 'zstd' or None.
+            bufferSize: Maximum number of results kept in memory before they are written.
+            fsync: If True, every write is forced to the disk.
+        """
+
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.prefix = prefix
+        self.maxRecords = maxRecords
+        self.maxBytes = maxBytes
+        self.compression = compression
+        self.bufferSize = bufferSize
+        self.fsync = fsync
+        self.segments = []
+        pattern = re.compile(re.escape(prefix) + r'-(\d+)\.ndjson')
+        self.firstNumber = max([int(match.group(1)) for match in map(pattern.match, os.listdir(directory)) if match],
+                               default=0) + 1
+        self.records = 0
+        self.segment = None
+        self.lock = threading.Lock()
+
+    def openSegment(self):
+        """ This function closes the current segment and starts the next one. Must be called holding the lock. """
+
+        if self.segment is not None:
+            self.segment.close()
+        extension = {'gzip': '.gz', 'zstd': '.zst'}.get(self.compression, '')
+        number = self.firstNumber + len(self.segments)
+        path = os.path.join(self.directory, self.prefix + '-' + str(number).zfill(5) + '.ndjson' + extension)
+        self.segment = NDJSONSink(path, self.compression, self.bufferSize, self.fsync)
+        self.segments.append(path)
+
+    def write(self, result):
+        with self.lock:
+            if self.segment is None or self.segment.records >= self.maxRecords or \
+                    (self.maxBytes is not None and self.segment.bytes >= self.maxBytes):
+                self.openSegment()
+            self.segment.write(result)
+            self.records += 1
+
+    def flush(self):
+        with self.lock:
+            if self.segment is not None:
+                self.segment.flush()
+
+    def close(self):
+        with self.lock:
+            if self.segment is not None:
+                self.segment.close()
+                self.segment = None
+
+
+def openSink(output=None, rotateRecords=None, compression=None, bufferSize=DEFAULT_BUFFER_SIZE, fsync=False,
+             append=False):
+    """ This function opens the sink of an output.
+
+    Attributes:
+        output: Link of the output file, compressed by its extension (.gz or .zst), or of the directory of the segments
+                if rotateRecords is set. If not set or '-', stdout.
+        rotateRecords: Maximum number of results of every segment file. If not set, a single file.
+        compression: 'gzip', 'zstd' or None. If not set, it is chosen by the extension of the output file.
+        bufferSize: Maximum number of results kept in memory before they are written.
+        fsync: If True, every write is forced to the disk.
+        append: If True, the results are added at the end of the file instead of replacing it.
+    Output: OutputSink.
+    """
+
+    if output in (None, '-'):
+        return NDJSONSink(compression=compression, bufferSize=bufferSize, fsync=fsync)
+    if rotateRecords:
+        return RotatingSink(output, maxRecords=rotateRecords, compression=compression, bufferSize=bufferSize,
+                            fsync=fsync)
+    return NDJSONSink(output, compression, bufferSize, fsync, append)
@@ -0,0 +1,34 @@
+import os
+import sqlite3
+import threading
+
+# SQLite configuration values
+SQLITE_TIMEOUT = 30
+
+
+class SQLiteFile:
+    """  Base class of the stores saved in a SQLite file that several threads and processes use at the same time. A
+         SQLite connection can not be used by another thread or after a fork, so every thread of every process opens
+         its own one, in WAL mode so readers do not wait for the writer.
+    """
+
+    def __init__(self, path, schema):
+        """ Init function for the class.
+
+        Attributes:
+            path: Link of the SQLite file, created if it does not exist.
+            schema: SQL script that creates the tables if they do not exist.
+        """
+
+        self.path = path
+        self.local = threading.local()
+        self.connection().executescript(schema)
+
+    def connection(self):
+        """ Output: SQLite connection of the current thread and process. """
+
+        if getattr(self.local, 'pid', None) != os.getpid():
+            self.local.connection = sqlite3.connect(self.path, timeout=SQLITE_TIMEOUT, isolation_level=None)
+            self.local.connection.execute('PRAGMA journal_mode=WAL')
+            self.local.pid = os.getpid()
+        return self.local.connection
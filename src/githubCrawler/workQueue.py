@@ -0,0 +1,759 @@
+import argparse
+import hmac
+import json
+import os
+import queue
+import secrets
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+import requests
+from .batchRunner import loadJobs, DEFAULT_MAX_WORKERS
+from .githubCrawler import GithubCrawler, MAX_SEARCH_PAGES
+from .metrics import CrawlerMetrics
+from .parsers import DEFAULT_PARSER, getParser
+from .proxyPool import ProxyPool, DEFAULT_MAX_REQUESTS_PER_PROXY
+from .retryPolicy import RetryPolicy, DEFAULT_CONNECTION_ATTEMPTS
+from .sinks import openSink
+from .sqliteFile import SQLiteFile
+
+# Work queue configuration values
+DEFAULT_LEASE_SECONDS = 60  # A task not completed or renewed in this time is given to another worker
+RENEWALS_PER_LEASE = 3  # Times the leases of the running tasks are renewed before they expire
+DEFAULT_TASK_ATTEMPTS = 3
+DEFAULT_POLL_INTERVAL = 1
+DEFAULT_BROKER_PORT = 8765
+DEFAULT_BROKER_HOST = '127.0.0.1'  # Only this host, '0.0.0.0' has to be asked to share the queue with other hosts
+TOKEN_VARIABLE = 'GITHUB_CRAWLER_BROKER_TOKEN'  # Environment variable with the token of the broker server
+BROKER_TIMEOUT = 30
+
+# Exceptions that mean the broker could not be reached, the lease of the task expires and it is run again
+BROKER_ERRORS = (requests.exceptions.RequestException, sqlite3.Error)
+
+
+def searchTask(jobId, job, page, maxPages):
+    """ This function builds the task of a search result page.
+
+    Attributes:
+        jobId: Name of the job.
+        job: Input JSON of the job. The proxies are left out, every worker uses its own ones.
+        page: Number of the search result page.
+        maxPages: Maximum number of search result pages of the job.
+    Output: Task dict.
+    """
+
+    return {'id': 'search/' + jobId + '/' + str(page), 'job': jobId, 'kind': 'search',
+            'payload': {'input': {'keywords': job['keywords'], 'type': job['type']}, 'page': page,
+                        'maxPages': maxPages}}
+
+
+def repositoryTask(jobId, job, link, hits):
+    """ This function builds the task of a repository.
+
+    Attributes:
+        jobId: Name of the job.
+        job: Input JSON of the job, without proxies.
+        link: valid github URL without 'https://github.com', i.e. /qiyuangong/leetcode
+        hits: Number of times the link appears in the search page, None if duplicates are not collapsed.
+    Output: Task dict.
+    """
+
+    return {'id': 'repository/' + jobId + '/' + link, 'job': jobId, 'kind': 'repository',
+            'payload': {'input': job, 'link': link, 'hits': hits}}
+
+
+class WorkBroker:
+    """  Interface of the queues of tasks shared by the workers of a crawl. A task is leased to one worker for some
+         seconds; if the worker does not complete it in that time it is leased again to another one. Tasks have a
+         fixed id, so adding a task or completing it twice has no effect.
+    """
+
+    def put(self, tasks):
+        """ This function adds tasks to the queue. Tasks already in the queue are ignored.
+
+        Attributes:
+            tasks: List of task dicts with 'id', 'job', 'kind' and 'payload'.
+        Output: Number of tasks added.
+        """
+
+        raise NotImplementedError
+
+    def lease(self, worker, count, leaseSeconds=DEFAULT_LEASE_SECONDS):
+        """ This function leases tasks ready to run to a worker.
+
+        Attributes:
+            worker: Name of the worker.
+            count: Maximum number of tasks.
+            leaseSeconds: Seconds the worker has to complete the tasks.
+        Output: List of task dicts, with the 'lease' token and the number of 'attempts'.
+        """
+
+        raise NotImplementedError
+
+    def renew(self, task, leaseSeconds=DEFAULT_LEASE_SECONDS):
+        """ This function extends the lease of a task that is still running.
+
+        Attributes:
+            task: Task dict as returned by lease.
+            leaseSeconds: Seconds from now the worker has to complete the task.
+        Output: True if the lease is still the current one and was extended.
+        """
+
+        raise NotImplementedError
+
+    def complete(self, task, results, tasks):
+        """ This function saves the results of a task and adds the tasks it generated. Only the first completion of a
+            task is saved, even if its lease has expired.
+
+        Attributes:
+            task: Task dict as returned by lease.
+            results: List of URL dicts of the task.
+            tasks: List of new task dicts.
+        Output: True if the completion was saved.
+        """
+
+        raise NotImplementedError
+
+    def fail(self, task, error):
+        """ This function gives back a task that failed, to be tried again. After the maximum number of attempts the
+            error is saved as its result.
+
+        Attributes:
+            task: Task dict as returned by lease. Ignored if the lease is not the current one.
+            error: Explanation of the error.
+        Output: True if the failure was saved.
+        """
+
+        raise NotImplementedError
+
+    def results(self, job=None):
+        """ Output: List of tuples (job id, URL dict) of the tasks completed, in the order the tasks were added. """
+
+        raise NotImplementedError
+
+    def progress(self):
+        """ Output: Dict with the number of tasks 'pending', 'leased', 'done' and 'failed'. """
+
+        raise NotImplementedError
+
+    def unfinished(self):
+        """ Output: Number of tasks pending or leased. """
+
+        progress = self.progress()
+        return progress['pending'] + progress['leased']
+
+
+class SQLiteBroker(WorkBroker, SQLiteFile):
+    """  Work queue saved in a SQLite file, for several workers on the same host. SQLite locks the file, so the
+         workers can be threads or processes.
+    """
+
+    def __init__(self, path, maxAttempts=DEFAULT_TASK_ATTEMPTS):
+        """ Init function for the class.
+
+        Attributes:
+            path: Link of the SQLite file of the queue, created if it does not exist.
+            maxAttempts: Number of times a task is leased before it is saved as failed.
+        """
+
+        self.maxAttempts = maxAttempts
+        SQLiteFile.__init__(self, path, """
+            CREATE TABLE IF NOT EXISTS tasks (
+                position INTEGER PRIMARY KEY AUTOINCREMENT,
+                id TEXT UNIQUE NOT NULL,
+                job TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                lease TEXT,
+                worker TEXT,
+                leaseExpires REAL
+            );
+            CREATE INDEX IF NOT EXISTS tasksStatus ON tasks (status, leaseExpires);
+            CREATE TABLE IF NOT EXISTS results (
+                task TEXT NOT NULL,
+                number INTEGER NOT NULL,
+                url TEXT NOT NULL,
+                PRIMARY KEY (task, number)
+            );
+        """)
+
+    def transaction(self, function, *args):
+        """ This function runs a function in a write transaction of the connection of the thread.
+
+        Attributes:
+            function: Function called with the connection and args.
+        Output: Output of the function.
+        """
+
+        connection = self.connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            result = function(connection, *args)
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+        return result
+
+    def putTasks(self, connection, tasks):
+        """ This function adds tasks inside a transaction. Output: Number of tasks added. """
+
+        added = 0
+        for task in tasks:
+            added += connection.execute('INSERT OR IGNORE INTO tasks (id, job, kind, payload) VALUES (?, ?, ?, ?)',
+                                        (task['id'], task['job'], task['kind'], json.dumps(task['payload']))).rowcount
+        return added
+
+    def put(self, tasks):
+        return self.transaction(self.putTasks, tasks)
+
+    def leaseTasks(self, connection, worker, count, leaseSeconds):
+        """ This function leases tasks inside a transaction. Output: List of task dicts. """
+
+        now = time.time()
+        # Leases expired after the last attempt are not given again, their tasks failed.
+        for taskId, in connection.execute("SELECT id FROM tasks WHERE status = 'leased' AND leaseExpires <= ? AND "
+                                          "attempts >= ?", (now, self.maxAttempts)).fetchall():
+            self.saveFailure(connection, taskId, 'Lease expired ' + str(self.maxAttempts) + ' times.')
+        rows = connection.execute("SELECT id, job, kind, payload, attempts FROM tasks WHERE status = 'pending' OR "
+                                  "(status = 'leased' AND leaseExpires <= ?) ORDER BY position LIMIT ?",
+                                  (now, count)).fetchall()
+        tasks = []
+        for taskId, jobId, kind, payload, attempts in rows:
+            lease = uuid.uuid4().hex
+            connection.execute("UPDATE tasks SET status = 'leased', attempts = ?, lease = ?, worker = ?, "
+                               "leaseExpires = ? WHERE id = ?", (attempts + 1, lease, worker, now + leaseSeconds,
+                                                                 taskId))
+            tasks.append({'id': taskId, 'job': jobId, 'kind': kind, 'payload': json.loads(payload),
+                          'attempts': attempts + 1, 'lease': lease})
+        return tasks
+
+    def lease(self, worker, count, leaseSeconds=DEFAULT_LEASE_SECONDS):
+        return self.transaction(self.leaseTasks, worker, count, leaseSeconds)
+
+    def renew(self, task, leaseSeconds=DEFAULT_LEASE_SECONDS):
+        return self.connection().execute("UPDATE tasks SET leaseExpires = ? WHERE id = ? AND status = 'leased' AND "
+                                         "lease = ?", (time.time() + leaseSeconds, task['id'],
+                                                       task['lease'])).rowcount == 1
+
+    def saveResults(self, connection, taskId, results, status):
+        """ This function saves the results of a task inside a transaction and marks it as done or failed. """
+
+        connection.executemany('INSERT OR IGNORE INTO results VALUES (?, ?, ?)',
+                               [(taskId, number, json.dumps(url)) for number, url in enumerate(results)])
+        connection.execute('UPDATE tasks SET status = ?, lease = NULL, leaseExpires = NULL WHERE id = ?',
+                           (status, taskId))
+
+    def saveFailure(self, connection, taskId, error):
+        """ This function saves a task as failed, with the error as its result. """
+
+        self.saveResults(connection, taskId, [{'error': error}], 'failed')
+
+    def completeTask(self, connection, task, results, tasks):
+        """ This function completes a task inside a transaction. Output: True if the completion was saved. """
+
+        row = connection.execute('SELECT status FROM tasks WHERE id = ?', (task['id'],)).fetchone()
+        if row is None or row[0] in ('done', 'failed'):
+            return False
+        self.putTasks(connection, tasks)
+        self.saveResults(connection, task['id'], results, 'done')
+        return True
+
+    def complete(self, task, results, tasks):
+        return self.transaction(self.completeTask, task, results, tasks)
+
+    def failTask(self, connection, task, error):
+        """ This function gives back a task inside a transaction. Output: True if the failure was saved. """
+
+        row = connection.execute("SELECT attempts FROM tasks WHERE id = ? AND status = 'leased' AND lease = ?",
+                                 (task['id'], task['lease'])).fetchone()
+        if row is None:
+            return False
+        if row[0] >= self.maxAttempts:
+            self.saveFailure(connection, task['id'], error)
+        else:
+            connection.execute("UPDATE tasks SET status = 'pending', lease = NULL, leaseExpires = NULL WHERE id = ?",
+                               (task['id'],))
+        return True
+
+    def fail(self, task, error):
+        return self.transaction(self.failTask, task, error)
+
+    def results(self, job=None):
+        query = 'SELECT tasks.job, results.url FROM results JOIN tasks ON tasks.id = results.task'
+        arguments = ()
+        if job is not None:
+            query += ' WHERE tasks.job = ?'
+            arguments = (job,)
+        rows = self.connection().execute(query + ' ORDER BY tasks.position, results.number', arguments).fetchall()
+        return [(jobId, json.loads(url)) for jobId, url in rows]
+
+    def progress(self):
+        progress = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0}
+        progress.update(self.connection().execute('SELECT status, COUNT(*) FROM tasks GROUP BY status').fetchall())
+        return progress
+
+
+class TaskFailed(Exception):
+    """Exception raised when a task could not be done, so it is given back to the broker to be tried again.
+
+    Attributes:
+        message: explanation of the error
+    """
+
+    def __init__(self, message="Task failed."):
+        self.message = message
+        super().__init__(self.message)
+
+
+class BrokerServer:
+    """  HTTP endpoint of a broker, so workers on other hosts can share it with HTTPBroker. Every method of the broker
+         is a POST of a JSON body to /<method>, with the shared token in the header 'Authorization: Bearer <token>'.
+         Requests without the token are answered 401. Runs in a background thread.
+    """
+
+    def __init__(self, broker, port=DEFAULT_BROKER_PORT, host=DEFAULT_BROKER_HOST, token=None):
+        """ Init function for the class.
+
+        Attributes:
+            broker: WorkBroker to share, i.e. a SQLiteBroker.
+            port: Port of the server, 0 to choose a free one.
+            host: Address the server listens on, '0.0.0.0' for other hosts.
+            token: Token the clients have to send. If not set, a random one, read it from the token attribute.
+        """
+
+        self.broker = broker
+        self.token = token if token else secrets.token_urlsafe(32)
+        self.server = ThreadingHTTPServer((host, port), self.handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        """ Output: Base URL of the server. """
+
+        host, port = self.server.server_address[:2]
+        return 'http://' + (socket.gethostname() if host == '0.0.0.0' else host) + ':' + str(port)
+
+    def handler(self):
+        broker = self.broker
+        authorization = ('Bearer ' + self.token).encode('utf8')
+        methods = {
+            '/put': lambda body: broker.put(body['tasks']),
+            '/lease': lambda body: broker.lease(body['worker'], body['count'], body['leaseSeconds']),
+            '/renew': lambda body: broker.renew(body['task'], body['leaseSeconds']),
+            '/complete': lambda body: broker.complete(body['task'], body['results'], body['tasks']),
+            '/fail': lambda body: broker.fail(body['task'], body['error']),
+            '/results': lambda body: broker.results(body.get('job')),
+            '/progress': lambda body: broker.progress(),
+        }
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if not hmac.compare_digest(self.headers.get('Authorization', '').encode('utf8'), authorization):
+                    self.send_error(401)
+                    return
+                method = methods.get(urlparse(self.path).path)
+                if method is None:
+                    self.send_error(404)
+                    return
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                answer = json.dumps(method(json.loads(body or b'{}'))).encode('utf8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(answer)))
+                self.end_headers()
+                self.wfile.write(answer)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        """ This function starts the server, if it is not running yet. Output: the server. """
+
+        if not self.thread.is_alive():
+            self.thread.start()
+        return self
+
+    def stop(self):
+        """ This function stops the server. """
+
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class HTTPBroker(WorkBroker):
+    """  Client of a broker shared by a BrokerServer on another host. Any other WorkBroker, i.e. a SQLiteBroker, can
+         take its place when all the workers run on the same host.
+    """
+
+    def __init__(self, url, token=None, timeout=BROKER_TIMEOUT):
+        """ Init function for the class.
+
+        Attributes:
+            url: Base URL of the BrokerServer, i.e. http://coordinator:8765
+            token: Token of the BrokerServer. If not set, the one of the environment variable
+                   GITHUB_CRAWLER_BROKER_TOKEN.
+            timeout: Seconds to wait for an answer of the server.
+        """
+
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers['Authorization'] = 'Bearer ' + (token or os.environ.get(TOKEN_VARIABLE, ''))
+
+    def call(self, method, **body):
+        """ This function calls a method of the remote broker.
+
+        Attributes:
+            method: Name of the method, i.e. 'lease'.
+            body: Arguments of the method.
+        Output: Output of the method.
+        """
+
+        response = self.session.post(self.url + '/' + method, json=body, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def put(self, tasks):
+        return self.call('put', tasks=tasks)
+
+    def lease(self, worker, count, leaseSeconds=DEFAULT_LEASE_SECONDS):
+        return self.call('lease', worker=worker, count=count, leaseSeconds=leaseSeconds)
+
+    def renew(self, task, leaseSeconds=DEFAULT_LEASE_SECONDS):
+        return self.call('renew', task=task, leaseSeconds=leaseSeconds)
+
+    def complete(self, task, results, tasks):
+        return self.call('complete', task=task, results=results, tasks=tasks)
+
+    def fail(self, task, error):
+        return self.call('fail', task=task, error=error)
+
+    def results(self, job=None):
+        return [tuple(result) for result in self.call('results', job=job)]
+
+    def progress(self):
+        return self.call('progress')
+
+
+def submitJobs(broker, jobs, maxPages=1):
+    """ This function adds the first search page of every job to a broker. Jobs already submitted are ignored.
+
+    Attributes:
+        broker: WorkBroker of the crawl.
+        jobs: List of tuples (job id, input JSON or input file link), as returned by loadJobs.
+        maxPages: Maximum number of search result pages of every job.
+    Output: Number of jobs added.
+    """
+
+    tasks = []
+    for jobId, job in jobs:
+        if not isinstance(job, dict):
+            with open(job, encoding="utf8") as file:
+                job = json.load(file)
+        tasks.append(searchTask(jobId, job, 1, maxPages))
+    return broker.put(tasks)
+
+
+def collectResults(broker):
+    """ Output: Dict of job id to list of URL of the search, as BatchRunner.run. """
+
+    results = {}
+    for jobId, url in broker.results():
+        results.setdefault(jobId, []).append(url)
+    return results
+
+
+class CrawlWorker:
+    """  Worker of a crawl shared by several processes or hosts. It leases tasks of the broker, a search page or a
+         repository, runs them with its own proxies and sends back their results and the tasks they generate. The
+         leases of the tasks still running are renewed, so slow tasks are not given to another worker. If the broker
+         can not be reached, the error is counted in 'broker_errors_total' and the worker goes on: a task whose
+         results could not be sent is run again when its lease expires.
+
+         Usage: `CrawlWorker(SQLiteBroker('queue.sqlite'), ['1.1.1.1:80']).run()`
+    """
+
+    def __init__(self, broker, proxies, workerId=None, maxWorkers=DEFAULT_MAX_WORKERS,
+                 leaseSeconds=DEFAULT_LEASE_SECONDS, pollInterval=DEFAULT_POLL_INTERVAL,
+                 maxRequestsPerProxy=DEFAULT_MAX_REQUESTS_PER_PROXY, attempts=DEFAULT_CONNECTION_ATTEMPTS,
+                 print_info=False, retryPolicy=None, cache=None, collapseDuplicates=False, parser=DEFAULT_PARSER,
+                 metrics=None, **crawlerArguments):
+        """ Init function for the class.
+
+        Attributes:
+            broker: WorkBroker of the crawl.
+            proxies: List of proxies of this worker, i.e. ['1.1.1.1:80'].
+            workerId: Name of the worker. If not set, the host name and the process id.
+            maxWorkers: Maximum number of tasks running at the same time.
+            leaseSeconds: Seconds the worker has to complete or renew a task before it is given to another one.
+            pollInterval: Seconds to wait before asking again when the broker has no tasks ready.
+            maxRequestsPerProxy: Maximum number of requests in flight for each proxy.
+            attempts: Number of attempts in case of connection error.
+            print_info: If True, prints info about the process.
+            retryPolicy: RetryPolicy of every task. If not set, a new one is created with the attempts.
+            cache: HTTPCache of the repository pages.
+            collapseDuplicates: If True, the repeated URLs of a search page are returned once with their "hits".
+            parser: Name of the HTML extraction backend or a ParserBackend.
+            metrics: CrawlerMetrics of the worker. If not set, a new one is created.
+            crawlerArguments: Other arguments of every GithubCrawler, i.e. githubURL.
+        """
+
+        if not proxies:
+            raise GithubCrawler.ProxyNotValid
+        self.broker = broker
+        self.proxies = list(proxies)
+        self.id = workerId if workerId is not None else socket.gethostname() + ':' + str(os.getpid())
+        self.maxWorkers = maxWorkers
+        self.leaseSeconds = leaseSeconds
+        self.pollInterval = pollInterval
+        self.print_info = print_info
+        self.crawlerArguments = dict(crawlerArguments, print_info=print_info, cache=cache,
+                                     collapseDuplicates=collapseDuplicates, parser=getParser(parser),
+                                     metrics=metrics if metrics is not None else CrawlerMetrics(),
+                                     retryPolicy=retryPolicy if retryPolicy is not None else RetryPolicy(attempts),
+                                     proxyPool=ProxyPool([{"http": 'http://' + proxy, "https": 'https://' + proxy}
+                                                          for proxy in self.proxies], maxRequestsPerProxy))
+        self.metrics = self.crawlerArguments['metrics']
+        self.crawlers = {}
+        self.crawlersLock = threading.Lock()
+        self.stopped = threading.Event()
+
+    def callBroker(self, method, *args, default=None):
+        """ This function calls a method of the broker, without stopping the worker if the broker can not be reached.
+
+        Attributes:
+            method: Name of the method, i.e. 'complete'.
+            args: Arguments of the method.
+            default: Output if the broker can not be reached.
+        Output: Output of the method.
+        """
+
+        try:
+            return getattr(self.broker, method)(*args)
+        except BROKER_ERRORS as e:
+            self.metrics.inc('broker_errors_total', method=method)
+            if self.print_info:
+                print("BROKER ERROR: " + method + ': ' + str(e))
+            return default
+
+    def crawler(self, task):
+        """ Output: GithubCrawler of the job of a task, with the proxies of the worker. """
+
+        with self.crawlersLock:
+            crawler = self.crawlers.get(task['job'])
+            if crawler is None:
+                job = dict(task['payload']['input'], proxies=self.proxies)
+                crawler = self.crawlers[task['job']] = GithubCrawler(job, **self.crawlerArguments)
+            return crawler
+
+    def runSearch(self, task):
+        """ This function downloads and parses a search result page.
+
+        Attributes:
+            task: Search task dict.
+        Output: Tuple with the list of URLs ready and the list of new tasks.
+        """
+
+        crawler = self.crawler(task)
+        payload = task['payload']
+        page = payload['page']
+        links, hasNextPage = crawler.getSearchPage(page)
+        if not links and page > 1:
+            return [], []
+
+        tasks = [searchTask(task['job'], payload['input'], page + 1, payload['maxPages'])] \
+            if hasNextPage and page < payload['maxPages'] else []
+        if not links or crawler.type != 'Repositories':
+            return list(crawler.iterURLs(links)), tasks
+
+        hits = Counter(links) if crawler.collapseDuplicates else None
+        for link in (list(hits) if hits is not None else links):
+            tasks.append(repositoryTask(task['job'], payload['input'], link,
+                                        hits[link] if hits is not None else None))
+        return [], tasks
+
+    def runRepository(self, task):
+        """ This function gets the info of a repository.
+
+        Attributes:
+            task: Repository task dict.
+        Output: Tuple with the list of URLs ready and the list of new tasks. Raises TaskFailed if the repository
+                could not be downloaded, so the task is tried again.
+        """
+
+        payload = task['payload']
+        url = self.crawler(task).getRepositoryResult(payload['link'])
+        stats = url['extra']['language_stats']
+        if isinstance(stats, dict) and 'error' in stats:
+            raise TaskFailed(stats['error'])
+        if payload['hits'] is not None:
+            url['hits'] = payload['hits']
+        return [url], []
+
+    def process(self, task):
+        """ This function runs a task and sends its results to the broker, or gives it back if it failed.
+
+        Attributes:
+            task: Task dict as returned by lease.
+        """
+
+        try:
+            results, tasks = self.runSearch(task) if task['kind'] == 'search' else self.runRepository(task)
+        except (requests.exceptions.RequestException, GithubCrawler.DataNotFoundException,
+                GithubCrawler.KeyWordNotValid, GithubCrawler.TypeNotValid, TaskFailed) as e:
+            if self.print_info:
+                print("ERROR: " + task['id'] + ': ' + str(e))
+            self.callBroker('fail', task, getattr(e, 'message', str(e)))
+            return
+        if not self.callBroker('complete', task, [dict(url) for url in results], tasks, default=False):
+            return
+        if self.print_info:
+            print("DONE: " + task['id'])
+
+    def run(self, stopWhenIdle=True):
+        """ Run function of the worker. It leases tasks while it has free slots and there are tasks ready.
+
+        Attributes:
+            stopWhenIdle: If True, the worker stops when no task is pending or leased. If False, it waits for new
+                          tasks until stop is called.
+        Output: Number of tasks run.
+        """
+
+        done = queue.Queue()
+        running = {}
+        processed = 0
+        lastRenewal = time.monotonic()
+        with ThreadPoolExecutor(self.maxWorkers) as executor:
+            while True:
+                leased = []
+                if len(running) < self.maxWorkers and not self.stopped.is_set():
+                    leased = self.callBroker('lease', self.id, self.maxWorkers - len(running), self.leaseSeconds,
+                                             default=[])
+                    for task in leased:
+                        future = executor.submit(self.process, task)
+                        running[future] = task
+                        future.add_done_callback(done.put)
+                if running and time.monotonic() - lastRenewal >= self.leaseSeconds / RENEWALS_PER_LEASE:
+                    lastRenewal = time.monotonic()
+                    for task in list(running.values()):
+                        self.callBroker('renew', task, self.leaseSeconds)
+                if running:
+                    try:
+                        futures = [done.get(timeout=self.pollInterval if not leased else 0.01)]
+                    except queue.Empty:
+                        continue
+                    while not done.empty():
+                        futures.append(done.get())
+                    for future in futures:
+                        del running[future]
+                        processed += 1
+                        future.result()
+                elif self.stopped.is_set() or (stopWhenIdle and not self.callBroker('unfinished', default=1)):
+                    return processed
+                elif not leased:
+                    self.stopped.wait(self.pollInterval)
+
+    def stop(self):
+        """ This function stops the worker after the tasks it is running. """
+
+        self.stopped.set()
+
+
+def openBroker(broker, token=None):
+    """ Output: HTTPBroker with the token if broker is an http URL, SQLiteBroker of the file if not. """
+
+    return HTTPBroker(broker, token) if broker.startswith(('http://', 'https://')) else SQLiteBroker(broker)
+
+
+def main(arguments=None):
+    """ This function runs a part of a shared crawl from the command line:
+        - `submit queue.sqlite jobs.jsonl --max-pages 5` adds the jobs to the queue.
+        - `serve queue.sqlite --host 0.0.0.0 --port 8765` shares the queue with other hosts. The token of the server
+          is GITHUB_CRAWLER_BROKER_TOKEN or --token, or a random one printed to stderr, and the clients of the server
+          have to be given the same one.
+        - `work http://coordinator:8765 --proxies 1.1.1.1:80 2.2.2.2:80` runs a worker until the queue is empty.
+        - `results queue.sqlite --output results.ndjson` writes one JSON line per URL, with the id of its job.
+
+    Attributes:
+        arguments: List of command line arguments. If not set, the ones of sys.argv.
+    Output: Exit code.
+    """
+
+    parser = argparse.ArgumentParser(description='Shares one GitHub crawl between many workers')
+    commands = parser.add_subparsers(dest='command', required=True)
+    submit = commands.add_parser('submit', help='add jobs to the queue')
+    submit.add_argument('broker', help='SQLite file of the queue or URL of its server')
+    submit.add_argument('source', help='directory of input JSON files or JSONL file with one job per line')
+    submit.add_argument('--max-pages', type=int, default=1, help='search pages of every job, at most ' +
+                        str(MAX_SEARCH_PAGES))
+    serve = commands.add_parser('serve', help='share the queue with workers on other hosts')
+    serve.add_argument('broker', help='SQLite file of the queue')
+    serve.add_argument('--host', default=DEFAULT_BROKER_HOST, help='address to listen on, 0.0.0.0 for other hosts')
+    serve.add_argument('--port', type=int, default=DEFAULT_BROKER_PORT)
+    serve.add_argument('--max-attempts', type=int, default=DEFAULT_TASK_ATTEMPTS)
+    work = commands.add_parser('work', help='run tasks of the queue until it is empty')
+    work.add_argument('broker', help='SQLite file of the queue or URL of its server')
+    work.add_argument('--proxies', nargs='+', required=True)
+    work.add_argument('--worker-id')
+    work.add_argument('--max-workers', type=int, default=DEFAULT_MAX_WORKERS)
+    work.add_argument('--max-requests-per-proxy', type=int, default=DEFAULT_MAX_REQUESTS_PER_PROXY)
+    work.add_argument('--lease-seconds', type=float, default=DEFAULT_LEASE_SECONDS)
+    work.add_argument('--attempts', type=int, default=DEFAULT_CONNECTION_ATTEMPTS)
+    work.add_argument('--parser', default=DEFAULT_PARSER)
+    work.add_argument('--collapse-duplicates', action='store_true')
+    work.add_argument('--forever', action='store_true', help='wait for new tasks when the queue is empty')
+    results = commands.add_parser('results', help='write the results of the queue')
+    results.add_argument('broker', help='SQLite file of the queue or URL of its server')
+    results.add_argument('--output', help='file to write the results, compressed if it ends in .gz or .zst. stdout '
+                                          'if not set')
+    for command in (submit, serve, work, results):
+        command.add_argument('--token', default=os.environ.get(TOKEN_VARIABLE),
+                             help='token of the broker server, ' + TOKEN_VARIABLE + ' if not set')
+    arguments = parser.parse_args(arguments)
+
+    if arguments.command == 'submit':
+        submitJobs(openBroker(arguments.broker, arguments.token), loadJobs(arguments.source),
+                   min(arguments.max_pages, MAX_SEARCH_PAGES))
+    elif arguments.command == 'serve':
+        server = BrokerServer(SQLiteBroker(arguments.broker, arguments.max_attempts), arguments.port,
+                              arguments.host, arguments.token).start()
+        if not arguments.token:
+            print('token: ' + server.token, file=sys.stderr)
+        try:
+            server.thread.join()
+        except KeyboardInterrupt:
+            server.stop()
+    elif arguments.command == 'work':
+        CrawlWorker(openBroker(arguments.broker, arguments.token), arguments.proxies, arguments.worker_id,
+                    arguments.max_workers, arguments.lease_seconds,
+                    maxRequestsPerProxy=arguments.max_requests_per_proxy, attempts=arguments.attempts,
+                    parser=arguments.parser,
+                    collapseDuplicates=arguments.collapse_duplicates).run(not arguments.forever)
+    else:
+        with openSink(arguments.output) as sink:
+            for jobId, url in openBroker(arguments.broker, arguments.token).results():
+                sink.write(dict(url, job=jobId))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
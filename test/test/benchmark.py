@@ -0,0 +1,350 @@
+import argparse
+import contextlib
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from githubCrawler.src.githubCrawler.githubCrawler import GithubCrawler
+from githubCrawler.src.githubCrawler.parsers import DEFAULT_PARSER, ParserBackend, getParser
+from githubCrawler.src.githubCrawler.retryPolicy import RetryPolicy
+from githubCrawler.test.test.stubServer import HTML_FOLDER, StubGithubServer, writeInput
+
+# Benchmark configuration values
+DEFAULT_REPEAT = 20
+DEFAULT_TOLERANCE = 0.2
+RETRY_BASE_DELAY = 0.01
+REPOSITORY_LINK = '/qiyuangong/leetcode'
+REPOSITORY_PAGE = 'extra_case_correct.txt'
+SEARCH_PAGE = 'python_java_repositories.txt'
+MODES = ['inprocess', 'stub']
+
+# Operations benchmarked, every one gets a new crawler and the HTML of the search page
+OPERATIONS = {
+    'run': lambda crawler, html: crawler.run(),
+    'getURLs': lambda crawler, html: crawler.getURLs(html),
+    'getLanguageStats': lambda crawler, html: crawler.getLanguageStats(crawler.githubURL + REPOSITORY_LINK)
+}
+
+# Settings that have to be the same to compare two runs
+SETTINGS = ['mode', 'latency', 'error_rate', 'parser']
+
+# Metrics where a bigger value is better, in the rest a bigger value is a regression
+HIGHER_IS_BETTER = ['pages_per_second']
+
+
+class RecordingParser(ParserBackend):
+    """  Parser backend that keeps the pages extracted by another backend, so their parsing can be timed later in one
+         thread. Timed inside the threads of the crawler, the parsing would also count the waits for the GIL.
+    """
+
+    def __init__(self, parser):
+        """ Init function for the class.
+
+        Attributes:
+            parser: ParserBackend that does the extraction.
+        """
+
+        self.parser = parser
+        self.name = parser.name
+        self.pages = []
+        self.lock = threading.Lock()
+
+    def extract(self, html, plan):
+        with self.lock:
+            self.pages.append((html, plan))
+        return self.parser.extract(html, plan)
+
+
+def parseSeconds(parser, pages):
+    """ This function times the extraction of pages one after another in this thread.
+
+    Attributes:
+        parser: ParserBackend.
+        pages: List of tuples (html, plan), as kept by RecordingParser.
+    Output: Seconds of the extraction of all the pages.
+    """
+
+    start = time.perf_counter()
+    for html, plan in pages:
+        parser.extract(html, plan)
+    return time.perf_counter() - start
+
+
+def readPage(name):
+    """ Output: Text of a mock HTML of ../html. """
+
+    with open(os.path.join(HTML_FOLDER, name), encoding="utf8") as file:
+        return file.read()
+
+
+def peakAllocated(run):
+    """ This function measures the memory allocated by a function. The peak of the process would only show the
+        biggest value so far, the same for every operation after the first one.
+
+    Attributes:
+        run: Function without arguments.
+    Output: Peak of the memory allocated by Python while the function runs, in KB.
+    """
+
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        run()
+        return (tracemalloc.get_traced_memory()[1] - base) // 1024
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+
+
+def maxRSS():
+    """ Output: Peak resident memory of this process so far in KB, None if the platform does not report it. """
+
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def peakRSS(operation, mode, latency, errorRate, parser):
+    """ This function measures the resident memory of an operation, which also counts the memory of libxml2 and
+        the rest of C libraries that tracemalloc does not see. Every operation runs in a new process, as the peak of
+        this process would be the biggest value so far.
+
+    Attributes:
+        operation: Name of the operation in OPERATIONS.
+        Rest of attributes: see benchmark.
+    Output: Peak resident memory in KB of a new process that runs the operation once, None if it can not be measured.
+    """
+
+    command = [sys.executable, os.path.abspath(__file__), '--peak-rss', '--operation', operation, '--mode', mode,
+               '--latency', str(latency), '--error-rate', str(errorRate), '--parser', parser]
+    environ = dict(os.environ, PYTHONPATH=os.pathsep.join(path for path in sys.path if path))
+    process = subprocess.run(command, stdout=subprocess.PIPE, universal_newlines=True, env=environ)
+    lines = process.stdout.strip().splitlines()
+    if process.returncode != 0 or not lines:
+        return None
+    return json.loads(lines[-1])['peak_rss_kb']
+
+
+def percentile(values, fraction):
+    """ Output: Value below which the fraction of the sorted values falls, nearest rank. """
+
+    values = sorted(values)
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+
+@contextlib.contextmanager
+def environment(mode, latency=0, errorRate=0):
+    """ This function prepares where the pages come from.
+
+    Attributes:
+        mode: 'inprocess' to return the mock HTML without any request, 'stub' to download it from a StubGithubServer.
+        latency: Seconds the stub server waits before answering. Only for 'stub'.
+        errorRate: Fraction of the requests the stub server answers with 503. Only for 'stub'.
+    Output: Tuple (input JSON link, githubURL, download), where download replaces the downloadHTML of a crawler, or is
+            None to keep the real one.
+    """
+
+    if mode == 'inprocess':
+        pages = {True: readPage(REPOSITORY_PAGE), False: readPage(SEARCH_PAGE)}
+        link = writeInput('Repositories', ['127.0.0.1:9'])
+        try:
+            yield link, 'https://github.com', lambda url, useCache=False: pages[useCache]
+        finally:
+            os.remove(link)
+    elif mode == 'stub':
+        with StubGithubServer(SEARCH_PAGE, REPOSITORY_PAGE, latency=latency, errorRate=errorRate) as stub:
+            link = writeInput('Repositories', [stub.address])
+            try:
+                yield link, stub.url, None
+            finally:
+                os.remove(link)
+    else:
+        raise ValueError("Mode not valid. Has to be: " + str(MODES))
+
+
+def countDownloads(crawler, download):
+    """ This function replaces the downloadHTML of a crawler by one that counts the pages downloaded.
+
+    Attributes:
+        crawler: GithubCrawler.
+        download: Function that downloads the pages, None to use the downloadHTML of the crawler.
+    Output: List whose only value is the number of pages downloaded.
+    """
+
+    download = download or crawler.downloadHTML
+    counter = [0]
+    lock = threading.Lock()
+
+    def downloadHTML(link, useCache=False):
+        html = download(link, useCache)
+        with lock:
+            counter[0] += 1
+        return html
+
+    crawler.downloadHTML = downloadHTML
+    return counter
+
+
+def newCrawler(link, githubURL, download, parser):
+    """ Output: Tuple (GithubCrawler that records the pages it parses, downloads counter of countDownloads). """
+
+    crawler = GithubCrawler(link, githubURL=githubURL, parser=RecordingParser(getParser(parser)),
+                            retryPolicy=RetryPolicy(baseDelay=RETRY_BASE_DELAY))
+    return crawler, countDownloads(crawler, download)
+
+
+def benchmark(operation, mode='inprocess', repeat=DEFAULT_REPEAT, latency=0, errorRate=0, parser=DEFAULT_PARSER):
+    """ This function measures an operation of the crawler.
+
+    Attributes:
+        operation: Name of the operation in OPERATIONS.
+        mode: 'inprocess' or 'stub', see environment.
+        repeat: Number of times the operation is run, each one with a new crawler.
+        latency: Seconds the stub server waits before answering.
+        errorRate: Fraction of the requests the stub server answers with 503.
+        parser: Name of the parser backend of the crawler.
+    Output: Dict with pages_per_second, parse_us_per_page (parsing the pages of the operation in one thread),
+            p50_ms, p99_ms, peak_alloc_kb (memory allocated by Python in one more run of the operation, traced apart so
+            the tracing does not slow down the timed runs) and peak_rss_kb (see peakRSS).
+    """
+
+    call = OPERATIONS[operation]
+    searchHTML = readPage(SEARCH_PAGE)
+    latencies = []
+    pages = 0
+    parsedPages = []
+    with environment(mode, latency, errorRate) as (link, githubURL, download):
+        for _ in range(repeat):
+            crawler, downloads = newCrawler(link, githubURL, download, parser)
+            start = time.perf_counter()
+            call(crawler, searchHTML)
+            latencies.append(time.perf_counter() - start)
+            pages += downloads[0]
+            parsedPages = crawler.parser.pages
+
+        crawler, _ = newCrawler(link, githubURL, download, parser)
+        peak = peakAllocated(lambda: call(crawler, searchHTML))
+
+    return {
+        'pages_per_second': pages / sum(latencies),
+        'parse_us_per_page': parseSeconds(getParser(parser), parsedPages) / len(parsedPages) * 1e6
+        if parsedPages else 0.0,
+        'p50_ms': percentile(latencies, 0.5) * 1e3,
+        'p99_ms': percentile(latencies, 0.99) * 1e3,
+        'peak_alloc_kb': peak,
+        'peak_rss_kb': peakRSS(operation, mode, latency, errorRate, parser)
+    }
+
+
+def runBenchmarks(operations=None, mode='inprocess', repeat=DEFAULT_REPEAT, latency=0, errorRate=0,
+                  parser=DEFAULT_PARSER):
+    """ This function measures several operations of the crawler.
+
+    Attributes:
+        operations: Names of the operations in OPERATIONS. If not set, all of them.
+        Rest of attributes: see benchmark.
+    Output: Dict with the settings of the run and the metrics of every operation in 'results', ready to be saved as
+            a baseline.
+    """
+
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'mode': mode,
+        'repeat': repeat,
+        'latency': latency,
+        'error_rate': errorRate,
+        'parser': parser,
+        'results': {operation: benchmark(operation, mode, repeat, latency, errorRate, parser)
+                    for operation in operations or OPERATIONS}
+    }
+
+
+def compare(baseline, current, tolerance=DEFAULT_TOLERANCE):
+    """ This function finds the metrics that got worse than a baseline.
+
+    Attributes:
+        baseline: Output of runBenchmarks of the old version.
+        current: Output of runBenchmarks of the new version.
+        tolerance: Fraction a metric can get worse before it is a regression.
+    Output: List of explanations of every regression, empty if there is none.
+    """
+
+    regressions = []
+    for operation, metrics in current['results'].items():
+        for metric, value in metrics.items():
+            old = baseline['results'].get(operation, {}).get(metric)
+            if old is None or value is None:
+                continue
+            if metric in HIGHER_IS_BETTER:
+                worse = value < old * (1 - tolerance)
+            else:
+                worse = value > old * (1 + tolerance)
+            if worse:
+                regressions.append(operation + ' ' + metric + ': ' + format(old, '.2f') + ' -> ' + format(value, '.2f'))
+    return regressions
+
+
+def main(arguments=None):
+    """ This function runs the benchmarks from the command line, i.e.
+        `python benchmark.py --mode stub --latency 0.05 --error-rate 0.1 --compare baseline.json`
+
+    Attributes:
+        arguments: List of command line arguments. If not set, the ones of sys.argv.
+    Output: Exit code, 1 if there is any regression against the baseline.
+    """
+
+    parser = argparse.ArgumentParser(description='Benchmark of the GitHub crawler with the mock HTML of ../html')
+    parser.add_argument('--mode', choices=MODES, default='inprocess')
+    parser.add_argument('--operation', action='append', choices=list(OPERATIONS))
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--latency', type=float, default=0, help='seconds of latency of the stub server')
+    parser.add_argument('--error-rate', type=float, default=0, help='fraction of 503 answers of the stub server')
+    parser.add_argument('--parser', default=DEFAULT_PARSER)
+    parser.add_argument('--save', help='JSON file to save the results as a baseline')
+    parser.add_argument('--compare', help='JSON file of a baseline to compare the results with')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument('--peak-rss', action='store_true', help=argparse.SUPPRESS)
+    arguments = parser.parse_args(arguments)
+
+    if arguments.peak_rss:
+        # Process of peakRSS: one run of the operation and its peak resident memory as the last line
+        operation = (arguments.operation or list(OPERATIONS))[0]
+        with environment(arguments.mode, arguments.latency, arguments.error_rate) as (link, githubURL, download):
+            crawler, _ = newCrawler(link, githubURL, download, arguments.parser)
+            OPERATIONS[operation](crawler, readPage(SEARCH_PAGE))
+        print(json.dumps({'peak_rss_kb': maxRSS()}))
+        return 0
+
+    results = runBenchmarks(arguments.operation, arguments.mode, arguments.repeat, arguments.latency,
+                            arguments.error_rate, arguments.parser)
+    print(json.dumps(results, indent=2))
+    if arguments.save:
+        with open(arguments.save, 'w') as file:
+            json.dump(results, file, indent=2)
+    if arguments.compare:
+        with open(arguments.compare) as file:
+            baseline = json.load(file)
+        if any(baseline.get(setting) != results[setting] for setting in SETTINGS):
+            print("WARNING: the baseline was run with other settings: " +
+                  str({setting: baseline.get(setting) for setting in SETTINGS}))
+        regressions = compare(baseline, results, arguments.tolerance)
+        for regression in regressions:
+            print("REGRESSION: " + regression)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,126 @@
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# Folder of the mock HTML
+HTML_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'html')
+
+
+def writeInput(crawlType, proxies):
+    """ Writes an input JSON for the crawler and returns its link. """
+
+    inputFile = tempfile.NamedTemporaryFile('w', suffix='.json', delete=False)
+    with inputFile:
+        json.dump({"keywords": ["Python", "Java"], "proxies": proxies, "type": crawlType}, inputFile)
+    return inputFile.name
+
+
+class StubGithubServer:
+    """  Local HTTP server that serves the mock HTML of ../html as if it was GitHub. It also works as the proxy of
+         the crawler, so the proxy list of the input JSON can point to it.
+    """
+
+    def __init__(self, searchPage, repositoryPage='extra_case_correct.txt', lastPage=None, emptyPage=None, latency=0,
+                 errorRate=0, seed=0):
+        """ Init function for the class.
+
+        Attributes:
+            searchPage: Name of the mock HTML returned for /search.
+            repositoryPage: Name of the mock HTML returned for any other path.
+            lastPage: Last search page number that returns searchPage, the next ones return emptyPage.
+            emptyPage: Name of the mock HTML returned for the search pages after lastPage.
+            latency: Seconds the server waits before answering every request.
+            errorRate: Fraction of the requests answered with 503 Service Unavailable.
+            seed: Seed of the random errors, so every run fails the same requests.
+        """
+
+        self.pages = {}
+        for page in filter(None, (searchPage, repositoryPage, emptyPage)):
+            with open(os.path.join(HTML_FOLDER, page), encoding="utf8") as file:
+                self.pages[page] = file.read().encode('utf8')
+        self.searchPage = searchPage
+        self.repositoryPage = repositoryPage
+        self.lastPage = lastPage
+        self.emptyPage = emptyPage
+        self.latency = latency
+        self.errorRate = errorRate
+        self.random = random.Random(seed)
+        self.requests = []
+        self.notModified = 0
+        self.errors = 0
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self.handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def address(self):
+        """ Output: host:port of the server, as written in the proxies of the input JSON. """
+
+        return '127.0.0.1:' + str(self.server.server_address[1])
+
+    @property
+    def url(self):
+        """ Output: Base URL of the server, to be used as githubURL of the crawler. """
+
+        return 'http://' + self.address
+
+    def page(self, path, query):
+        """ Output: Name of the mock HTML for the request. """
+
+        if path != '/search':
+            return self.repositoryPage
+        page = int(parse_qs(query).get('p', ['1'])[0])
+        return self.emptyPage if self.lastPage is not None and page > self.lastPage else self.searchPage
+
+    def handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                stub.requests.append(url.path + ('?' + url.query if url.query else ''))
+                if stub.latency:
+                    time.sleep(stub.latency)
+                if stub.errorRate and stub.random.random() < stub.errorRate:
+                    stub.errors += 1
+                    self.send_response(503)
+                    self.send_header('Retry-After', '0')
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                page = stub.page(url.path, url.query)
+                etag = '"' + page + '"'
+                if self.headers.get('If-None-Match') == etag:
+                    stub.notModified += 1
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                body = stub.pages[page]
+                self.send_response(200)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
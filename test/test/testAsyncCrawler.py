@@ -0,0 +1,152 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import TestCase
+from githubCrawler.src.githubCrawler.asyncCrawler import AsyncGithubCrawler
+from githubCrawler.src.githubCrawler.githubCrawler import GithubCrawler
+from githubCrawler.src.githubCrawler.httpCache import HTTPCache
+from githubCrawler.src.githubCrawler.sinks import NDJSONSink
+from githubCrawler.test.test.stubServer import StubGithubServer, writeInput
+from githubCrawler.test.test.testSinks import readLines
+
+
+class TestAsyncCrawler(TestCase):
+    """  Tests for the asyncio GitHub crawler against a local stub server """
+
+    def crawl(self, crawlType, searchPage, **kwargs):
+        with StubGithubServer(searchPage) as stub:
+            link = writeInput(crawlType, [stub.address])
+            try:
+                crawler = AsyncGithubCrawler(link, githubURL=stub.url, **kwargs)
+                return stub, asyncio.run(crawler.run())
+            finally:
+                os.remove(link)
+
+    def testRepositories(self):
+        """Test that the async crawler downloads the search and the language stats of every repository """
+
+        stub, response = self.crawl('Repositories', 'python_java_repositories.txt')
+
+        self.assertEqual(len(response), 10)
+        self.assertIn({'url': stub.url + '/qiyuangong/leetcode',
+                       'extra': {'owner': 'qiyuangong',
+                                 'language_stats': {'Python': '77.4', 'Java': '20.4', 'C++': '2.2'}}}, response)
+        self.assertEqual(len(stub.requests), 11)
+
+    def testRepositoriesLowConcurrency(self):
+        """Test that the async crawler works when only one request can be in flight """
+
+        _, response = self.crawl('Repositories', 'python_java_repositories.txt', maxConcurrency=1,
+                                 connectionsPerProxy=1)
+
+        self.assertEqual(len(response), 10)
+
+    def testIssues(self):
+        """Test that the async crawler returns the same URLs as run() for issues """
+
+        stub, response = self.crawl('Issues', 'python_java_issues.txt')
+
+        self.assertEqual(response[0], {'url': stub.url + '/debrajhyper/Topic_Learning_Resources/issues'})
+        self.assertEqual(len(response), 10)
+
+    def testWikisNoURLFound(self):
+        """Test that the async crawler works correctly when no URL is found """
+
+        _, response = self.crawl('Wikis', 'no_wikis.txt')
+
+        self.assertEqual(response, [{'url_not_found': 'Not found any URL for this search.'}])
+
+    def testIterResults(self):
+        """Test that the async crawler walks the search pages and generates every URL """
+
+        async def collect(crawler):
+            return [url async for url in crawler.iterResults()]
+
+        with StubGithubServer('python_java_repositories.txt', lastPage=2, emptyPage='no_repositories.txt') as stub:
+            link = writeInput('Repositories', [stub.address])
+            try:
+                response = asyncio.run(collect(AsyncGithubCrawler(link, githubURL=stub.url)))
+            finally:
+                os.remove(link)
+
+        self.assertEqual(len(response), 20)
+        self.assertEqual([request for request in stub.requests if request.startswith('/search')][-1][-4:], '&p=3')
+
+    def testSameMethodsAsCrawler(self):
+        """Test that the methods of the crawler that download are coroutines that give the same results """
+
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'results.ndjson')
+        with StubGithubServer('python_java_repositories.txt') as stub:
+            link = writeInput('Repositories', [stub.address])
+            try:
+                crawler = GithubCrawler(link, githubURL=stub.url)
+                asyncCrawler = AsyncGithubCrawler(link, githubURL=stub.url)
+                self.assertEqual(asyncio.run(asyncCrawler.countResults()), crawler.countResults())
+                self.assertEqual(asyncio.run(asyncCrawler.getSearchPage()), crawler.getSearchPage())
+                repository = stub.url + '/qiyuangong/leetcode'
+                self.assertEqual(asyncio.run(asyncCrawler.downloadPage(repository, 'Stats')).languages,
+                                 crawler.downloadPage(repository, 'Stats').languages)
+                with NDJSONSink(path) as sink:
+                    self.assertEqual(asyncio.run(asyncCrawler.runToSink(sink)), 10)
+                self.assertCountEqual(readLines(path), crawler.run())
+            finally:
+                os.remove(link)
+                shutil.rmtree(directory)
+
+    def testCacheRevalidation(self):
+        """Test that the async crawler revalidates the cached repository pages with their ETag """
+
+        directory = tempfile.mkdtemp()
+        cache = HTTPCache(os.path.join(directory, 'cache.sqlite'), ttl=0)
+        with StubGithubServer('python_java_repositories.txt') as stub:
+            link = writeInput('Repositories', [stub.address])
+            try:
+                asyncio.run(AsyncGithubCrawler(link, githubURL=stub.url, cache=cache).run())
+                response = asyncio.run(AsyncGithubCrawler(link, githubURL=stub.url, cache=cache).run())
+            finally:
+                os.remove(link)
+                shutil.rmtree(directory)
+
+        self.assertEqual(stub.notModified, 10)
+        self.assertIn({'url': stub.url + '/qiyuangong/leetcode',
+                       'extra': {'owner': 'qiyuangong',
+                                 'language_stats': {'Python': '77.4', 'Java': '20.4', 'C++': '2.2'}}}, response)
+
+    def testRepositoriesDownloadedOnce(self):
+        """Test that the async crawler downloads repeated repositories once and collapses them with their hits """
+
+        async def collect(crawler):
+            async with crawler:
+                return [url async for url in crawler.iterURLs(['/a/b', '/c/d', '/a/b', '/A/B'])]
+
+        with StubGithubServer('python_java_repositories.txt') as stub:
+            link = writeInput('Repositories', [stub.address])
+            try:
+                crawler = AsyncGithubCrawler(link, githubURL=stub.url, collapseDuplicates=True)
+                response = asyncio.run(collect(crawler))
+            finally:
+                os.remove(link)
+
+        self.assertEqual(sorted((url['url'][-4:], url['hits']) for url in response),
+                         [('/A/B', 1), ('/a/b', 2), ('/c/d', 1)])
+        self.assertEqual(len(stub.requests), 2)
+        self.assertEqual(crawler.memoHits, 1)
+
+    def testNoConnection(self):
+        """Test that the async crawler returns an error after all the attempts if there is no connection """
+
+        link = writeInput('Issues', ['127.0.0.1:9'])
+        try:
+            response = asyncio.run(AsyncGithubCrawler(link, attempts=2, githubURL='http://127.0.0.1:9').run())
+        finally:
+            os.remove(link)
+
+        self.assertEqual(len(response), 1)
+        self.assertIn('error', response[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
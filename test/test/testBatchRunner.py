@@ -0,0 +1,133 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import TestCase, mock
+from githubCrawler.src.githubCrawler.batchRunner import BatchRunner, loadJobs, main
+from githubCrawler.src.githubCrawler.githubCrawler import GithubCrawler
+from githubCrawler.test.test.stubServer import StubGithubServer
+
+
+def job(crawlType, proxies, **extra):
+    return dict({"keywords": ["Python", "Java"], "proxies": proxies, "type": crawlType}, **extra)
+
+
+class TestBatchRunner(TestCase):
+    """  Tests for the batch runner of many crawls """
+
+    def setUp(self):
+        with open('../html/python_java_repositories.txt', encoding="utf8") as file:
+            self.searchHTML = file.read()
+        with open('../html/extra_case_correct.txt', encoding="utf8") as file:
+            self.repositoryHTML = file.read()
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def download(self, link, useCache=False):
+        return self.repositoryHTML if useCache else self.searchHTML
+
+    def testLoadJobs(self):
+        """Test that jobs are read from a directory of input JSON files and from a JSONL file"""
+
+        shutil.copy('../json/python_java_issues.json', os.path.join(self.directory, 'issues.json'))
+        shutil.copy('../json/python_java_wikis.json', os.path.join(self.directory, 'wikis.json'))
+        jobsFile = os.path.join(self.directory, 'jobs.jsonl')
+        with open(jobsFile, 'w') as file:
+            file.write(json.dumps(job('Issues', ['1.1.1.1:80'], id='first')) + '\n\n')
+            file.write(json.dumps(job('Wikis', ['1.1.1.1:80'])) + '\n')
+
+        self.assertEqual([jobId for jobId, _ in loadJobs(self.directory)], ['issues', 'wikis'])
+        self.assertEqual([(jobId, job['type']) for jobId, job in loadJobs(jobsFile)], [('first', 'Issues'),
+                                                                                      ('3', 'Wikis')])
+
+    def testRunAgainstStub(self):
+        """Test that every job gets the same results as its own crawler and invalid jobs get an error"""
+
+        with StubGithubServer('python_java_repositories.txt') as stub:
+            runner = BatchRunner([('repositories', job('Repositories', [stub.address])),
+                                  ('issues', job('Issues', [stub.address])),
+                                  ('invalid', job('Other', [stub.address]))], maxWorkers=4, githubURL=stub.url)
+            results = runner.run()
+
+        self.assertEqual(len(results['repositories']), 10)
+        self.assertIn({'url': stub.url + '/qiyuangong/leetcode',
+                       'extra': {'owner': 'qiyuangong',
+                                 'language_stats': {'Python': '77.4', 'Java': '20.4', 'C++': '2.2'}}},
+                      results['repositories'])
+        self.assertEqual(results['issues'], [{'url_not_found': 'Not found any URL for this search.'}])
+        self.assertEqual(results['invalid'], [{'error': GithubCrawler.TypeNotValid().message}])
+        self.assertEqual(len(stub.requests), 12)
+
+    def testJobsUseOwnProxies(self):
+        """Test that a job never sends its requests through the proxies of another job"""
+
+        with StubGithubServer('python_java_repositories.txt') as first, \
+                StubGithubServer('python_java_repositories.txt') as second:
+            runner = BatchRunner([('a', job('Repositories', [first.address])),
+                                  ('b', job('Issues', [second.address])),
+                                  ('c', job('Issues', [second.address]))], maxWorkers=4, githubURL=first.url)
+            results = runner.run()
+
+        self.assertEqual(len(results['a']), 10)
+        self.assertEqual(len(first.requests), 11)
+        self.assertEqual(len(second.requests), 2)
+        self.assertEqual(len(runner.proxyPool.states), 2)
+
+    def testFairInterleaving(self):
+        """Test that the tasks of the jobs take turns, so a job does not wait for the previous one to finish"""
+
+        with mock.patch.object(GithubCrawler, "downloadHTML", side_effect=self.download):
+            runner = BatchRunner([(name, job('Repositories', ['1.1.1.1:80'])) for name in ['a', 'b']], maxWorkers=1)
+            order = [jobId for jobId, _ in runner.iterResults()]
+
+        self.assertEqual(order[:6], ['a', 'b', 'a', 'b', 'a', 'b'])
+        self.assertEqual(order.count('a'), 10)
+
+    def testGlobalLimit(self):
+        """Test that the batch never runs more tasks at the same time than maxWorkers"""
+
+        lock = threading.Lock()
+        inFlight = [0, 0]
+
+        def slowDownload(link, useCache=False):
+            with lock:
+                inFlight[0] += 1
+                inFlight[1] = max(inFlight)
+            time.sleep(0.01)
+            with lock:
+                inFlight[0] -= 1
+            return self.download(link, useCache)
+
+        with mock.patch.object(GithubCrawler, "downloadHTML", side_effect=slowDownload):
+            runner = BatchRunner([(str(number), job('Repositories', ['1.1.1.1:80'])) for number in range(5)],
+                                 maxWorkers=3)
+            results = runner.run()
+
+        self.assertEqual(sum(len(urls) for urls in results.values()), 50)
+        self.assertLessEqual(inFlight[1], 3)
+        self.assertEqual(len(runner.proxyPool.states), 1)
+
+    def testCommandLine(self):
+        """Test that the command line writes one JSON line per URL with the id of its job"""
+
+        jobsFile = os.path.join(self.directory, 'jobs.jsonl')
+        output = os.path.join(self.directory, 'output.jsonl')
+        with open(jobsFile, 'w') as file:
+            file.write(json.dumps(job('Repositories', ['1.1.1.1:80'], id='python')) + '\n')
+
+        with mock.patch.object(GithubCrawler, "downloadHTML", side_effect=self.download):
+            self.assertEqual(main([jobsFile, '--max-workers', '2', '--output', output]), 0)
+
+        with open(output) as file:
+            lines = [json.loads(line) for line in file]
+        self.assertEqual(len(lines), 10)
+        self.assertEqual(lines[0]['job'], 'python')
+
+
+if __name__ == '__main__':
+    unittest.main()
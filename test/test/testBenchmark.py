@@ -0,0 +1,91 @@
+import json
+import os
+import requests
+import tempfile
+import unittest
+from unittest import TestCase
+from githubCrawler.test.test.benchmark import compare, main, runBenchmarks
+from githubCrawler.test.test.stubServer import StubGithubServer
+
+METRICS = ['pages_per_second', 'parse_us_per_page', 'p50_ms', 'p99_ms', 'peak_alloc_kb', 'peak_rss_kb']
+
+
+class TestBenchmark(TestCase):
+    """  Tests for the benchmark harness """
+
+    def testInProcess(self):
+        """Test that every operation reports all the metrics when the pages are not downloaded"""
+
+        results = runBenchmarks(repeat=2)
+
+        self.assertEqual(sorted(results['results']), ['getLanguageStats', 'getURLs', 'run'])
+        for metrics in results['results'].values():
+            self.assertEqual(sorted(metrics), sorted(METRICS))
+            self.assertGreater(metrics['pages_per_second'], 0)
+            self.assertGreater(metrics['parse_us_per_page'], 0)
+            self.assertGreaterEqual(metrics['p99_ms'], metrics['p50_ms'])
+            self.assertGreater(metrics['peak_alloc_kb'], 0)
+            self.assertGreater(metrics['peak_rss_kb'], metrics['peak_alloc_kb'])
+
+    def testMemoryOfEveryOperation(self):
+        """Test that the memory of an operation does not depend on the operations measured before it"""
+
+        alone = runBenchmarks(['getLanguageStats'], repeat=1)['results']['getLanguageStats']['peak_alloc_kb']
+        after = runBenchmarks(['run', 'getLanguageStats'], repeat=1)['results']['getLanguageStats']['peak_alloc_kb']
+
+        self.assertLess(after, alone * 2 + 64)
+        self.assertLess(alone, after * 2 + 64)
+
+    def testResidentMemoryOfEveryOperation(self):
+        """Test that the resident memory of an operation is measured in a process of its own"""
+
+        alone = runBenchmarks(['getURLs'], repeat=1)['results']['getURLs']['peak_rss_kb']
+        after = runBenchmarks(['run', 'getURLs'], repeat=1)['results']['getURLs']['peak_rss_kb']
+
+        self.assertLess(after, alone * 1.5)
+        self.assertLess(alone, after * 1.5)
+
+    def testStubWithErrors(self):
+        """Test that the benchmark works against the stub server when some requests fail"""
+
+        results = runBenchmarks(['run'], mode='stub', repeat=2, latency=0.001, errorRate=0.2)
+
+        self.assertEqual(results['mode'], 'stub')
+        self.assertGreater(results['results']['run']['pages_per_second'], 0)
+
+    def testStubErrorInjection(self):
+        """Test that the stub server answers 503 to the fraction of requests of errorRate"""
+
+        with StubGithubServer('python_java_repositories.txt', errorRate=1) as stub:
+            response = requests.get(stub.url + '/search')
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(stub.errors, 1)
+
+    def testCompare(self):
+        """Test that only the metrics that got worse than the tolerance are regressions"""
+
+        baseline = {'results': {'run': {'pages_per_second': 100.0, 'p50_ms': 10.0, 'peak_alloc_kb': None}}}
+        current = {'results': {'run': {'pages_per_second': 70.0, 'p50_ms': 11.0, 'peak_alloc_kb': 5000}}}
+
+        regressions = compare(baseline, current, tolerance=0.2)
+
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith('run pages_per_second'))
+
+    def testSaveAndCompareBaseline(self):
+        """Test that a saved baseline can be compared with a new run from the command line"""
+
+        baseline = tempfile.NamedTemporaryFile(suffix='.json', delete=False).name
+        try:
+            self.assertEqual(main(['--operation', 'getLanguageStats', '--repeat', '1', '--save', baseline]), 0)
+            with open(baseline) as file:
+                self.assertIn('getLanguageStats', json.load(file)['results'])
+            self.assertEqual(main(['--operation', 'getLanguageStats', '--repeat', '1', '--compare', baseline,
+                                   '--tolerance', '100']), 0)
+        finally:
+            os.remove(baseline)
+
+
+if __name__ == '__main__':
+    unittest.main()
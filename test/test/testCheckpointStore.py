@@ -0,0 +1,102 @@
+import os
+import requests
+import shutil
+import tempfile
+import unittest
+from unittest import TestCase, mock
+from githubCrawler.src.githubCrawler.checkpointStore import CheckpointStore
+from githubCrawler.src.githubCrawler.githubCrawler import GithubCrawler
+
+
+class TestCheckpointStore(TestCase):
+    """  Tests for the checkpoints of resumable and incremental crawls """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'checkpoint.sqlite')
+        with open('../html/python_java_repositories.txt', encoding="utf8") as file:
+            self.searchHTML = file.read()
+        with open('../html/extra_case_correct.txt', encoding="utf8") as file:
+            self.repositoryHTML = file.read()
+        self.downloads = []
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def download(self, link, useCache=False):
+        self.downloads.append(link)
+        return self.repositoryHTML if useCache else self.searchHTML
+
+    def testPagesAndRepositories(self):
+        """Test that the store returns what was saved while it is younger than the maximum age"""
+
+        store = CheckpointStore(self.path)
+        store.putPage('https://github.com/search?q=Python', ['/a/b', '/c/d'], True)
+        store.putRepository('a/b', {'Python': '100.0'})
+
+        self.assertEqual(store.getPage('https://github.com/search?q=Python'), (['/a/b', '/c/d'], True))
+        self.assertEqual(store.getRepository('a/b'), {'Python': '100.0'})
+        self.assertIsNone(store.getRepository('c/d'))
+        self.assertEqual(store.progress(), {'pages': 1, 'repositories': 1})
+
+        expired = CheckpointStore(self.path, pageMaxAge=0, repositoryMaxAge=0)
+        self.assertIsNone(expired.getPage('https://github.com/search?q=Python'))
+        self.assertIsNone(expired.getRepository('a/b'))
+
+    @mock.patch("time.sleep")
+    def testResume(self, mock_sleep):
+        """Test that a crawl run again with the same store only downloads what failed the first time"""
+
+        def failingDownload(link, useCache=False):
+            if link.endswith('/kivy/pyjnius'):
+                raise requests.exceptions.ConnectionError
+            return self.download(link, useCache)
+
+        with mock.patch.object(GithubCrawler, "downloadHTML", side_effect=failingDownload):
+            first = GithubCrawler('../json/python_java_repositories.json', 2,
+                                  checkpoint=CheckpointStore(self.path)).run()
+        self.assertEqual(len(self.downloads), 10)
+        self.assertEqual(CheckpointStore(self.path).progress(), {'pages': 1, 'repositories': 9})
+
+        self.downloads = []
+        with mock.patch.object(GithubCrawler, "downloadHTML", side_effect=self.download):
+            second = GithubCrawler('../json/python_java_repositories.json',
+                                   checkpoint=CheckpointStore(self.path)).run()
+
+        self.assertEqual(self.downloads, ['https://github.com/kivy/pyjnius'])
+        self.assertEqual(len(second), len(first))
+        self.assertFalse(any('error' in url['extra']['language_stats'] for url in second))
+
+    def testResumeStoppedCrawl(self):
+        """Test that a crawl stopped in the middle of the pages goes on from the last page parsed"""
+
+        with mock.patch.object(GithubCrawler, "downloadHTML", side_effect=self.download):
+            results = GithubCrawler('../json/python_java_repositories.json',
+                                    checkpoint=CheckpointStore(self.path)).iterResults(maxPages=3)
+            for _ in range(15):
+                next(results)
+            results.close()
+
+            self.downloads = []
+            list(GithubCrawler('../json/python_java_repositories.json',
+                               checkpoint=CheckpointStore(self.path)).iterResults(maxPages=3))
+
+        searches = [link for link in self.downloads if '/search?' in link]
+        self.assertNotIn('https://github.com/search?q=Python+Java&type=Repositories', searches)
+
+    def testIncremental(self):
+        """Test that an incremental crawl downloads the repositories older than the maximum age again, but not the
+           search pages"""
+
+        with mock.patch.object(GithubCrawler, "downloadHTML", side_effect=self.download):
+            GithubCrawler('../json/python_java_repositories.json', checkpoint=CheckpointStore(self.path)).run()
+            self.downloads = []
+            GithubCrawler('../json/python_java_repositories.json',
+                          checkpoint=CheckpointStore(self.path, repositoryMaxAge=0)).run()
+
+        self.assertEqual(len(self.downloads), 10)
+        self.assertFalse(any('/search?' in link for link in self.downloads))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+import io
+import json
+import os
+import shutil
+import socket
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import TestCase, mock
+from githubCrawler.src.githubCrawler.cli import connectDaemon, main
+from githubCrawler.src.githubCrawler.crawlerDaemon import CrawlerDaemon, DaemonRunning, SocketNotValid, isRunning
+from githubCrawler.src.githubCrawler.githubCrawler import GithubCrawler
+from githubCrawler.test.test.stubServer import StubGithubServer
+from githubCrawler.test.test.testSinks import readLines
+
+
+class TestCli(TestCase):
+    """  Tests for the command line and the daemon """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.socket = os.path.join(self.directory, 'daemon.sock')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def writeInput(self, stub, **inputJSON):
+        path = os.path.join(self.directory, 'input.json')
+        with open(path, 'w', encoding="utf8") as inputFile:
+            json.dump(dict({"keywords": ["Python", "Java"], "proxies": [stub.address], "type": "Repositories"},
+                           **inputJSON), inputFile)
+        return path
+
+    def runMain(self, arguments):
+        with mock.patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            code = main(arguments)
+        return code, [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+    def testLazyImports(self):
+        """Test that the command line does not import the crawler, requests or the parsers until a crawl runs"""
+
+        code = "import sys; import githubCrawler.src.githubCrawler.cli; " \
+               "print(sorted(name for name in ('requests', 'bs4', 'lxml') if name in sys.modules))"
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip(), '[]')
+
+    def testRun(self):
+        """Test that a crawl of the command line gives the results of the crawler, also if the daemon is not running"""
+
+        with StubGithubServer('python_java_repositories.txt') as stub:
+            path = self.writeInput(stub)
+            expected = GithubCrawler(path, githubURL=stub.url).run()
+            output = os.path.join(self.directory, 'results.ndjson.gz')
+            self.assertEqual(main(['run', path, '--github-url', stub.url, '--max-workers', '2', '--output', output]), 0)
+            self.assertCountEqual(readLines(output), expected)
+
+            output = os.path.join(self.directory, 'fallback.ndjson')
+            self.assertEqual(main(['run', path, '--github-url', stub.url, '--daemon', '--socket', self.socket,
+                                   '--output', output]), 0)
+            self.assertCountEqual(readLines(output), expected)
+
+            with mock.patch('sys.stderr', new_callable=io.StringIO):
+                self.assertEqual(main(['run', self.writeInput(stub, type='Commits')]), 1)
+
+    def testDaemon(self):
+        """Test that the daemon runs the crawls sent to its socket, the client writes them and it stops when asked"""
+
+        daemon = CrawlerDaemon(self.socket, maxJobs=2)
+        thread = threading.Thread(target=daemon.serve)
+        thread.start()
+        try:
+            self.assertTrue(isRunning(self.socket))
+            self.assertEqual(stat.S_IMODE(os.stat(self.socket).st_mode), 0o600)
+            with self.assertRaises(DaemonRunning):
+                CrawlerDaemon(self.socket)
+
+            with StubGithubServer('python_java_repositories.txt') as stub:
+                path = self.writeInput(stub)
+                expected = GithubCrawler(path, githubURL=stub.url).run()
+                arguments = ['run', path, '--github-url', stub.url, '--daemon', '--socket', self.socket]
+                code, results = self.runMain(arguments)
+                self.assertEqual(code, 0)
+                self.assertCountEqual(results, expected)
+
+                output = os.path.join(self.directory, 'results.ndjson.gz')
+                with mock.patch.object(CrawlerDaemon, 'runJob', autospec=True,
+                                       side_effect=CrawlerDaemon.runJob) as runJob:
+                    code, results = self.runMain(arguments + ['--output', output])
+                self.assertEqual((code, results), (0, []))
+                self.assertCountEqual(readLines(output), expected)
+                self.assertNotIn('output', runJob.call_args[0][1])
+
+                with mock.patch('sys.stderr', new_callable=io.StringIO) as stderr:
+                    self.assertEqual(main(['run', self.writeInput(stub, keywords=[]), '--daemon', '--socket',
+                                           self.socket]), 1)
+                self.assertIn(GithubCrawler.KeyWordNotValid().message, stderr.getvalue())
+
+            code, answers = self.runMain(['status', '--socket', self.socket])
+            self.assertEqual(answers[0]['served'], 3)
+            self.assertEqual(answers[0]['running'], 0)
+            self.assertEqual(self.runMain(['stop', '--socket', self.socket]), (0, [{'done': 0}]))
+            thread.join(5)
+            self.assertFalse(thread.is_alive())
+        finally:
+            daemon.stop()
+            thread.join(5)
+            daemon.server_close()
+        self.assertFalse(os.path.exists(self.socket))
+
+    @unittest.skipIf(os.getuid() != 0, 'files of another user can only be made by root')
+    def testSocketOfAnotherUser(self):
+        """Test that crawls are never sent to a socket of another user and the daemon does not replace it"""
+
+        other = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        other.bind(self.socket)
+        other.listen()
+        try:
+            os.chown(self.socket, 12345, 12345)
+            self.assertIsNone(connectDaemon(self.socket))
+            with self.assertRaises(SocketNotValid):
+                CrawlerDaemon(self.socket)
+            self.assertTrue(os.path.exists(self.socket))
+        finally:
+            other.close()
+
+        directory = os.path.join(self.directory, 'other')
+        os.mkdir(directory)
+        os.chown(directory, 12345, 12345)
+        with mock.patch('sys.stderr', new_callable=io.StringIO) as stderr:
+            self.assertEqual(main(['daemon', '--socket', os.path.join(directory, 'daemon.sock')]), 1)
+        self.assertIn('another user', stderr.getvalue())
+
+    def testSocketDirectory(self):
+        """Test that the daemon creates the directory of its socket only for its user"""
+
+        path = os.path.join(self.directory, 'run', 'daemon.sock')
+        with CrawlerDaemon(path):
+            self.assertEqual(stat.S_IMODE(os.stat(os.path.dirname(path)).st_mode), 0o700)
+            self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o600)
+
+        with open(self.socket, 'w'):
+            pass
+        self.assertIsNone(connectDaemon(self.socket))
+        with self.assertRaises(SocketNotValid):
+            CrawlerDaemon(self.socket)
+
+    def testIdleTimeout(self):
+        """Test that the daemon stops once it has been idle for the timeout"""
+
+        with CrawlerDaemon(self.socket, idleTimeout=0.1) as daemon:
+            thread = threading.Thread(target=daemon.serve)
+            thread.start()
+            thread.join(5)
+            self.assertFalse(thread.is_alive())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,5 @@
 import requests
+import time
 import unittest
 from unittest import TestCase, mock
 from githubCrawler.src.githubCrawler.githubCrawler import GithubCrawler
@@ -43,8 +44,9 @@ class TestCrawler(TestCase):
         else:
             self.fail('unexpected exception raised')
 
+    @mock.patch("time.sleep")
     @mock.patch("requests.get")
-    def testNoConnection(self, mock_get):
+    def testNoConnection(self, mock_get, mock_sleep):
         """Test that checks if requests.exceptions.RequestException Exception is raised if bad connection """
 
         mock_get.side_effect = requests.exceptions.RequestException
@@ -148,8 +150,9 @@ class TestCrawler(TestCase):
         self.assertEqual(response, [{'url': 'https://github.com/itwanger/JavaBooks',
                                      'extra': {'owner': 'itwanger', 'language_stats': 'Not data about languages'}}])
 
+    @mock.patch("time.sleep")
     @mock.patch.object(GithubCrawler, "downloadHTML")
-    def testExtraNoConnection(self, mock_get):
+    def testExtraNoConnection(self, mock_get, mock_sleep):
         """Test that crawler of extra info of a repository works correctly.
         In this test there is no connection"""
 
@@ -182,6 +185,57 @@ class TestCrawler(TestCase):
                                     {'url': 'https://github.com/girlscript/winter-of-contributing/issues'},
                                     {'url': 'https://github.com/girlscript/winter-of-contributing/issues'}])
 
+    @mock.patch.object(GithubCrawler, "downloadHTML")
+    def testIssuesCollapseDuplicates(self, mock_get):
+        """Test that repeated URLs are returned once with their hits if collapseDuplicates is True"""
+
+        with open('../html/python_java_issues.txt', encoding="utf8") as file:
+            mock_get.return_value = file.read()
+
+        response = GithubCrawler('../json/python_java_issues.json', collapseDuplicates=True).run()
+
+        self.assertEqual(response, [{'url': 'https://github.com/debrajhyper/Topic_Learning_Resources/issues', 'hits': 1},
+                                    {'url': 'https://github.com/girlscript/winter-of-contributing/issues', 'hits': 6},
+                                    {'url': 'https://github.com/coolkiranmehta/hacktoberfest-hacktoberfest-21/issues',
+                                     'hits': 1},
+                                    {'url': 'https://github.com/keshavsingh4522/hacktoberfest2021/issues', 'hits': 1},
+                                    {'url': 'https://github.com/amisha-28/Hacktoberfest2021/issues', 'hits': 1}])
+
+    @mock.patch.object(GithubCrawler, "downloadHTML")
+    def testRepositoriesDownloadedOnce(self, mock_get):
+        """Test that concurrent requests for the same repository share one download"""
+
+        with open('../html/extra_case_correct.txt', encoding="utf8") as file:
+            expectedHTML = file.read()
+
+        def slowDownload(link, useCache=False):
+            time.sleep(0.2)
+            return expectedHTML
+
+        mock_get.side_effect = slowDownload
+        crawler = GithubCrawler('../json/python_java_repositories.json')
+
+        response = list(crawler.iterURLs(['/qiyuangong/leetcode'] * 5 + ['/QiyuanGong/LeetCode']))
+        crawler.getRepositoryInfoWithExtra('/qiyuangong/leetcode')
+
+        self.assertEqual(len(response), 6)
+        self.assertEqual(response[0]['extra']['language_stats'], {'Python': '77.4', 'Java': '20.4', 'C++': '2.2'})
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(crawler.memoHits, 6)
+
+    @mock.patch("time.sleep")
+    @mock.patch.object(GithubCrawler, "downloadHTML")
+    def testRepositoriesErrorsNotKept(self, mock_get, mock_sleep):
+        """Test that a repository that failed is downloaded again the next time"""
+
+        mock_get.side_effect = requests.exceptions.RequestException
+        crawler = GithubCrawler('../json/python_java_repositories.json', 2)
+
+        crawler.getRepositoryInfoWithExtra('/qiyuangong/leetcode')
+        crawler.getRepositoryInfoWithExtra('/qiyuangong/leetcode')
+
+        self.assertEqual(mock_get.call_count, 4)
+
     @mock.patch.object(GithubCrawler, "downloadHTML")
     def testIssuesBadURL(self, mock_get):
         """Test that crawler of issues' URL works correctly when HTML text is not correct or has changed"""
@@ -270,6 +324,101 @@ class TestCrawler(TestCase):
 
         self.assertEqual(response, 'https://github.com/search?q=Python&type=Repositories')
 
+    @mock.patch("time.sleep")
+    @mock.patch("requests.get")
+    def testRateLimited(self, mock_get, mock_sleep):
+        """Test that a rate limited download waits as said by Retry-After and tries again"""
+
+        with open('../html/no_issues.txt', encoding="utf8") as file:
+            expectedHTML = file.read()
+
+        mock_get.side_effect = [mock.Mock(status_code=429, headers={'Retry-After': '7'}, text='', content=b''),
+                                mock.Mock(status_code=200, headers={}, text=expectedHTML,
+                                          content=expectedHTML.encode('utf8'))]
+
+        response = GithubCrawler('../json/python_java_issues.json').run()
+
+        self.assertEqual(response, [{'url_not_found': 'Not found any URL for this search.'}])
+        self.assertGreaterEqual(mock_sleep.call_args.args[0], 7)
+
+    @mock.patch("time.sleep")
+    @mock.patch("requests.get")
+    def testRetryAfterNotValid(self, mock_get, mock_sleep):
+        """Test that a temporary error with a Retry-After that is not valid is tried again with backoff"""
+
+        with open('../html/no_issues.txt', encoding="utf8") as file:
+            expectedHTML = file.read()
+
+        for value in ['1.5', 'soon']:
+            mock_get.side_effect = [mock.Mock(status_code=503, headers={'Retry-After': value}, text='', content=b''),
+                                    mock.Mock(status_code=200, headers={}, text=expectedHTML,
+                                              content=expectedHTML.encode('utf8'))]
+
+            response = GithubCrawler('../json/python_java_issues.json').run()
+
+            self.assertEqual(response, [{'url_not_found': 'Not found any URL for this search.'}])
+
+    @mock.patch("time.sleep")
+    @mock.patch("requests.get")
+    def testAbuseDetection(self, mock_get, mock_sleep):
+        """Test that the abuse detection page is not parsed as a search result"""
+
+        mock_get.return_value = mock.Mock(status_code=403, headers={},
+                                          text='You have triggered an abuse detection mechanism.',
+                                          content=b'You have triggered an abuse detection mechanism.')
+
+        response = GithubCrawler('../json/python_java_issues.json', 3).run()
+
+        self.assertEqual(response, [{'error': 'Rate limited or temporary error. HTTP status: 403'}])
+        self.assertEqual(mock_get.call_count, 3)
+
+    def testGenerateURLPage(self):
+        """Test GenerateURL function. Test if the page is not the first one"""
+
+        response = GithubCrawler('../json/python_repositories.json').generateURL(3)
+
+        self.assertEqual(response, 'https://github.com/search?q=Python&type=Repositories&p=3')
+
+    @mock.patch.object(GithubCrawler, "downloadHTML")
+    def testIterResultsPages(self, mock_get):
+        """Test that iterResults walks the search pages until there are no more results"""
+
+        with open('../html/python_java_issues.txt', encoding="utf8") as file:
+            issuesHTML = file.read()
+        with open('../html/no_issues.txt', encoding="utf8") as file:
+            noIssuesHTML = file.read()
+
+        mock_get.side_effect = lambda link: noIssuesHTML if link.endswith('&p=3') else issuesHTML
+
+        response = GithubCrawler('../json/python_java_issues.json').iterResults()
+
+        self.assertEqual(next(response), {'url': 'https://github.com/debrajhyper/Topic_Learning_Resources/issues'})
+        self.assertEqual(len(list(response)), 19)
+        self.assertEqual([call.args[0][-4:] for call in mock_get.call_args_list], ['sues', '&p=2', '&p=3'])
+
+    @mock.patch.object(GithubCrawler, "downloadHTML")
+    def testIterResultsNoURLFound(self, mock_get):
+        """Test that iterResults works correctly when no URL is found"""
+
+        with open('../html/no_wikis.txt', encoding="utf8") as file:
+            mock_get.return_value = file.read()
+
+        response = list(GithubCrawler('../json/python_java_wikis.json').iterResults())
+
+        self.assertEqual(response, [{'url_not_found': 'Not found any URL for this search.'}])
+
+    @mock.patch.object(GithubCrawler, "downloadHTML")
+    def testIterResultsMaxPages(self, mock_get):
+        """Test that iterResults stops after the maximum number of pages"""
+
+        with open('../html/python_java_wikis.txt', encoding="utf8") as file:
+            mock_get.return_value = file.read()
+
+        response = list(GithubCrawler('../json/python_java_wikis.json').iterResults(maxPages=2))
+
+        self.assertEqual(len(response), 20)
+        self.assertEqual(mock_get.call_count, 2)
+
 
 if __name__ == '__main__':
     unittest.main()
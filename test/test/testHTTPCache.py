@@ -0,0 +1,99 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import TestCase, mock
+from githubCrawler.src.githubCrawler.githubCrawler import GithubCrawler
+from githubCrawler.src.githubCrawler.httpCache import HTTPCache
+
+
+class TestHTTPCache(TestCase):
+    """  Tests for the disk cache of pages """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'cache.sqlite')
+        with open('../html/extra_case_correct.txt', encoding="utf8") as file:
+            self.html = file.read()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def testPutGet(self):
+        """Test that a stored page is returned compressed on disk and equal after reading it"""
+
+        cache = HTTPCache(self.path)
+        cache.put('https://github.com/a/b', self.html, {'ETag': '"abc"'})
+
+        entry = cache.get('https://github.com/a/b')
+
+        self.assertEqual(entry.text, self.html)
+        self.assertTrue(cache.isFresh(entry))
+        self.assertLess(cache.size(), len(self.html) / 4)
+        self.assertIsNone(cache.get('https://github.com/a/c'))
+
+    def testSharedBetweenInstances(self):
+        """Test that two caches on the same file, as in two processes, see the same pages"""
+
+        HTTPCache(self.path).put('https://github.com/a/b', self.html, {})
+
+        self.assertEqual(HTTPCache(self.path).get('https://github.com/a/b').text, self.html)
+
+    def testTTLAndValidators(self):
+        """Test that an old page is not fresh and can be revalidated with its ETag and Last-Modified"""
+
+        cache = HTTPCache(self.path, ttl=0)
+        cache.put('https://github.com/a/b', 'html', {'ETag': '"abc"', 'Last-Modified': 'Wed, 21 Oct 2015 07:28:00 GMT'})
+        entry = cache.get('https://github.com/a/b')
+
+        self.assertFalse(cache.isFresh(entry))
+        self.assertEqual(cache.validators(entry), {'If-None-Match': '"abc"',
+                                                   'If-Modified-Since': 'Wed, 21 Oct 2015 07:28:00 GMT'})
+        self.assertEqual(cache.validators(None), {})
+
+    def testLRUEviction(self):
+        """Test that the least recently used pages are removed when the cache is too big"""
+
+        cache = HTTPCache(self.path, maxSize=2500, compressionLevel=0)
+        cache.put('https://github.com/a/1', 'x' * 1000, {})
+        cache.put('https://github.com/a/2', 'x' * 1000, {})
+        cache.get('https://github.com/a/1')
+        cache.put('https://github.com/a/3', 'x' * 1000, {})
+
+        self.assertIsNotNone(cache.get('https://github.com/a/1'))
+        self.assertIsNone(cache.get('https://github.com/a/2'))
+        self.assertIsNotNone(cache.get('https://github.com/a/3'))
+        self.assertLessEqual(cache.size(), 2500)
+
+    @mock.patch("requests.get")
+    def testCrawlerUsesCache(self, mock_get):
+        """Test that the crawler takes fresh repository pages from the cache"""
+
+        mock_get.return_value = mock.Mock(status_code=200, headers={}, text=self.html,
+                                          content=self.html.encode('utf8'))
+        crawler = GithubCrawler('../json/python_java_repositories.json', cache=HTTPCache(self.path))
+
+        first = crawler.getRepositoryInfoWithExtra('/qiyuangong/leetcode')
+        second = crawler.getRepositoryInfoWithExtra('/qiyuangong/leetcode')
+
+        self.assertEqual(first, second)
+        self.assertEqual(mock_get.call_count, 1)
+
+    @mock.patch("requests.get")
+    def testCrawlerRevalidates(self, mock_get):
+        """Test that the crawler revalidates old repository pages and uses them if GitHub answers 304"""
+
+        mock_get.side_effect = [mock.Mock(status_code=200, headers={'ETag': '"abc"'}, text=self.html,
+                                          content=self.html.encode('utf8')),
+                                mock.Mock(status_code=304, headers={'ETag': '"abc"'}, text='', content=b'')]
+        crawler = GithubCrawler('../json/python_java_repositories.json', cache=HTTPCache(self.path, ttl=0))
+
+        crawler.getLanguageStats('https://github.com/qiyuangong/leetcode')
+        response = crawler.getLanguageStats('https://github.com/qiyuangong/leetcode')
+
+        self.assertEqual(response, {'Python': '77.4', 'Java': '20.4', 'C++': '2.2'})
+        self.assertEqual(mock_get.call_args.kwargs['headers'], {'If-None-Match': '"abc"'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import time
+import unittest
+from unittest import TestCase
+from githubCrawler.src.githubCrawler.githubCrawler import GithubCrawler
+from githubCrawler.src.githubCrawler.hedgePolicy import HedgePolicy
+from githubCrawler.test.test.stubServer import StubGithubServer
+
+
+class TestHedgePolicy(TestCase):
+    """  Tests for the hedged requests """
+
+    def testDelayAndBudget(self):
+        """Test that the delay is the percentile of the recent latencies and the hedges never pass the budget"""
+
+        policy = HedgePolicy(percentile=90, budget=0.25, maxBurst=2, initialDelay=0.5, minSamples=10)
+        self.assertEqual(policy.delay(), 0.5)
+        for latency in range(1, 11):
+            policy.record(latency / 100)
+        self.assertEqual(policy.delay(), 0.09)
+
+        for _ in range(3):
+            policy.startRequest()
+        self.assertFalse(policy.spend())
+        policy.startRequest()
+        self.assertTrue(policy.spend())
+        self.assertFalse(policy.spend())
+        for _ in range(100):
+            policy.startRequest()
+        self.assertEqual([policy.spend() for _ in range(3)], [True, True, False])
+        self.assertEqual(policy.stats()['hedges'], 3)
+
+    def testHedgeSlowProxy(self):
+        """Test that requests through a slow proxy are hedged through the fast one and get the same results"""
+
+        with StubGithubServer('python_java_repositories.txt', latency=1) as slow, \
+                StubGithubServer('python_java_repositories.txt') as fast:
+            crawler = GithubCrawler({"keywords": ["Python", "Java"], "proxies": [slow.address, fast.address],
+                                     "type": "Repositories"}, githubURL=fast.url,
+                                    hedgePolicy=HedgePolicy(budget=1, initialDelay=0.05))
+            start = time.monotonic()
+            results = crawler.run()
+            seconds = time.monotonic() - start
+
+        self.assertEqual(len(results), 10)
+        self.assertTrue(all(url['extra']['language_stats'] == {'Python': '77.4', 'Java': '20.4', 'C++': '2.2'}
+                            for url in results if url['url'].endswith('/qiyuangong/leetcode')))
+        self.assertLess(seconds, 1)
+        self.assertGreaterEqual(crawler.metrics.counter('hedge_wins_total'), 1)
+        self.assertLessEqual(crawler.metrics.counter('hedge_wins_total'), crawler.metrics.counter('hedges_total'))
+        self.assertEqual(len(fast.requests), 11)
+
+    def testCancelledNotRecorded(self):
+        """Test that the latency of a cancelled request is not counted in the pool or in the policy"""
+
+        with StubGithubServer('python_java_repositories.txt', latency=0.5) as slow, \
+                StubGithubServer('python_java_repositories.txt') as fast:
+            policy = HedgePolicy(budget=1, initialDelay=0.05)
+            crawler = GithubCrawler({"keywords": ["Python", "Java"], "proxies": [slow.address, fast.address],
+                                     "type": "Repositories"}, githubURL=fast.url, hedgePolicy=policy)
+            self.assertEqual(len(crawler.run()), 10)
+            time.sleep(1)
+
+        slowState = crawler.proxyPool.states[0]
+        self.assertGreaterEqual(crawler.metrics.counter('hedges_cancelled_total'), 1)
+        self.assertEqual((slowState.requests, slowState.inFlight), (0, 0))
+        self.assertEqual(len(policy.latencies), 11)
+
+    def testNoBudget(self):
+        """Test that nothing is hedged without budget"""
+
+        with StubGithubServer('python_java_issues.txt', latency=0.1) as slow, \
+                StubGithubServer('python_java_issues.txt') as fast:
+            crawler = GithubCrawler({"keywords": ["Python", "Java"], "proxies": [slow.address, fast.address],
+                                     "type": "Issues"}, githubURL=fast.url,
+                                    hedgePolicy=HedgePolicy(budget=0, initialDelay=0.01))
+            for _ in range(5):
+                self.assertEqual(len(crawler.run()), 10)
+
+        self.assertEqual(len(slow.requests) + len(fast.requests), 5)
+        self.assertEqual(crawler.metrics.counter('hedges_total'), 0)
+        self.assertGreaterEqual(crawler.metrics.counter('hedges_skipped_total', reason='budget'), len(slow.requests))
+
+
+if __name__ == '__main__':
+    unittest.main()
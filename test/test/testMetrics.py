@@ -0,0 +1,133 @@
+import json
+import os
+import requests
+import subprocess
+import sys
+import unittest
+from unittest import TestCase, mock
+from githubCrawler.src.githubCrawler.githubCrawler import GithubCrawler
+from githubCrawler.src.githubCrawler.metrics import CrawlerMetrics
+from githubCrawler.test.test.stubServer import StubGithubServer, writeInput
+
+
+class TestMetrics(TestCase):
+    """  Tests for the metrics and the tracing of the crawls """
+
+    def testCountersAndHistograms(self):
+        """Test that counters and histograms are kept apart by their labels"""
+
+        metrics = CrawlerMetrics(buckets=(0.1, 1))
+        metrics.inc('downloads_total', proxy='a')
+        metrics.inc('downloads_total', 2, proxy='a')
+        metrics.inc('downloads_total', proxy='b')
+        metrics.observe('download_seconds', 0.05, proxy='a')
+        metrics.observe('download_seconds', 5, proxy='a')
+
+        self.assertEqual(metrics.counter('downloads_total', proxy='a'), 3)
+        self.assertEqual(metrics.counter('downloads_total', proxy='c'), 0)
+        self.assertEqual(metrics.histogram('download_seconds', proxy='a').toDict(),
+                         {'count': 2, 'sum': 5.05, 'buckets': {'0.1': 1, '1': 1, '+Inf': 2}})
+
+    def testPrometheusText(self):
+        """Test that the metrics are written in the Prometheus text format"""
+
+        metrics = CrawlerMetrics(buckets=(1,))
+        metrics.inc('retries_total', error='Timeout')
+        metrics.observe('parse_seconds', 0.5, page_type='Stats')
+
+        self.assertEqual(metrics.toPrometheus(), '\n'.join([
+            '# TYPE githubcrawler_retries_total counter',
+            'githubcrawler_retries_total{error="Timeout"} 1',
+            '# TYPE githubcrawler_parse_seconds histogram',
+            'githubcrawler_parse_seconds_bucket{page_type="Stats",le="1"} 1',
+            'githubcrawler_parse_seconds_bucket{page_type="Stats",le="+Inf"} 1',
+            'githubcrawler_parse_seconds_sum{page_type="Stats"} 0.5',
+            'githubcrawler_parse_seconds_count{page_type="Stats"} 1']) + '\n')
+
+    def testTracingHooks(self):
+        """Test that every measure is sent as a span to the hooks and errors are counted"""
+
+        metrics = CrawlerMetrics()
+        spans = []
+        metrics.addHook(spans.append)
+        with metrics.measure('download', {'url': 'https://github.com'}, proxy='a') as attributes:
+            attributes['status'] = 200
+        with self.assertRaises(ValueError):
+            with metrics.measure('parse', page_type='Stats'):
+                raise ValueError
+        metrics.removeHook(spans.append)
+        with metrics.measure('parse', page_type='Stats'):
+            pass
+
+        self.assertEqual([span['name'] for span in spans], ['download', 'parse'])
+        self.assertEqual(spans[0]['attributes'], {'url': 'https://github.com', 'status': 200})
+        self.assertEqual(spans[0]['labels'], {'proxy': 'a'})
+        self.assertIsNone(spans[0]['error'])
+        self.assertEqual(spans[1]['error'], 'ValueError()')
+        self.assertEqual(metrics.counter('errors_total', stage='parse', error='ValueError', page_type='Stats'), 1)
+        self.assertEqual(metrics.histogram('parse_seconds', page_type='Stats').count, 2)
+
+    def testCrawlerStats(self):
+        """Test that the stats of the crawler after run() have the downloads per proxy, the bytes and the parse time
+           per page type"""
+
+        with StubGithubServer('python_java_repositories.txt') as stub:
+            link = writeInput('Repositories', [stub.address])
+            try:
+                crawler = GithubCrawler(link, githubURL=stub.url)
+                crawler.run()
+            finally:
+                os.remove(link)
+
+        stats = crawler.stats()
+        proxy = 'http://' + stub.address
+        self.assertEqual(stats['counters']['downloads_total'], [{'labels': {'proxy': proxy, 'status': '200'},
+                                                                 'value': 11}])
+        self.assertGreater(crawler.metrics.counter('download_bytes_total', proxy=proxy), 0)
+        self.assertEqual(crawler.metrics.histogram('download_seconds', proxy=proxy).count, 11)
+        self.assertEqual(crawler.metrics.histogram('parse_seconds', page_type='Repositories').count, 1)
+        self.assertEqual(crawler.metrics.histogram('parse_seconds', page_type='Stats').count, 10)
+        self.assertEqual(stats['proxies'][0]['requests'], 11)
+
+    @mock.patch("time.sleep")
+    @mock.patch("requests.get")
+    def testRetriesAndDataNotFound(self, mock_get, mock_sleep):
+        """Test that retries and pages where the data is not found are counted"""
+
+        with open('../html/python_java_issues_bad.txt', encoding="utf8") as file:
+            badHTML = file.read()
+        mock_get.side_effect = [mock.Mock(status_code=503, headers={}, text='', content=b''),
+                                requests.exceptions.ConnectionError,
+                                mock.Mock(status_code=200, headers={}, text=badHTML, content=badHTML.encode('utf8'))]
+
+        crawler = GithubCrawler('../json/python_java_issues.json')
+        crawler.run()
+
+        self.assertEqual(crawler.metrics.counter('retries_total', error='RateLimitException'), 1)
+        self.assertEqual(crawler.metrics.counter('retries_total', error='ConnectionError'), 1)
+        self.assertEqual(crawler.metrics.counter('data_not_found_total', page_type='Issues'), 1)
+
+    def testMetricsServer(self):
+        """Test that the metrics are served as Prometheus text and as JSON"""
+
+        metrics = CrawlerMetrics()
+        metrics.inc('cache_requests_total', result='hit')
+        with metrics.serve() as server:
+            text = requests.get(server.url + '/metrics')
+            snapshot = requests.get(server.url + '/metrics.json')
+            missing = requests.get(server.url + '/other')
+
+        self.assertIn('githubcrawler_cache_requests_total{result="hit"} 1', text.text)
+        self.assertEqual(json.loads(snapshot.text)['counters']['cache_requests_total'][0]['value'], 1)
+        self.assertEqual(missing.status_code, 404)
+
+    def testServerImportedWhenServed(self):
+        """Test that importing the crawler does not import http.server, only serving the metrics does"""
+
+        code = "import sys; import githubCrawler.src.githubCrawler.githubCrawler; print('http.server' in sys.modules)"
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip(), 'False')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import TestCase
+from githubCrawler.src.githubCrawler.githubCrawler import GithubCrawler
+from githubCrawler.src.githubCrawler.httpCache import HTTPCache
+from githubCrawler.src.githubCrawler.pageArchive import PageArchive, chunkEntries, main
+from githubCrawler.test.test.stubServer import StubGithubServer
+
+
+class TestPageArchive(TestCase):
+    """  Tests for the archive of the pages downloaded and its offline replay """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def testReplaySearch(self):
+        """Test that replaying the archive of a crawl gives the same results without downloading anything"""
+
+        with StubGithubServer('python_java_repositories.txt') as stub, PageArchive(self.directory) as archive:
+            crawler = GithubCrawler({"keywords": ["Python", "Java"], "proxies": [stub.address],
+                                     "type": "Repositories"}, githubURL=stub.url, archive=archive)
+            results = crawler.run()
+            downloads = len(stub.requests)
+
+        entries = PageArchive(self.directory).entries()
+        self.assertEqual(len(entries), downloads)
+        self.assertEqual([entry['type'] for entry in entries].count('Stats'), 10)
+
+        replayed = PageArchive(self.directory).replaySearch(processes=2, githubURL=stub.url)
+        self.assertEqual(list(replayed), [crawler.generateURL()])
+        self.assertCountEqual(replayed[crawler.generateURL()], results)
+
+    def testReplayCachedPages(self):
+        """Test that the pages taken from the cache or revalidated are archived too, so the search can be replayed"""
+
+        arguments = {"keywords": ["Python", "Java"], "type": "Repositories"}
+        cache = HTTPCache(os.path.join(self.directory, 'cache.sqlite'))
+        with StubGithubServer('python_java_repositories.txt') as stub:
+            arguments['proxies'] = [stub.address]
+            expected = GithubCrawler(arguments, githubURL=stub.url, cache=cache).run()
+            for name, ttl in [('hits', cache.ttl), ('revalidated', 0)]:
+                cache.ttl = ttl
+                directory = os.path.join(self.directory, name)
+                with PageArchive(directory) as archive:
+                    crawler = GithubCrawler(arguments, githubURL=stub.url, cache=cache, archive=archive)
+                    self.assertCountEqual(crawler.run(), expected)
+                self.assertEqual([entry['type'] for entry in PageArchive(directory).entries()].count('Stats'), 10)
+                replayed = PageArchive(directory).replaySearch(processes=2, githubURL=stub.url)
+                self.assertCountEqual(replayed[crawler.generateURL()], expected)
+
+    def testChunks(self):
+        """Test that the pages of a single segment are shared by the processes of the replay, in the same order"""
+
+        entries = [{'segment': 'pages-00001.warc.gz', 'offset': offset} for offset in range(20)] + \
+                  [{'segment': 'pages-00002.warc.gz', 'offset': 0}]
+        chunks = chunkEntries(entries, 2)
+        self.assertEqual(len(chunks), 8)
+        self.assertTrue(all(entry['segment'] == segment for segment, pages in chunks for entry in pages))
+        self.assertEqual([entry for _, pages in chunks for entry in pages], entries)
+        self.assertEqual(chunkEntries([], 2), [])
+
+    def testSegmentsAndErrors(self):
+        """Test that the archive starts new segments and the replay reports the pages where the data is not found"""
+
+        pages = {}
+        for name in ['python_java_issues.txt', 'python_java_issues_bad.txt', 'extra_case_correct.txt']:
+            with open('../html/' + name, encoding="utf8") as file:
+                pages[name] = file.read()
+        with PageArchive(self.directory, segmentBytes=1) as archive:
+            archive.write('https://github.com/search?q=Python&type=Issues', 'Issues', pages['python_java_issues.txt'])
+            archive.write('https://github.com/search?q=Bad&type=Issues', 'Issues', pages['python_java_issues_bad.txt'])
+        with PageArchive(self.directory) as archive:
+            archive.write('https://github.com/a/b', 'Stats', pages['extra_case_correct.txt'])
+
+        entries = PageArchive(self.directory).entries()
+        self.assertEqual([entry['segment'] for entry in entries],
+                         ['pages-00001.warc.gz', 'pages-00002.warc.gz', 'pages-00003.warc.gz'])
+        self.assertEqual(PageArchive(self.directory).read(entries[1]), pages['python_java_issues_bad.txt'])
+
+        replayed = list(PageArchive(self.directory).replay(processes=2))
+        self.assertEqual(len(replayed[0]['links']), 10)
+        self.assertEqual(replayed[1], {'url': 'https://github.com/search?q=Bad&type=Issues', 'type': 'Issues',
+                                       'error': GithubCrawler.DataNotFoundException().message})
+        self.assertEqual(replayed[2], {'url': 'https://github.com/a/b', 'type': 'Stats',
+                                       'language_stats': {'Python': '77.4', 'Java': '20.4', 'C++': '2.2'}})
+        self.assertTrue(all(name.endswith('.warc.gz') or name == 'index.ndjson' for name in os.listdir(self.directory)))
+
+        output = os.path.join(tempfile.mkdtemp(dir=self.directory), 'pages.ndjson')
+        self.assertEqual(main([self.directory, '--processes', '1', '--output', output]), 0)
+        with open(output) as file:
+            self.assertEqual([json.loads(line) for line in file], replayed)
+
+
+if __name__ == '__main__':
+    unittest.main()
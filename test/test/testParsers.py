@@ -0,0 +1,121 @@
+import os
+import unittest
+from unittest import TestCase, mock
+from githubCrawler.src.githubCrawler.githubCrawler import GithubCrawler, EXTRACTION_PLANS, VALID_TYPES
+from githubCrawler.src.githubCrawler.parsers import availableParsers, compareParsers, getParser, PlanExtractor, \
+    StreamingBackend
+from githubCrawler.test.test.stubServer import StubGithubServer
+
+PAGES = sorted(os.listdir('../html'))
+
+
+def readPage(page):
+    with open('../html/' + page, encoding="utf8") as file:
+        return file.read()
+
+
+def extractAll(parser, html):
+    """ Extracts everything a page can have with the parser, as comparable values, the total of results included. """
+
+    extractions = []
+    for pageType in VALID_TYPES + ['Stats']:
+        extraction = parser.extract(html, EXTRACTION_PLANS[pageType])
+        extractions.append((extraction.links, extraction.nextPage, extraction.results, extraction.languages,
+                            extraction.total))
+    return extractions
+
+
+class TestParsers(TestCase):
+    """  Tests for the HTML extraction backends """
+
+    def testSameResultsOnEveryPage(self):
+        """Test that every backend extracts the same data from every mock HTML"""
+
+        parsers = availableParsers()
+        self.assertGreaterEqual(len(parsers), 2)
+        for page in PAGES:
+            html = readPage(page)
+            expected = extractAll(getParser('beautifulsoup'), html)
+            for parser in parsers:
+                with self.subTest(page=page, parser=parser.name):
+                    self.assertEqual(extractAll(parser, html), expected)
+
+    def testCrawlerWithEveryBackend(self):
+        """Test that the crawler returns the same URLs and stats with every backend"""
+
+        searchHTML = readPage('python_java_repositories.txt')
+        repositoryHTML = readPage('extra_case_correct.txt')
+        for parser in availableParsers():
+            with self.subTest(parser=parser.name), \
+                    mock.patch.object(GithubCrawler, "downloadHTML",
+                                      side_effect=lambda link, useCache=False:
+                                      searchHTML if '/search' in link else repositoryHTML):
+                response = GithubCrawler('../json/python_java_repositories.json', parser=parser).run()
+
+                self.assertEqual(len(response), 10)
+                self.assertIn({'url': 'https://github.com/qiyuangong/leetcode',
+                               'extra': {'owner': 'qiyuangong',
+                                         'language_stats': {'Python': '77.4', 'Java': '20.4', 'C++': '2.2'}}},
+                              response)
+
+    def testEarlyStop(self):
+        """Test that the streaming extraction stops once the plan has everything it needs"""
+
+        for page, plan in [('python_java_repositories.txt', EXTRACTION_PLANS['Repositories']),
+                           ('no_repositories.txt', EXTRACTION_PLANS['Repositories']),
+                           ('extra_case_correct.txt', EXTRACTION_PLANS['Stats'])]:
+            with self.subTest(page=page):
+                extractor = PlanExtractor(plan)
+                lines = readPage(page).splitlines(keepends=True)
+                fed = 0
+                while fed < len(lines) and not extractor.feedChunk(lines[fed]):
+                    fed += 1
+
+                extraction = extractor.finish()
+                expected = getParser('beautifulsoup').extract(''.join(lines), plan)
+
+                self.assertLess(fed, len(lines) - 50)
+                self.assertEqual((extraction.links, extraction.nextPage, extraction.results, extraction.languages),
+                                 (expected.links, expected.nextPage, expected.results, expected.languages))
+
+    def testStreamedDownload(self):
+        """Test that streamed pages get the same results and stop downloading once the data is found"""
+
+        for searchPage in ['python_java_repositories.txt', 'no_repositories.txt']:
+            with self.subTest(page=searchPage), StubGithubServer(searchPage) as stub:
+                crawlers = [GithubCrawler({"keywords": ["Python", "Java"], "proxies": [stub.address],
+                                           "type": "Repositories"}, githubURL=stub.url, streamPages=streamPages)
+                            for streamPages in [False, True]]
+                whole, streamed = [crawler.run() for crawler in crawlers]
+
+                self.assertCountEqual(streamed, whole)
+                pages = len(streamed) + 1 if searchPage == 'python_java_repositories.txt' else 1
+                self.assertEqual(crawlers[1].metrics.counter('stream_aborts_total', page_type='Repositories'), 1)
+                self.assertEqual(crawlers[1].metrics.counter('stream_aborts_total', page_type='Stats'), pages - 1)
+                for crawler in crawlers:
+                    self.assertEqual(crawler.metrics.histogram('parse_seconds', page_type='Repositories').count, 1)
+                    self.assertEqual(getattr(crawler.metrics.histogram('parse_seconds', page_type='Stats'), 'count',
+                                             0), pages - 1)
+                self.assertLess(crawlers[1].metrics.counter('download_bytes_total', proxy='http://' + stub.address),
+                                crawlers[0].metrics.counter('download_bytes_total', proxy='http://' + stub.address))
+
+    def testInvalidParser(self):
+        """Test that an unknown backend name raises ValueError"""
+
+        self.assertRaises(ValueError, getParser, 'regex')
+        self.assertIsInstance(getParser(StreamingBackend()), StreamingBackend)
+
+    def testCompareParsers(self):
+        """Test that compareParsers times every backend on every page"""
+
+        html = readPage('extra_case_correct.txt')
+        timings = compareParsers({'extra': (html, lambda parser, page: parser.extract(page,
+                                                                                      EXTRACTION_PLANS['Stats']))},
+                                 repeat=1)
+
+        self.assertEqual(set(timings['extra']), {parser.name for parser in availableParsers()})
+        self.assertTrue(all(microseconds > 0 for microseconds in timings['extra'].values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
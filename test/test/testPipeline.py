@@ -0,0 +1,99 @@
+import requests
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from unittest import TestCase, mock
+from githubCrawler.src.githubCrawler.githubCrawler import GithubCrawler
+from githubCrawler.src.githubCrawler.pipeline import CrawlPipeline
+
+
+def readHTML(name):
+    with open('../html/' + name, encoding="utf8") as file:
+        return file.read()
+
+
+class TestPipeline(TestCase):
+    """  Tests for the staged download and parse pipeline """
+
+    @mock.patch.object(GithubCrawler, "downloadHTML")
+    def testSameResultAsCrawler(self, mock_get):
+        """Test that the pipeline returns the same URLs as the crawler"""
+
+        searchHTML = readHTML('python_java_repositories.txt')
+        repositoryHTML = readHTML('extra_case_correct.txt')
+        mock_get.side_effect = lambda link, useCache=False: repositoryHTML if useCache else searchHTML
+
+        expectedResponse = GithubCrawler('../json/python_java_repositories.json').run()
+        response = CrawlPipeline(GithubCrawler('../json/python_java_repositories.json'), parseWorkers=2).run()
+
+        self.assertEqual(sorted(url['url'] for url in response), sorted(url['url'] for url in expectedResponse))
+        self.assertTrue(all(url in expectedResponse for url in response))
+        self.assertEqual(response[0]['extra']['language_stats'], {'Python': '77.4', 'Java': '20.4', 'C++': '2.2'})
+
+    @mock.patch.object(GithubCrawler, "downloadHTML")
+    def testNonRepositories(self, mock_get):
+        """Test that the pipeline returns the URLs of the issues and the errors of the search as the crawler"""
+
+        mock_get.return_value = readHTML('python_java_issues.txt')
+        response = CrawlPipeline(GithubCrawler('../json/python_java_issues.json'), parseWorkers=1).run()
+        self.assertEqual(response, GithubCrawler('../json/python_java_issues.json').run())
+
+        mock_get.return_value = readHTML('python_java_repositories_bad.txt')
+        response = CrawlPipeline(GithubCrawler('../json/python_java_repositories.json'), parseWorkers=1).run()
+        self.assertEqual(response, [{'error': 'Data not found. Github HTML may have changed.'}])
+
+    @mock.patch("time.sleep")
+    @mock.patch.object(GithubCrawler, "downloadHTML")
+    def testDownloadErrors(self, mock_get, mock_sleep):
+        """Test that a repository that can not be downloaded gets the error and the rest of the results arrive"""
+
+        searchHTML = readHTML('python_java_repositories.txt')
+        repositoryHTML = readHTML('extra_case_correct.txt')
+
+        def download(link, useCache=False):
+            if link.endswith('/kivy/pyjnius'):
+                raise requests.exceptions.RequestException
+            return repositoryHTML if useCache else searchHTML
+
+        mock_get.side_effect = download
+        crawler = GithubCrawler('../json/python_java_repositories.json', attempts=2)
+        response = CrawlPipeline(crawler, parseWorkers=2, queueSize=1).run()
+
+        self.assertEqual(len(response), 10)
+        errors = [url for url in response if url['url'].endswith('/kivy/pyjnius')]
+        self.assertEqual(errors[0]['extra']['language_stats'], {'error': ''})
+
+    @mock.patch.object(GithubCrawler, "downloadHTML")
+    def testBrokenParseStage(self, mock_get):
+        """Test that an error of the process pool is raised by the pipeline instead of waiting for ever"""
+
+        searchHTML = readHTML('python_java_repositories.txt')
+        repositoryHTML = readHTML('extra_case_correct.txt')
+        mock_get.side_effect = lambda link, useCache=False: repositoryHTML if useCache else searchHTML
+        submit = ProcessPoolExecutor.submit
+
+        def brokenSubmit(pool, function, *args):
+            if args[1] == 'Stats':
+                raise BrokenProcessPool('A process of the pool was killed.')
+            return submit(pool, function, *args)
+
+        with mock.patch.object(ProcessPoolExecutor, 'submit', brokenSubmit):
+            with self.assertRaises(BrokenProcessPool):
+                CrawlPipeline(GithubCrawler('../json/python_java_repositories.json'), parseWorkers=1).run()
+
+    @mock.patch.object(GithubCrawler, "downloadHTML")
+    def testEarlyClose(self, mock_get):
+        """Test that the pipeline stops when the generator is closed before reading all the results"""
+
+        searchHTML = readHTML('python_java_repositories.txt')
+        repositoryHTML = readHTML('extra_case_correct.txt')
+        mock_get.side_effect = lambda link, useCache=False: repositoryHTML if useCache else searchHTML
+
+        results = CrawlPipeline(GithubCrawler('../json/python_java_repositories.json'), parseWorkers=1,
+                                queueSize=1).iterResults(maxPages=1)
+        self.assertIn('url', next(results))
+        results.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+from unittest import TestCase
+from githubCrawler.src.githubCrawler.proxyPool import ProxyPool
+
+PROXIES = [{"http": 'http://' + proxy, "https": 'https://' + proxy} for proxy in ['1.1.1.1:80', '2.2.2.2:80']]
+
+
+class TestProxyPool(TestCase):
+    """  Tests for the proxy pool """
+
+    def testPrefersHealthyProxy(self):
+        """Test that a proxy with errors and high latency is chosen less than a healthy one"""
+
+        pool = ProxyPool(PROXIES, failuresToTrip=100)
+        for _ in range(10):
+            pool.release(pool.states[0], 0.1, True)
+            pool.states[0].inFlight += 1
+            pool.release(pool.states[1], 5.0, False)
+            pool.states[1].inFlight += 1
+
+        chosen = []
+        for _ in range(200):
+            state = pool.acquire()
+            chosen.append(state.index)
+            pool.release(state, 0.1 if state.index == 0 else 5.0, state.index == 0)
+
+        self.assertGreater(chosen.count(0), 190)
+
+    def testCircuitBreaker(self):
+        """Test that a proxy that fails several times in a row is not chosen until it cools down"""
+
+        pool = ProxyPool(PROXIES, failuresToTrip=2, cooldown=60)
+        for _ in range(2):
+            pool.states[1].inFlight += 1
+            pool.release(pool.states[1], 1.0, False)
+
+        chosen = set()
+        for _ in range(20):
+            state = pool.acquire()
+            chosen.add(state.index)
+            pool.release(state, 1.0, True)
+
+        self.assertEqual(chosen, {0})
+        self.assertTrue(pool.stats()[1]['open'])
+
+    def testHalfOpen(self):
+        """Test that a proxy that has cooled down gets a single trial request and closes again if it works"""
+
+        pool = ProxyPool(PROXIES[1:], failuresToTrip=1, cooldown=0)
+        pool.states[0].inFlight += 1
+        pool.release(pool.states[0], 1.0, False)
+
+        state = pool.acquire(block=False)
+        self.assertEqual(state.index, 0)
+        self.assertIsNone(pool.acquire(block=False))
+
+        pool.release(state, 1.0, True)
+        self.assertEqual(pool.states[0].openUntil, 0.0)
+
+    def testAllProxiesOpen(self):
+        """Test that a proxy is still returned if all of them are cooling down"""
+
+        pool = ProxyPool(PROXIES, failuresToTrip=1, cooldown=60)
+        for state in pool.states:
+            state.inFlight += 1
+            pool.release(state, 1.0, False)
+
+        state = pool.acquire(block=False)
+        self.assertIsNotNone(state)
+        self.assertIsNone(pool.acquire(block=False))
+        self.assertEqual(state.inFlight, 1)
+
+        pool = ProxyPool(PROXIES[:1], maxRequestsPerProxy=1, failuresToTrip=1, cooldown=60)
+        pool.states[0].inFlight += 1
+        pool.release(pool.states[0], 1.0, False)
+        self.assertEqual([pool.acquire(block=False) for _ in range(5)].count(None), 4)
+        self.assertEqual(pool.states[0].inFlight, 1)
+
+    def testMaxRequestsPerProxy(self):
+        """Test that a proxy does not get more requests in flight than the limit"""
+
+        pool = ProxyPool(PROXIES, maxRequestsPerProxy=2)
+        states = [pool.acquire(block=False) for _ in range(4)]
+
+        self.assertEqual(sorted(state.index for state in states), [0, 0, 1, 1])
+        self.assertIsNone(pool.acquire(block=False))
+
+        pool.release(states[0], 1.0, True)
+        self.assertEqual(pool.acquire(block=False).index, states[0].index)
+
+    def testForProxies(self):
+        """Test that a pool for some proxies only chooses among them and shares their limits with the whole pool"""
+
+        pool = ProxyPool(PROXIES, maxRequestsPerProxy=1)
+        first = pool.forProxies(PROXIES[:1])
+
+        state = first.acquire(block=False)
+        self.assertIs(state, pool.states[0])
+        self.assertIsNone(first.acquire(block=False))
+        self.assertIs(pool.acquire(block=False), pool.states[1])
+        other = pool.forProxies([{"http": 'http://9.9.9.9:80', "https": 'https://9.9.9.9:80'}])
+        self.assertEqual(other.acquire(block=False).proxy['http'], 'http://9.9.9.9:80')
+        self.assertEqual(len(pool.states), 3)
+
+    def testProxyContextManager(self):
+        """Test that the proxy context manager records failures of the requests"""
+
+        pool = ProxyPool(PROXIES[:1])
+        try:
+            with pool.proxy():
+                raise ConnectionError
+        except ConnectionError:
+            pass
+        with pool.proxy() as proxy:
+            self.assertEqual(proxy, PROXIES[0])
+
+        self.assertEqual(pool.stats()[0]['failures'], 1)
+        self.assertEqual(pool.stats()[0]['requests'], 2)
+        self.assertEqual(pool.stats()[0]['in_flight'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import importlib.util
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import TestCase
+from githubCrawler.src.githubCrawler.githubCrawler import GithubCrawler
+from githubCrawler.src.githubCrawler.results import LinkResult, RepositoryResult, toArrow, toColumns
+from githubCrawler.src.githubCrawler.sinks import NDJSONSink
+from githubCrawler.test.test.stubServer import StubGithubServer
+
+STATS = {'Python': '77.4', 'Java': '20.4', 'C++': '2.2'}
+
+
+class TestResults(TestCase):
+    """  Tests for the compact results of the crawler """
+
+    def testSameAsDicts(self):
+        """Test that the compact results read as the dicts of the crawler, with numbers and interned strings inside"""
+
+        first = RepositoryResult('https://github.com', '/qiyuangong/leetcode', ''.join(['qiyuan', 'gong']), STATS)
+        second = RepositoryResult('https://github.com', '/qiyuangong/other', ''.join(['qiyu', 'angong']), STATS)
+        expected = {'url': 'https://github.com/qiyuangong/leetcode',
+                    'extra': {'owner': 'qiyuangong', 'language_stats': STATS}}
+        self.assertEqual(first, expected)
+        self.assertEqual(dict(first), expected)
+        self.assertEqual(json.loads(json.dumps(first, default=dict)), expected)
+        self.assertIs(first.owner, second.owner)
+        self.assertIs(first.languages[0], second.languages[0])
+        self.assertEqual(first.languageStats, {'Python': 77.4, 'Java': 20.4, 'C++': 2.2})
+
+        first['hits'] = 2
+        self.assertEqual(first, dict(expected, hits=2))
+        with self.assertRaises(KeyError):
+            first['url'] = 'https://github.com/a/b'
+
+        link = LinkResult('https://github.com', '/a/b/issues/1')
+        self.assertEqual(link, {'url': 'https://github.com/a/b/issues/1'})
+        self.assertFalse(hasattr(link, '__dict__'))
+
+    def testStatsNotNumbers(self):
+        """Test that stats that can not be kept as the same numbers, i.e. errors, are kept as they are"""
+
+        for stats in ['Not data about languages', {'error': 'Page not in the archive.'}, {'Python': '77.40'}]:
+            result = RepositoryResult('https://github.com', '/a/b', 'a', stats)
+            self.assertIsNone(result.languageStats)
+            self.assertEqual(result['extra']['language_stats'], stats)
+
+    def testColumns(self):
+        """Test that compact results and dicts give the same columns"""
+
+        compact = [RepositoryResult('https://github.com', '/a/b', 'a', STATS, hits=1),
+                   RepositoryResult('https://github.com', '/c/d', 'c', 'Not data about languages', hits=3),
+                   {'error': 'Some error'}]
+        columns = toColumns(compact)
+        self.assertEqual(columns, toColumns([dict(result) for result in compact]))
+        self.assertEqual(columns['results'], {'url': ['https://github.com/a/b', 'https://github.com/c/d'],
+                                              'owner': ['a', 'c'], 'hits': [1, 3]})
+        self.assertEqual(columns['languages'], {'result': [0, 0, 0], 'language': ['Python', 'Java', 'C++'],
+                                                'percentage': [77.4, 20.4, 2.2]})
+
+        if importlib.util.find_spec('pyarrow') is None:
+            with self.assertRaises(ImportError):
+                toArrow(compact)
+        else:
+            self.assertEqual(toArrow(compact)['languages'].num_rows, 3)
+
+    def testLazyImport(self):
+        """Test that pyarrow is only imported when the results are converted to Arrow"""
+
+        code = "import sys; import githubCrawler.src.githubCrawler.results; print('pyarrow' in sys.modules)"
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip(), 'False')
+
+    def testCompactCrawl(self):
+        """Test that a crawl with compact results gives the same results and they are written the same"""
+
+        directory = tempfile.mkdtemp()
+        try:
+            with StubGithubServer('python_java_repositories.txt') as stub:
+                arguments = {"keywords": ["Python", "Java"], "proxies": [stub.address], "type": "Repositories"}
+                expected = GithubCrawler(arguments, githubURL=stub.url).run()
+                results = GithubCrawler(arguments, githubURL=stub.url, compactResults=True).run()
+
+            self.assertTrue(all(isinstance(result, RepositoryResult) for result in results))
+            self.assertCountEqual(results, expected)
+            path = os.path.join(directory, 'results.ndjson')
+            with NDJSONSink(path) as sink:
+                for result in results:
+                    sink.write(result)
+            with open(path, encoding="utf8") as file:
+                self.assertCountEqual([json.loads(line) for line in file], expected)
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
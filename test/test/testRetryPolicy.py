@@ -0,0 +1,110 @@
+import email.utils
+import time
+import requests
+import unittest
+from unittest import TestCase, mock
+from githubCrawler.src.githubCrawler.retryPolicy import RetryPolicy, RateLimitException
+
+
+class TestRetryPolicy(TestCase):
+    """  Tests for the retry policy """
+
+    def testExponentialBackoff(self):
+        """Test that the wait grows with the attempts and never passes the maximum"""
+
+        policy = RetryPolicy(baseDelay=1, maxDelay=10)
+
+        self.assertLessEqual(max(policy.delay(1) for _ in range(100)), 1)
+        self.assertGreater(max(policy.delay(3) for _ in range(100)), 1)
+        self.assertLessEqual(max(policy.delay(20) for _ in range(100)), 10)
+
+    def testRetryAfterSeconds(self):
+        """Test that the Retry-After header in seconds is honored"""
+
+        policy = RetryPolicy(baseDelay=0.1)
+
+        self.assertEqual(policy.retryAfter({'Retry-After': '12'}), 12)
+        self.assertGreaterEqual(policy.delay(1, RateLimitException(429, 12)), 12)
+
+    def testRetryAfterDate(self):
+        """Test that the Retry-After header as an HTTP date is honored"""
+
+        date = email.utils.formatdate(time.time() + 60, usegmt=True)
+
+        self.assertAlmostEqual(RetryPolicy().retryAfter({'Retry-After': date}), 60, delta=2)
+
+    def testRetryAfterNotValid(self):
+        """Test that fractional Retry-After values are honored and values that are not valid are ignored"""
+
+        policy = RetryPolicy()
+        naiveDate = time.strftime('%a, %d %b %Y %H:%M:%S', time.gmtime(time.time() + 60))
+
+        self.assertEqual(policy.retryAfter({'Retry-After': '1.5'}), 1.5)
+        self.assertAlmostEqual(policy.retryAfter({'Retry-After': naiveDate}), 60, delta=2)
+        for value in ['soon', '-5', 'nan', 'inf', 'Mon, 99 Foo 2024']:
+            self.assertIsNone(policy.retryAfter({'Retry-After': value}))
+        headers = {'Retry-After': 'soon', 'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': str(int(time.time()) + 30)}
+        self.assertAlmostEqual(policy.retryAfter(headers), 30, delta=2)
+
+    def testRateLimitReset(self):
+        """Test that the GitHub rate limit headers are honored"""
+
+        headers = {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': str(int(time.time()) + 30)}
+
+        self.assertAlmostEqual(RetryPolicy().retryAfter(headers), 30, delta=2)
+        self.assertIsNone(RetryPolicy().retryAfter({'X-RateLimit-Remaining': '10'}))
+
+    def testCheckResponse(self):
+        """Test that rate limits and temporary errors raise RateLimitException and other responses do not"""
+
+        policy = RetryPolicy()
+
+        self.assertRaises(RateLimitException, policy.checkResponse, 429, {})
+        self.assertRaises(RateLimitException, policy.checkResponse, 503, {})
+        self.assertRaises(RateLimitException, policy.checkResponse, 403, {}, 'You have exceeded a secondary rate limit')
+        self.assertRaises(RateLimitException, policy.checkResponse, 403, {'X-RateLimit-Remaining': '0'})
+        policy.checkResponse(200, {}, 'rate limit')
+        policy.checkResponse(403, {}, 'Forbidden')
+        policy.checkResponse(404, {})
+
+    @mock.patch("time.sleep")
+    def testCallRetriesUntilWorks(self, mock_sleep):
+        """Test that call tries again after a connection error"""
+
+        fetch = mock.Mock(side_effect=[requests.exceptions.ConnectionError, 'html'])
+
+        self.assertEqual(RetryPolicy().call(fetch, 'link'), 'html')
+        self.assertEqual(fetch.call_count, 2)
+        self.assertEqual(mock_sleep.call_count, 1)
+
+    @mock.patch("time.sleep")
+    def testCallAttempts(self, mock_sleep):
+        """Test that call raises the last exception after all the attempts"""
+
+        fetch = mock.Mock(side_effect=requests.exceptions.ConnectionError)
+
+        self.assertRaises(requests.exceptions.ConnectionError, RetryPolicy(attempts=4).call, fetch)
+        self.assertEqual(fetch.call_count, 4)
+
+    @mock.patch("time.sleep")
+    def testCallNotRetryable(self, mock_sleep):
+        """Test that an HTTP error like 404 is not tried again"""
+
+        fetch = mock.Mock(side_effect=requests.exceptions.HTTPError('404 Client Error'))
+
+        self.assertRaises(requests.exceptions.HTTPError, RetryPolicy().call, fetch)
+        self.assertEqual(fetch.call_count, 1)
+
+    @mock.patch("time.sleep")
+    def testCallDeadline(self, mock_sleep):
+        """Test that call gives up if the next wait goes past the deadline"""
+
+        fetch = mock.Mock(side_effect=RateLimitException(429, 120))
+
+        self.assertRaises(RateLimitException, RetryPolicy(deadline=60).call, fetch)
+        self.assertEqual(fetch.call_count, 1)
+        mock_sleep.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
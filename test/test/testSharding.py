@@ -0,0 +1,141 @@
+import inspect
+import re
+import requests
+import unittest
+from datetime import date
+from unittest import TestCase, mock
+from githubCrawler.src.githubCrawler.githubCrawler import GithubCrawler
+from githubCrawler.src.githubCrawler.hedgePolicy import HedgePolicy
+from githubCrawler.src.githubCrawler.parsers import PARSERS, getParser
+from githubCrawler.src.githubCrawler.results import RepositoryResult
+from githubCrawler.src.githubCrawler.sharding import DateRange, NumberRange, ShardedCrawler, splitShard
+
+RESULTS_PER_DAY = 200
+
+
+class TestSharding(TestCase):
+    """  Tests for the sharding of searches over the result cap """
+
+    def setUp(self):
+        with open('../html/python_java_repositories.txt', encoding="utf8") as file:
+            self.searchHTML = file.read()
+        with open('../html/extra_case_correct.txt', encoding="utf8") as file:
+            self.repositoryHTML = file.read()
+        with open('../html/no_repositories.txt', encoding="utf8") as file:
+            self.emptyHTML = file.read()
+        self.searches = []
+        self.input = {"keywords": ["Python", "Java"], "proxies": ["1.1.1.1:80"], "type": "Repositories"}
+
+    def download(self, link, useCache=False):
+        """ Search pages have RESULTS_PER_DAY results for every day of their created qualifier. """
+
+        if useCache:
+            return self.repositoryHTML
+        self.searches.append(link)
+        if '&p=' in link:
+            return self.emptyHTML
+        start, end = [date.fromisoformat(day) for day in re.search(r'created:([\d-]+)\.\.([\d-]+)', link).groups()]
+        total = ((end - start).days + 1) * RESULTS_PER_DAY
+        return self.searchHTML.replace('16,318', '{:,}'.format(total))
+
+    def testTotal(self):
+        """Test that every parser extracts the number of results of a search page"""
+
+        crawler = GithubCrawler(dict(self.input))
+        for name in PARSERS:
+            crawler.parser = getParser(name)
+            extraction = crawler.extractPage(self.searchHTML, 'Repositories')
+            self.assertEqual(crawler.readTotal(extraction), 16318, name)
+            self.assertEqual(crawler.readTotal(crawler.extractPage(self.emptyHTML, 'Repositories')), 0, name)
+
+    def testRanges(self):
+        """Test that the ranges are split in disjoint parts until they can not be split"""
+
+        days = DateRange('pushed', date(2020, 1, 1), date(2020, 1, 4))
+        self.assertEqual([part.qualifier for part in days.split()],
+                         ['pushed:2020-01-01..2020-01-02', 'pushed:2020-01-03..2020-01-04'])
+        self.assertIsNone(DateRange('created', date(2020, 1, 1), date(2020, 1, 1)).split())
+        self.assertEqual([part.qualifier for part in NumberRange('stars', 10).split()], ['stars:10..21', 'stars:>=22'])
+        self.assertEqual([part.qualifier for part in NumberRange('stars', 0, 1).split()], ['stars:0..0', 'stars:1..1'])
+
+        shard = (DateRange('created', date(2020, 1, 1), date(2020, 1, 1)), NumberRange('stars', 0, 3))
+        self.assertEqual([[part.qualifier for part in parts] for parts in splitShard(shard)],
+                         [['created:2020-01-01..2020-01-01', 'stars:0..1'],
+                          ['created:2020-01-01..2020-01-01', 'stars:2..3']])
+
+    def testPlan(self):
+        """Test that the shards over the cap are split again and the ones that can not be split are truncated"""
+
+        with mock.patch.object(GithubCrawler, "downloadHTML", side_effect=self.download):
+            sharded = ShardedCrawler(GithubCrawler(dict(self.input)),
+                                     DateRange('created', date(2020, 1, 1), date(2020, 1, 8)), cap=1000)
+            plan = sharded.plan()
+        self.assertEqual([(shard[0].qualifier, total) for shard, total in plan],
+                         [('created:2020-01-01..2020-01-04', 800), ('created:2020-01-05..2020-01-08', 800)])
+        self.assertEqual(sharded.truncated, [])
+
+        with mock.patch.object(GithubCrawler, "downloadHTML", side_effect=self.download):
+            sharded = ShardedCrawler(GithubCrawler(dict(self.input)),
+                                     DateRange('created', date(2020, 1, 1), date(2020, 1, 2)), cap=100)
+            plan = sharded.plan()
+        self.assertEqual(len(plan), 2)
+        self.assertEqual([shard[0].qualifier for shard in sharded.truncated],
+                         ['created:2020-01-01..2020-01-01', 'created:2020-01-02..2020-01-02'])
+
+    def testCountNotKnown(self):
+        """Test that a shard whose count fails is crawled and reported in truncated, not taken as under the cap"""
+
+        def download(link, useCache=False):
+            if 'created:2020-01-01..2020-01-02' in link:
+                raise requests.exceptions.ConnectionError('Proxy down')
+            return self.download(link, useCache)
+
+        with mock.patch.object(GithubCrawler, "downloadHTML", side_effect=download):
+            sharded = ShardedCrawler(GithubCrawler(dict(self.input), attempts=1),
+                                     DateRange('created', date(2020, 1, 1), date(2020, 1, 4)), cap=500)
+            plan = sharded.plan()
+        self.assertEqual([(shard[0].qualifier, total) for shard, total in plan],
+                         [('created:2020-01-01..2020-01-02', None), ('created:2020-01-03..2020-01-04', 400)])
+        self.assertEqual([shard[0].qualifier for shard in sharded.truncated], ['created:2020-01-01..2020-01-02'])
+
+    def testSharedArguments(self):
+        """Test that the crawlers of the shards get every setting of the crawler"""
+
+        hedgePolicy = HedgePolicy()
+        crawler = GithubCrawler(dict(self.input), hedgePolicy=hedgePolicy, streamPages=True, compactResults=True,
+                                maxWorkers=3)
+        sharded = ShardedCrawler(crawler, DateRange('created', date(2020, 1, 1), date(2020, 1, 8)), cap=1000)
+        arguments = sharded.sharedArguments()
+        parameters = set(inspect.signature(GithubCrawler.__init__).parameters) - {'self', 'inputFileLink', 'attempts'}
+        self.assertEqual(set(arguments), parameters)
+        shardCrawler = GithubCrawler(sharded.shardJob(sharded.shard), **arguments)
+        self.assertEqual((shardCrawler.hedgePolicy, shardCrawler.streamPages, shardCrawler.maxWorkers),
+                         (hedgePolicy, True, 3))
+
+        crawler = GithubCrawler(dict(self.input), compactResults=True)
+        with mock.patch.object(GithubCrawler, "downloadHTML", side_effect=self.download):
+            results = ShardedCrawler(crawler, DateRange('created', date(2020, 1, 1), date(2020, 1, 8)),
+                                     cap=1000).run()
+        self.assertTrue(all(isinstance(url, RepositoryResult) for url in results))
+
+    def testRun(self):
+        """Test that the shards are crawled with their qualifiers and their URLs are merged without duplicates"""
+
+        with mock.patch.object(GithubCrawler, "downloadHTML", side_effect=self.download):
+            results = ShardedCrawler(GithubCrawler(dict(self.input)),
+                                     DateRange('created', date(2020, 1, 1), date(2020, 1, 8)), cap=1000,
+                                     maxWorkers=4).run()
+
+        self.assertEqual(len(results), 10)
+        self.assertEqual(len({url['url'] for url in results}), 10)
+        self.assertIn({'url': 'https://github.com/qiyuangong/leetcode',
+                       'extra': {'owner': 'qiyuangong',
+                                 'language_stats': {'Python': '77.4', 'Java': '20.4', 'C++': '2.2'}}}, results)
+        for qualifier in ['created:2020-01-01..2020-01-04', 'created:2020-01-05..2020-01-08']:
+            self.assertTrue(any(qualifier in link and '&p=2' in link for link in self.searches))
+            # The first page, downloaded to count the results of the shard, is not downloaded again.
+            self.assertEqual(len([link for link in self.searches if qualifier in link and '&p=' not in link]), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
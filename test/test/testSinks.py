@@ -0,0 +1,106 @@
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import TestCase, mock
+from githubCrawler.src.githubCrawler.githubCrawler import GithubCrawler
+from githubCrawler.src.githubCrawler.sinks import NDJSONSink, RotatingSink, openSink, zstandard
+
+
+def readLines(path):
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding="utf8") as file:
+        return [json.loads(line) for line in file]
+
+
+class TestSinks(TestCase):
+    """  Tests for the output sinks of the results """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def testBoundedBuffer(self):
+        """Test that the results are written once there are bufferSize of them in memory"""
+
+        path = os.path.join(self.directory, 'results.ndjson')
+        with NDJSONSink(path, bufferSize=2) as sink:
+            sink.write({'url': 'a'})
+            self.assertEqual(os.path.getsize(path), 0)
+            sink.write({'url': 'b'})
+            self.assertEqual(len(readLines(path)), 2)
+            sink.write({'url': 'c'})
+
+        self.assertEqual(readLines(path), [{'url': 'a'}, {'url': 'b'}, {'url': 'c'}])
+
+    def testGzipAppend(self):
+        """Test that gzip files are chosen by the extension and can be appended"""
+
+        path = os.path.join(self.directory, 'results.ndjson.gz')
+        with openSink(path, fsync=True) as sink:
+            sink.write({'url': 'a'})
+        with openSink(path, append=True) as sink:
+            sink.write({'url': 'b'})
+
+        self.assertEqual(readLines(path), [{'url': 'a'}, {'url': 'b'}])
+
+    @unittest.skipIf(zstandard is None, 'zstandard is not installed')
+    def testZstd(self):
+        """Test that zstd files can be read back"""
+
+        path = os.path.join(self.directory, 'results.ndjson.zst')
+        with openSink(path) as sink:
+            sink.write({'url': 'a'})
+
+        with open(path, 'rb') as file:
+            self.assertEqual(json.loads(zstandard.ZstdDecompressor().stream_reader(file).read()), {'url': 'a'})
+
+    def testStdout(self):
+        """Test that the results go to stdout if there is no output file"""
+
+        stdout = mock.Mock(buffer=io.BytesIO())
+        with mock.patch('sys.stdout', stdout):
+            with openSink('-') as sink:
+                sink.write({'url': 'a'})
+
+        self.assertEqual(stdout.buffer.getvalue(), b'{"url": "a"}\n')
+
+    def testRotatingSegments(self):
+        """Test that a new segment is started every maxRecords results"""
+
+        with RotatingSink(self.directory, maxRecords=2, compression='gzip') as sink:
+            for number in range(5):
+                sink.write({'url': str(number)})
+
+        self.assertEqual([os.path.basename(path) for path in sink.segments],
+                         ['results-00001.ndjson.gz', 'results-00002.ndjson.gz', 'results-00003.ndjson.gz'])
+        self.assertEqual([len(readLines(path)) for path in sink.segments], [2, 2, 1])
+
+        with RotatingSink(self.directory, maxRecords=2, compression='gzip') as sink:
+            sink.write({'url': 'resumed'})
+        self.assertEqual([os.path.basename(path) for path in sink.segments], ['results-00004.ndjson.gz'])
+        self.assertEqual(len(readLines(os.path.join(self.directory, 'results-00003.ndjson.gz'))), 1)
+
+    @mock.patch.object(GithubCrawler, "downloadHTML")
+    def testRunToSink(self, mock_get):
+        """Test that the crawler writes every URL to the sink"""
+
+        with open('../html/python_java_issues.txt', encoding="utf8") as file:
+            mock_get.return_value = file.read()
+        path = os.path.join(self.directory, 'results.ndjson')
+
+        crawler = GithubCrawler('../json/python_java_issues.json')
+        with NDJSONSink(path) as sink:
+            written = crawler.runToSink(sink)
+
+        self.assertEqual(written, 10)
+        self.assertEqual(readLines(path), crawler.run())
+
+
+if __name__ == '__main__':
+    unittest.main()
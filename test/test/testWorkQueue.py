@@ -0,0 +1,202 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import TestCase, mock
+import requests
+from githubCrawler.src.githubCrawler.githubCrawler import GithubCrawler
+from githubCrawler.src.githubCrawler.workQueue import BrokerServer, CrawlWorker, HTTPBroker, SQLiteBroker, \
+    collectResults, main, searchTask, submitJobs
+
+
+def job(crawlType):
+    return {"keywords": ["Python", "Java"], "proxies": ["1.1.1.1:80"], "type": crawlType}
+
+
+class FlakyBroker(SQLiteBroker):
+    """  Broker that can not be reached the first times the results of a task are sent """
+
+    failures = 1
+
+    def complete(self, task, results, tasks):
+        if self.failures:
+            self.failures -= 1
+            raise requests.exceptions.ConnectionError('Broker not reachable')
+        return super().complete(task, results, tasks)
+
+
+class TestWorkQueue(TestCase):
+    """  Tests for the work queue shared by several workers """
+
+    def setUp(self):
+        with open('../html/python_java_repositories.txt', encoding="utf8") as file:
+            self.searchHTML = file.read()
+        with open('../html/extra_case_correct.txt', encoding="utf8") as file:
+            self.repositoryHTML = file.read()
+        self.directory = tempfile.mkdtemp()
+        self.broker = SQLiteBroker(os.path.join(self.directory, 'queue.sqlite'), maxAttempts=2)
+        self.downloads = []
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def download(self, link, useCache=False):
+        self.downloads.append(link)
+        return self.repositoryHTML if useCache else self.searchHTML
+
+    def testLeases(self):
+        """Test that an expired lease is given to another worker and the task fails after the maximum attempts"""
+
+        self.assertEqual(self.broker.put([searchTask('a', job('Issues'), 1, 1)] * 2), 1)
+        first = self.broker.lease('first', 10, leaseSeconds=0)
+        self.assertEqual([task['attempts'] for task in first], [1])
+
+        second = self.broker.lease('second', 10, leaseSeconds=60)
+        self.assertEqual([task['attempts'] for task in second], [2])
+        self.assertEqual(self.broker.lease('third', 10), [])
+        self.assertFalse(self.broker.fail(first[0], 'late'))
+        self.assertEqual(self.broker.progress()['leased'], 1)
+
+        self.assertTrue(self.broker.fail(second[0], 'Proxy error'))
+        self.assertEqual(self.broker.progress(), {'pending': 0, 'leased': 0, 'done': 0, 'failed': 1})
+        self.assertEqual(self.broker.results(), [('a', {'error': 'Proxy error'})])
+
+    def testIdempotentCompletion(self):
+        """Test that only the first completion of a task is saved, even after its lease expired"""
+
+        submitJobs(self.broker, [('a', job('Issues'))])
+        first = self.broker.lease('first', 1, leaseSeconds=0)[0]
+        second = self.broker.lease('second', 1)[0]
+
+        self.assertTrue(self.broker.complete(second, [{'url': 'x'}], [searchTask('a', job('Issues'), 2, 2)]))
+        self.assertFalse(self.broker.complete(first, [{'url': 'x'}, {'url': 'y'}], []))
+        self.assertEqual(self.broker.results('a'), [('a', {'url': 'x'})])
+        self.assertEqual(self.broker.progress(), {'pending': 1, 'leased': 0, 'done': 1, 'failed': 0})
+
+    def testWorkersShareCrawl(self):
+        """Test that several workers with their own proxies drain the jobs and get the results of a batch"""
+
+        submitJobs(self.broker, [('repositories', job('Repositories')), ('issues', job('Issues'))], maxPages=2)
+        with mock.patch.object(GithubCrawler, "downloadHTML", side_effect=self.download):
+            workers = [CrawlWorker(self.broker, [proxy], 'worker' + str(number), maxWorkers=4, pollInterval=0.01)
+                       for number, proxy in enumerate(['1.1.1.1:80', '2.2.2.2:80'])]
+            threads = [threading.Thread(target=worker.run) for worker in workers]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        # Page 2 has the same repositories as page 1, so their tasks are not added again.
+        results = collectResults(self.broker)
+        self.assertEqual(len(results['repositories']), 10)
+        self.assertIn({'url': 'https://github.com/qiyuangong/leetcode',
+                       'extra': {'owner': 'qiyuangong',
+                                 'language_stats': {'Python': '77.4', 'Java': '20.4', 'C++': '2.2'}}},
+                      results['repositories'])
+        self.assertEqual(results['issues'], [{'url_not_found': 'Not found any URL for this search.'}])
+        self.assertEqual(self.broker.unfinished(), 0)
+        self.assertEqual(len([link for link in self.downloads if '/search?' in link]), 3)
+
+    def testNetworkBroker(self):
+        """Test that a worker gets the same results through the HTTP broker as through the local one"""
+
+        with BrokerServer(self.broker, port=0) as server:
+            self.assertTrue(server.url.startswith('http://127.0.0.1:'))
+            remote = HTTPBroker(server.url, server.token)
+            submitJobs(remote, [('repositories', job('Repositories'))])
+            with mock.patch.object(GithubCrawler, "downloadHTML", side_effect=self.download):
+                self.assertEqual(CrawlWorker(remote, ['1.1.1.1:80'], maxWorkers=2, pollInterval=0.01).run(), 11)
+            self.assertEqual(remote.progress()['done'], 11)
+            self.assertEqual(remote.results(), self.broker.results())
+
+    def testBrokerToken(self):
+        """Test that the HTTP broker only answers the requests with its token"""
+
+        with BrokerServer(self.broker, port=0, token='secret') as server:
+            for token in ['other', None]:
+                with mock.patch.dict(os.environ, {'GITHUB_CRAWLER_BROKER_TOKEN': ''}):
+                    with self.assertRaises(requests.HTTPError) as error:
+                        HTTPBroker(server.url, token).progress()
+                self.assertEqual(error.exception.response.status_code, 401)
+            self.assertEqual(self.broker.progress()['pending'], 0)
+            with mock.patch.dict(os.environ, {'GITHUB_CRAWLER_BROKER_TOKEN': 'secret'}):
+                self.assertEqual(HTTPBroker(server.url).put([searchTask('a', job('Issues'), 1, 1)]), 1)
+            self.assertEqual(self.broker.progress()['pending'], 1)
+
+    def testLeaseRenewed(self):
+        """Test that a task slower than its lease is renewed and not run by another worker at the same time"""
+
+        def download(link, useCache=False):
+            self.downloads.append(link)
+            time.sleep(1)
+            return self.searchHTML
+
+        submitJobs(self.broker, [('issues', job('Issues'))])
+        with mock.patch.object(GithubCrawler, "downloadHTML", side_effect=download):
+            workers = [CrawlWorker(self.broker, ['1.1.1.1:80'], 'worker' + str(number), leaseSeconds=0.3,
+                                   pollInterval=0.01) for number in range(2)]
+            threads = [threading.Thread(target=worker.run) for worker in workers]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(self.downloads), 1)
+        self.assertEqual(self.broker.progress(), {'pending': 0, 'leased': 0, 'done': 1, 'failed': 0})
+
+    def testBrokerNotReachable(self):
+        """Test that the worker goes on if the broker can not be reached and the task is run again"""
+
+        broker = FlakyBroker(os.path.join(self.directory, 'flaky.sqlite'))
+        submitJobs(broker, [('issues', job('Issues'))])
+        with mock.patch.object(GithubCrawler, "downloadHTML", side_effect=self.download):
+            worker = CrawlWorker(broker, ['1.1.1.1:80'], leaseSeconds=0.1, pollInterval=0.01)
+            self.assertEqual(worker.run(), 2)
+
+        self.assertEqual(broker.progress(), {'pending': 0, 'leased': 0, 'done': 1, 'failed': 0})
+        self.assertEqual(worker.metrics.counter('broker_errors_total', method='complete'), 1)
+
+    def testRepositoryFailed(self):
+        """Test that a repository that could not be downloaded is leased again and fails after the maximum attempts"""
+
+        def download(link, useCache=False):
+            if useCache:
+                self.downloads.append(link)
+                raise requests.exceptions.ConnectionError('Proxy error')
+            return self.searchHTML
+
+        submitJobs(self.broker, [('repositories', job('Repositories'))])
+        with mock.patch.object(GithubCrawler, "downloadHTML", side_effect=download):
+            CrawlWorker(self.broker, ['1.1.1.1:80'], attempts=1, maxWorkers=2, pollInterval=0.01).run()
+
+        self.assertEqual(self.broker.progress(), {'pending': 0, 'leased': 0, 'done': 1, 'failed': 10})
+        self.assertEqual(len(self.downloads), 20)
+        results = collectResults(self.broker)['repositories']
+        self.assertEqual(len(results), 10)
+        self.assertTrue(all('error' in result for result in results))
+
+    def testCommandLine(self):
+        """Test that jobs are submitted, worked and written from the command line"""
+
+        queueFile = os.path.join(self.directory, 'queue.sqlite')
+        jobsFile = os.path.join(self.directory, 'jobs.jsonl')
+        output = os.path.join(self.directory, 'output.jsonl')
+        with open(jobsFile, 'w') as file:
+            file.write(json.dumps(dict(job('Repositories'), id='python')) + '\n')
+
+        self.assertEqual(main(['submit', queueFile, jobsFile]), 0)
+        with mock.patch.object(GithubCrawler, "downloadHTML", side_effect=self.download):
+            self.assertEqual(main(['work', queueFile, '--proxies', '3.3.3.3:80', '--max-workers', '2']), 0)
+        self.assertEqual(main(['results', queueFile, '--output', output]), 0)
+
+        with open(output) as file:
+            lines = [json.loads(line) for line in file]
+        self.assertEqual(len(lines), 10)
+        self.assertEqual(lines[0]['job'], 'python')
+
+
+if __name__ == '__main__':
+    unittest.main()